@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import glob
+import logging
+import time
+from pathlib import Path
+from typing import Any, Optional
+from dotenv import load_dotenv
+from src.transcript_audit.ingest import parse_transcript
+from src.transcript_audit.models import TranscriptAuditResult
+from src.transcript_audit.schemas import AuditStatus, AuditType
+
+logger = logging.getLogger(__name__)
+
+OUTPUTS = ["mongo", "jsonl", "parquet"]
+
+
+def collect_transcript_files(paths: list[str], pattern: str) -> list[Path]:
+    """Expands directories (recursively, with `pattern`) and globs into a sorted list of files."""
+    files: set[Path] = set()
+    for path in paths:
+        if any(char in path for char in "*?["):
+            files.update(Path(match) for match in glob.glob(path, recursive=True) if Path(match).is_file())
+        elif Path(path).is_dir():
+            files.update(match for match in Path(path).rglob(pattern) if match.is_file())
+        else:
+            files.add(Path(path))
+    return sorted(files)
+
+
+def _get_audit_services() -> dict[AuditType, Any]:
+    # Note: Imported here so the services (and openai) aren't loaded just to print --help
+    from src.transcript_audit.services.recorded_line_audit_service import (
+        get_recorded_line_audit_service,
+    )
+    from src.transcript_audit.services.section_audit_service import get_section_audit_service
+
+    return {
+        AuditType.RECORDED_LINE_PHRASES: get_recorded_line_audit_service(),
+        AuditType.SECTION_BREAKDOWN: get_section_audit_service(),
+    }
+
+
+class _ResultWriter:
+    """Writes audited transcripts to a JSONL or Parquet file, rows are appended from one task at a time."""
+
+    def __init__(self, output: str, output_path: str):
+        self.output = output
+        self._file = None
+        self._parquet_writer = None
+        if output == "jsonl":
+            self._file = open(output_path, "wb")
+        elif output == "parquet":
+            from src.transcript_audit.parquet import ParquetBatchWriter
+
+            self._parquet_writer = ParquetBatchWriter(output_path)
+
+    def write(self, document: dict[str, Any]):
+        if self._file is not None:
+            self._file.write(TranscriptAuditResult.mongo_to_json(document) + b"\n")
+        elif self._parquet_writer is not None:
+            from src.transcript_audit.parquet import audit_result_to_row
+
+            self._parquet_writer.write(audit_result_to_row(document))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+class _Progress:
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+        self._logged_at = 0.0
+
+    def update(self, failed: bool):
+        self.done += 1
+        self.failed += int(failed)
+        now = time.monotonic()
+        # Note: Logged at most once per second so large runs don't flood the output
+        if now - self._logged_at >= 1:
+            self._logged_at = now
+            self.log()
+
+    def log(self):
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        logger.info(
+            "[audit_transcripts] %s/%s files, %.1f files/s, %s failed",
+            self.done,
+            self.total,
+            self.done / elapsed,
+            self.failed,
+        )
+
+
+async def _audit_file(
+    path: Path,
+    audit_types: list[AuditType],
+    output: str,
+    services: dict[AuditType, Any],
+) -> tuple[Optional[dict[str, Any]], bool]:
+    content = await asyncio.to_thread(path.read_bytes)
+    transcript_audit_result = parse_transcript(content, path.name, audit_types)
+
+    if output == "mongo":
+        from src.mongo_db import get_mongo_client
+
+        # Note: Stored first so the services persist results, stats and events as they do for the API
+        transcript_audit_result.id = await get_mongo_client().insert_one(
+            TranscriptAuditResult.collection_name(), transcript_audit_result.to_mongo()
+        )
+        results = await asyncio.gather(
+            *[
+                services[audit_type].audit(
+                    transcript_audit_result.id, transcript_audit_result.agent_name
+                )
+                for audit_type in audit_types
+            ],
+            return_exceptions=True,
+        )
+        return None, any(isinstance(result, Exception) for result in results)
+
+    results = await asyncio.gather(
+        *[
+            services[audit_type].run(
+                transcript_audit_result.conversation_history,
+                transcript_audit_result.agent_name,
+            )
+            for audit_type in audit_types
+        ],
+        return_exceptions=True,
+    )
+
+    audit_errors: dict[str, str] = {}
+    for audit_type, result in zip(audit_types, results):
+        if isinstance(result, Exception):
+            transcript_audit_result.status[audit_type] = AuditStatus.FAILED
+            audit_errors[audit_type.value] = str(result)
+        else:
+            transcript_audit_result.status[audit_type] = AuditStatus.COMPLETED
+            transcript_audit_result.audit_results[audit_type] = result
+            transcript_audit_result.audit_fingerprints[audit_type] = services[
+                audit_type
+            ].get_fingerprint()
+
+    # Note: Result files are for reading, the transcript is written uncompressed
+    document = transcript_audit_result.to_mongo(compress=False)
+    if audit_errors:
+        document["audit_errors"] = audit_errors
+    return document, bool(audit_errors)
+
+
+async def audit_transcripts(
+    files: list[Path],
+    audit_types: list[AuditType],
+    output: str,
+    output_path: Optional[str],
+    concurrency: int,
+):
+    if output == "mongo":
+        from src.mongo_db import close_mongo_db, init_mongo_db
+
+        await init_mongo_db()
+
+    services = _get_audit_services()
+    writer = _ResultWriter(output, output_path)
+    progress = _Progress(len(files))
+
+    queue: asyncio.Queue[Path] = asyncio.Queue()
+    for path in files:
+        queue.put_nowait(path)
+
+    async def worker():
+        while True:
+            try:
+                path = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            try:
+                document, failed = await _audit_file(path, audit_types, output, services)
+            except Exception as e:
+                logger.error("[audit_transcripts] Failed to audit %s: %s", path, e)
+                document, failed = None, True
+
+            if document is not None:
+                writer.write(document)
+            progress.update(failed)
+
+    try:
+        await asyncio.gather(*[worker() for _ in range(max(1, min(concurrency, len(files))))])
+    finally:
+        writer.close()
+        if output == "mongo":
+            await close_mongo_db()
+
+    progress.log()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Audit exported transcript files in bulk, without going through the API"
+    )
+    parser.add_argument("paths", nargs="+", help="Transcript files, directories or glob patterns")
+    parser.add_argument(
+        "--pattern",
+        default="*.json*",
+        help="File name pattern used when searching directories",
+    )
+    parser.add_argument(
+        "--audit-types",
+        nargs="+",
+        type=AuditType,
+        default=list(AuditType),
+        choices=list(AuditType),
+        metavar="AUDIT_TYPE",
+    )
+    parser.add_argument("--output", choices=OUTPUTS, default="mongo")
+    parser.add_argument("--output-path", default=None, help="Result file for jsonl and parquet output")
+    parser.add_argument("--concurrency", type=int, default=8, help="Transcripts audited at once")
+    args = parser.parse_args()
+
+    if args.output != "mongo" and not args.output_path:
+        parser.error(f"--output-path is required for {args.output} output")
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    files = collect_transcript_files(args.paths, args.pattern)
+    logger.info("[audit_transcripts] Auditing %s files", len(files))
+    asyncio.run(
+        audit_transcripts(
+            files, args.audit_types, args.output, args.output_path, args.concurrency
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+import logging
+from datetime import date
+from dotenv import load_dotenv
+from src.mongo_db import init_mongo_db, close_mongo_db
+from src.transcript_audit.services.stats_service import get_stats_service
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill_stats(start_date: date | None, end_date: date | None):
+    await init_mongo_db()
+    try:
+        await get_stats_service().backfill(start_date, end_date)
+    finally:
+        await close_mongo_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild the daily audit stats rollups from stored audit results"
+    )
+    parser.add_argument("--start-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(backfill_stats(args.start_date, args.end_date))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import asyncio
+import logging
+from datetime import timedelta
+from dotenv import load_dotenv
+from src.mongo_db import init_mongo_db, close_mongo_db
+from src.transcript_audit.services.export_service import get_export_service
+
+logger = logging.getLogger(__name__)
+
+
+async def export_audit_results(
+    output_dir: str, full: bool, in_progress_timeout: timedelta, batch_size: int
+):
+    await init_mongo_db()
+    try:
+        await get_export_service().export(output_dir, full, in_progress_timeout, batch_size)
+    finally:
+        await close_mongo_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export audit results to Parquet tables partitioned by org and date"
+    )
+    parser.add_argument("output_dir", help="Directory of the exported tables and the export watermark")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the saved watermark and export every audit, use with an empty output directory",
+    )
+    parser.add_argument(
+        "--in-progress-timeout-minutes",
+        type=float,
+        default=60,
+        help="Audits still pending or processing after this long are exported as they are",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(
+        export_audit_results(
+            args.output_dir,
+            args.full,
+            timedelta(minutes=args.in_progress_timeout_minutes),
+            args.batch_size,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import argparse
+import asyncio
+import logging
+from datetime import date, datetime
+from typing import Any, Optional
+from dotenv import load_dotenv
+from src.mongo_db import init_mongo_db, close_mongo_db, get_mongo_client
+from src.transcript_audit.models import TranscriptAuditResult
+from src.transcript_audit.schemas import AuditStatus, AuditType
+from src.transcript_audit.services.recorded_line_audit_service import (
+    get_recorded_line_audit_service,
+)
+from src.transcript_audit.services.section_audit_service import get_section_audit_service
+from src.transcript_audit.services.stats_service import get_stats_service
+
+logger = logging.getLogger(__name__)
+
+
+def get_audit_services() -> dict[AuditType, Any]:
+    return {
+        AuditType.RECORDED_LINE_PHRASES: get_recorded_line_audit_service(),
+        AuditType.SECTION_BREAKDOWN: get_section_audit_service(),
+    }
+
+
+def build_stale_query(
+    audit_type: AuditType,
+    current_fingerprint: str,
+    org_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> dict[str, Any]:
+    """Finished audits of `audit_type` produced with another fingerprint, or before fingerprints were stored."""
+    query: dict[str, Any] = {
+        "audit_types": audit_type.value,
+        f"audit_fingerprints.{audit_type.value}": {"$ne": current_fingerprint},
+        # Note: Pending and processing audits are about to be produced with the current fingerprint
+        f"status.{audit_type.value}": {"$in": [AuditStatus.COMPLETED.value, AuditStatus.FAILED.value]},
+    }
+    if org_id:
+        query["org_id"] = org_id
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lt"] = created_to
+    return query
+
+
+async def reaudit_transcripts(
+    audit_types: list[AuditType],
+    org_id: Optional[str],
+    created_from: Optional[datetime],
+    created_to: Optional[datetime],
+    limit: int,
+    concurrency: int,
+    dry_run: bool,
+):
+    """
+    Re-runs the audits whose stored fingerprint differs from the current one, leaving
+    up to date results alone. Steps whose own fingerprint still matches are reused by the
+    services, e.g. transfer indices when only the recorded line prompt changed.
+    """
+    await init_mongo_db()
+    try:
+        mongo_client = get_mongo_client()
+        services = get_audit_services()
+
+        queue: asyncio.Queue[tuple[str, str, datetime, AuditType]] = asyncio.Queue()
+        for audit_type in audit_types:
+            current_fingerprint = services[audit_type].get_fingerprint()
+            pipeline: list[dict[str, Any]] = [
+                {"$match": build_stale_query(audit_type, current_fingerprint, org_id, created_from, created_to)},
+                {"$project": {"agent_name": 1, "created_at": 1}},
+            ]
+            if limit:
+                pipeline.append({"$limit": limit})
+
+            stale = 0
+            async for document in mongo_client.stream_aggregate(
+                TranscriptAuditResult.collection_name(), pipeline
+            ):
+                queue.put_nowait(
+                    (document["_id"], document.get("agent_name", ""), document["created_at"], audit_type)
+                )
+                stale += 1
+            logger.info(
+                "[reaudit_transcripts] %s stale %s audits (current fingerprint %s)",
+                stale,
+                audit_type.value,
+                current_fingerprint,
+            )
+
+        if dry_run or queue.empty():
+            return
+
+        reaudited_dates: list[date] = []
+        failed = 0
+
+        async def worker():
+            nonlocal failed
+            while True:
+                try:
+                    transcript_audit_result_id, agent_name, created_at, audit_type = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    await services[audit_type].audit(
+                        transcript_audit_result_id, agent_name, record_stats=False, reaudit=True
+                    )
+                    reaudited_dates.append(created_at.date())
+                except Exception as e:
+                    failed += 1
+                    logger.error(
+                        "[reaudit_transcripts] Re-audit of %s for %s failed: %s",
+                        audit_type.value,
+                        transcript_audit_result_id,
+                        e,
+                    )
+
+        total = queue.qsize()
+        await asyncio.gather(*[worker() for _ in range(max(1, min(concurrency, total)))])
+        logger.info("[reaudit_transcripts] Re-audited %s/%s, %s failed", total - failed, total, failed)
+
+        # Note: Results were replaced, not added, so the affected days are recomputed from scratch
+        if reaudited_dates:
+            await get_stats_service().backfill(min(reaudited_dates), max(reaudited_dates))
+    finally:
+        await close_mongo_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-audit stored transcripts whose results are stale after a prompt, schema or model change"
+    )
+    parser.add_argument(
+        "--audit-types",
+        nargs="+",
+        type=AuditType,
+        default=list(AuditType),
+        choices=list(AuditType),
+        metavar="AUDIT_TYPE",
+    )
+    parser.add_argument("--org-id", default=None)
+    parser.add_argument("--created-from", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--created-to", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--limit", type=int, default=0, help="Stale audits per audit type, 0 for all")
+    parser.add_argument("--concurrency", type=int, default=8, help="Audits re-run at once")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the stale audits")
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(
+        reaudit_transcripts(
+            args.audit_types,
+            args.org_id,
+            args.created_from,
+            args.created_to,
+            args.limit,
+            args.concurrency,
+            args.dry_run,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
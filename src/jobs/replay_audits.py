@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Optional
+from dotenv import load_dotenv
+from src.mongo_db import init_mongo_db, close_mongo_db, get_mongo_client
+from src.transcript_audit.models import TranscriptAuditResult
+from src.transcript_audit.scheduler import estimate_audit_tokens, get_audit_scheduler
+from src.transcript_audit.schemas import AuditType
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[int(percentile) - 1]
+
+
+async def replay_audits(
+    org_id: Optional[str],
+    created_from: Optional[datetime],
+    created_to: Optional[datetime],
+    limit: int,
+):
+    """
+    Re-runs stored transcripts through the audit services and the scheduler, with model
+    responses served from an `OPENAI_RECORD_MODE=replay` recording, and logs throughput
+    and latency. Nothing is written back to MongoDB.
+    """
+    if os.getenv("OPENAI_RECORD_MODE") != "replay":
+        raise ValueError("Set OPENAI_RECORD_MODE=replay and OPENAI_RECORD_PATH to replay audits")
+
+    from src.transcript_audit.services.recorded_line_audit_service import (
+        get_recorded_line_audit_service,
+    )
+    from src.transcript_audit.services.section_audit_service import get_section_audit_service
+
+    services = {
+        AuditType.RECORDED_LINE_PHRASES: get_recorded_line_audit_service(),
+        AuditType.SECTION_BREAKDOWN: get_section_audit_service(),
+    }
+
+    await init_mongo_db()
+    try:
+        query: dict[str, Any] = {}
+        if org_id:
+            query["org_id"] = org_id
+        if created_from or created_to:
+            query["created_at"] = {}
+            if created_from:
+                query["created_at"]["$gte"] = created_from
+            if created_to:
+                query["created_at"]["$lt"] = created_to
+
+        mongo_client = get_mongo_client()
+        documents = await mongo_client.find_many(
+            TranscriptAuditResult.collection_name(),
+            query,
+            limit=limit,
+            sort=[("created_at", 1)],
+            read_preference=mongo_client.analytics_read_preference,
+        )
+    finally:
+        await close_mongo_db()
+
+    scheduler = get_audit_scheduler()
+    latencies: dict[AuditType, list[float]] = {audit_type: [] for audit_type in services}
+    failures: dict[AuditType, int] = {audit_type: 0 for audit_type in services}
+
+    async def replay(transcript_audit_result: TranscriptAuditResult, audit_type: AuditType):
+        conversation = transcript_audit_result.conversation_history
+        started_at = time.monotonic()
+        try:
+            await scheduler.run(
+                transcript_audit_result.org_id,
+                estimate_audit_tokens(conversation.contents),
+                services[audit_type].run(conversation, transcript_audit_result.agent_name),
+            )
+            latencies[audit_type].append(time.monotonic() - started_at)
+        except Exception as e:
+            logger.error(
+                "[replay_audits] %s of %s failed: %s",
+                audit_type.value,
+                transcript_audit_result.id,
+                e,
+            )
+            failures[audit_type] += 1
+
+    transcript_audit_results = [
+        TranscriptAuditResult.from_mongo(document) for document in documents
+    ]
+    started_at = time.monotonic()
+    await asyncio.gather(
+        *[
+            replay(transcript_audit_result, audit_type)
+            for transcript_audit_result in transcript_audit_results
+            for audit_type in transcript_audit_result.audit_types
+        ]
+    )
+    elapsed = time.monotonic() - started_at
+
+    logger.info(
+        "[replay_audits] Replayed %s transcripts in %.2fs (%.1f transcripts/s)",
+        len(transcript_audit_results),
+        elapsed,
+        len(transcript_audit_results) / max(elapsed, 1e-9),
+    )
+    for audit_type, audit_latencies in latencies.items():
+        logger.info(
+            "[replay_audits] %s: %s completed, %s failed, p50 %.3fs, p95 %.3fs",
+            audit_type.value,
+            len(audit_latencies),
+            failures[audit_type],
+            _percentile(audit_latencies, 50),
+            _percentile(audit_latencies, 95),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay stored transcripts through the audit services against recorded model responses"
+    )
+    parser.add_argument("--org-id", default=None)
+    parser.add_argument("--created-from", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--created-to", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(replay_audits(args.org_id, args.created_from, args.created_to, args.limit))
+
+
+if __name__ == "__main__":
+    main()
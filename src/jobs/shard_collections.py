@@ -0,0 +1,47 @@
+import asyncio
+import logging
+from dotenv import load_dotenv
+from src.mongo_db import init_mongo_db, close_mongo_db, get_mongo_client
+from src.transcript_audit.models import TranscriptAuditResult, TranscriptAuditDailyStats
+
+logger = logging.getLogger(__name__)
+
+SHARDED_MODELS = [TranscriptAuditResult, TranscriptAuditDailyStats]
+
+
+async def shard_collections():
+    """
+    Enables sharding for the database and shards the audit collections by their `org_id`
+    prefixed shard keys. Must run against a mongos, collections already sharded are skipped.
+    """
+    await init_mongo_db()
+    try:
+        mongo_client = get_mongo_client()
+        admin = mongo_client.client.admin
+        database_name = mongo_client.database_name
+
+        await admin.command("enableSharding", database_name)
+
+        for model in SHARDED_MODELS:
+            namespace = f"{database_name}.{model.collection_name()}"
+            collection_info = await mongo_client.client.config.collections.find_one(
+                {"_id": namespace}
+            )
+            if collection_info:
+                logger.info("[shard_collections] %s is already sharded by %s", namespace, collection_info.get("key"))
+                continue
+
+            await admin.command("shardCollection", namespace, key=model.shard_key())
+            logger.info("[shard_collections] Sharded %s by %s", namespace, model.shard_key())
+    finally:
+        await close_mongo_db()
+
+
+def main():
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(shard_collections())
+
+
+if __name__ == "__main__":
+    main()
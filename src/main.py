@@ -1,29 +1,85 @@
+import asyncio
+import importlib
+import os
+import time
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from src.transcript_audit.router import router as transcript_router
 import logging
-from src.mongo_db import init_mongo_db, close_mongo_db
+from src.mongo_db import init_mongo_db, close_mongo_db, get_mongo_client
+from src.profiling import JsonLogFormatter, get_slow_request_ms, get_stack_sampler, trace
+from src.openai_client.limiter import get_llm_limiter
+from src.transcript_audit.result_cache import get_audit_result_cache
+from src.transcript_audit.scheduler import get_audit_scheduler
+from src.transcript_audit.tasks import (
+    ensure_indexes as ensure_task_indexes,
+    get_audit_task_registry,
+    run_requeued_audit_resumer,
+)
+from src.transcript_audit.services.search_service import get_search_service
+from src.transcript_audit.services.stats_service import get_stats_service
 
 load_dotenv()
 
+log_handler = logging.StreamHandler()
+# Note: One JSON object per line, with the fields passed to the logger with `extra`
+if os.getenv("LOG_FORMAT", "text") == "json":
+    log_handler.setFormatter(JsonLogFormatter())
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s %(message)s',
     handlers=[
-        logging.StreamHandler()
+        log_handler
     ]
 )
 
 logger = logging.getLogger(__name__)
 
+AUDIT_DRAIN_TIMEOUT_SECONDS = float(os.getenv("AUDIT_DRAIN_TIMEOUT_SECONDS", "60"))
+AUDIT_RESUME_INTERVAL_SECONDS = float(os.getenv("AUDIT_RESUME_INTERVAL_SECONDS", "30"))
+
+
+async def warm_up():
+    """
+    Connects to MongoDB, ensures indexes and loads the OpenAI SDK once the worker is
+    already accepting requests, so none of it delays startup.
+    """
+    started_at = time.perf_counter()
+    try:
+        await get_mongo_client().ping()
+        await get_search_service().ensure_indexes()
+        await get_stats_service().ensure_indexes()
+        await ensure_task_indexes()
+    except Exception as e:
+        logger.error("Failed to warm up MongoDB: %s", e)
+
+    await asyncio.to_thread(importlib.import_module, "openai")
+    logger.info("Warm-up finished in %.0fms", (time.perf_counter() - started_at) * 1000)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Note: Runs once per worker process, so every worker gets its own MongoDB connection pool
+    started_at = time.perf_counter()
     logger.info("Initializing MongoDB client")
-    await init_mongo_db()
+    await init_mongo_db(ping=False)
+    get_mongo_client().add_write_listener(get_audit_result_cache().on_write)
+    get_stack_sampler().start()
+    warm_up_task = asyncio.create_task(warm_up())
+    resumer = asyncio.create_task(run_requeued_audit_resumer(AUDIT_RESUME_INTERVAL_SECONDS))
+    logger.info("Startup finished in %.0fms", (time.perf_counter() - started_at) * 1000)
     yield
-
+    warm_up_task.cancel()
+    resumer.cancel()
+    logger.info("Draining running audits")
+    await get_audit_task_registry().drain(timeout=AUDIT_DRAIN_TIMEOUT_SECONDS)
+    logger.info("Closing MongoDB client")
+    await close_mongo_db()
+    get_stack_sampler().stop()
 
 
 app = FastAPI(
@@ -41,6 +97,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Note: Audit listings carry whole transcripts, compressed for clients sending Accept-Encoding: gzip
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv("GZIP_MINIMUM_SIZE", "1000")),
+    compresslevel=6,
+)
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    # Note: Profiled when PROFILING_SLOW_REQUEST_MS is set, or for a single request with `X-Profile: 1`
+    with trace(
+        f"{request.method} {request.url.path}",
+        get_slow_request_ms(),
+        force=request.headers.get("x-profile") == "1",
+    ):
+        return await call_next(request)
+
+
 # Include routers
 app.include_router(transcript_router, prefix="/api/v1", tags=["transcript"])
 
@@ -54,7 +128,26 @@ async def root():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Concurrency and cache state of this worker"""
+    return {
+        "llm_concurrency": get_llm_limiter().metrics(),
+        "audit_scheduler": get_audit_scheduler().metrics(),
+        "audit_result_cache": get_audit_result_cache().metrics(),
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run(
+        "src.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=workers,
+        # Note: Leave room for the lifespan drain after in-flight requests are given up on
+        timeout_graceful_shutdown=int(AUDIT_DRAIN_TIMEOUT_SECONDS),
+    )
 
@@ -8,7 +8,7 @@ def get_mongo_client() -> MongoDBClient:
         raise RuntimeError("MongoDB client not initialized. Call init_mongo_db() first.")
     return _mongo_client
 
-async def init_mongo_db():
+async def init_mongo_db(ping: bool = True):
     global _mongo_client
     
     if _mongo_client is not None:
@@ -16,12 +16,14 @@ async def init_mongo_db():
         
     _mongo_client = MongoDBClient()
 
-    await _mongo_client.ping()
+    # Note: The client connects lazily, skip the ping to warm the connection up in the background
+    if ping:
+        await _mongo_client.ping()
         
     return _mongo_client
 
 async def close_mongo_db():
     global _mongo_client
     if _mongo_client is not None:
-        _mongo_client.close()
+        await _mongo_client.close()
         _mongo_client = None
\ No newline at end of file
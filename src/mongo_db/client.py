@@ -1,9 +1,56 @@
 import os
-from typing import Optional, Dict, Any, List
-from pymongo import AsyncMongoClient
+from typing import AsyncIterator, Callable, Optional, Dict, Any, List, Union
+from pymongo import AsyncMongoClient, ReturnDocument
 from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
+from pymongo.write_concern import WriteConcern
 from bson.objectid import ObjectId
+from src.profiling import span
+from .write_buffer import WriteBuffer
+
+ReadPreference = Union[Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest]
+
+READ_PREFERENCE_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+# Note: Env variable -> AsyncMongoClient option, only passed when set so URI options still apply
+CLIENT_OPTIONS_FROM_ENV = {
+    "MONGODB_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGODB_MIN_POOL_SIZE": "minPoolSize",
+    "MONGODB_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+    "MONGODB_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+    "MONGODB_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGODB_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+    "MONGODB_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+}
+
+# Note: Incremented by every buffered write, so a document's version changes whenever it does
+VERSION_FIELD = "version"
+
+
+def _analytics_read_preference() -> ReadPreference:
+    mode = os.getenv("MONGODB_ANALYTICS_READ_PREFERENCE", "secondaryPreferred")
+    if mode not in READ_PREFERENCE_MODES:
+        raise ValueError(f"Unknown MongoDB read preference: {mode}")
+    if mode == "primary":
+        return Primary()
+
+    max_staleness = os.getenv("MONGODB_ANALYTICS_MAX_STALENESS_SECONDS")
+    return READ_PREFERENCE_MODES[mode](
+        max_staleness=int(max_staleness) if max_staleness else -1
+    )
 
 
 class MongoDBClient:
@@ -20,23 +67,67 @@ class MongoDBClient:
                 "Database name not found. Please set the MONGODB_DATABASE_NAME environment variable."
             )
         
-        self.client: AsyncMongoClient = AsyncMongoClient(self.connection_string)
+        client_options = {
+            option: int(os.environ[env_variable])
+            for env_variable, option in CLIENT_OPTIONS_FROM_ENV.items()
+            if os.getenv(env_variable)
+        }
+        self.client: AsyncMongoClient = AsyncMongoClient(self.connection_string, **client_options)
         self.db: AsyncDatabase = self.client.get_database(self.database_name)
+
+        # Note: For listings and stats, which can tolerate slightly stale data, keeps them off the primary
+        self.analytics_read_preference = _analytics_read_preference()
+
+        write_concern = os.getenv("MONGODB_WRITE_CONCERN")
+        self.write_buffer = WriteBuffer(
+            self.get_collection,
+            max_batch_size=int(os.getenv("MONGODB_WRITE_BATCH_SIZE", "100")),
+            flush_interval_ms=float(os.getenv("MONGODB_WRITE_FLUSH_INTERVAL_MS", "50")),
+            write_concern=(
+                WriteConcern(w=int(write_concern) if write_concern.isdigit() else write_concern)
+                if write_concern
+                else None
+            ),
+            version_field=VERSION_FIELD,
+            on_write=self._notify_write,
+        )
+        self._write_listeners: List[Callable[[str, str], None]] = []
+
+    def add_write_listener(self, listener: Callable[[str, str], None]):
+        """
+        Calls `listener(collection_name, document_id)` after every update this client makes
+        to a document by id, e.g. to invalidate cached copies of it.
+        """
+        self._write_listeners.append(listener)
+
+    def _notify_write(self, collection_name: str, document_id: Any):
+        for listener in self._write_listeners:
+            listener(collection_name, str(document_id))
     
-    def get_collection(self, collection_name: str) -> AsyncCollection:
-        return self.db.get_collection(collection_name)
+    def get_collection(
+        self, collection_name: str, read_preference: Optional[ReadPreference] = None
+    ) -> AsyncCollection:
+        return self.db.get_collection(collection_name, read_preference=read_preference)
     
     async def insert_one(self, collection_name: str, document: Dict[str, Any]) -> str:
         collection = self.get_collection(collection_name)
-        result = await collection.insert_one(document)
+        with span("mongo.insert_one", collection=collection_name):
+            result = await collection.insert_one(document)
         return str(result.inserted_id)
     
-    async def find_one(self, collection_name: str, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def find_one(
+        self,
+        collection_name: str,
+        query: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        read_preference: Optional[ReadPreference] = None,
+    ) -> Optional[Dict[str, Any]]:
         if "_id" in query and query["_id"] is not None and isinstance(query["_id"], str):
             query["_id"] = ObjectId(query["_id"])
 
-        collection = self.get_collection(collection_name)
-        document = await collection.find_one(query)
+        collection = self.get_collection(collection_name, read_preference)
+        with span("mongo.find_one", collection=collection_name):
+            document = await collection.find_one(query, projection)
 
         if document and "_id" in document:
             document["_id"] = str(document["_id"])
@@ -50,13 +141,15 @@ class MongoDBClient:
         query: Dict[str, Any], 
         limit: Optional[int] = None,
         skip: Optional[int] = None,
-        sort: Optional[List[tuple]] = None
+        sort: Optional[List[tuple]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        read_preference: Optional[ReadPreference] = None,
     ) -> List[Dict[str, Any]]:
         if "_id" in query and query["_id"] is not None and isinstance(query["_id"], str):
             query["_id"] = ObjectId(query["_id"])
 
-        collection = self.get_collection(collection_name)
-        cursor = collection.find(query)
+        collection = self.get_collection(collection_name, read_preference)
+        cursor = collection.find(query, projection)
         
         if skip:
             cursor = cursor.skip(skip)
@@ -65,7 +158,8 @@ class MongoDBClient:
         if sort:
             cursor = cursor.sort(sort)
         
-        documents = await cursor.to_list(length=limit)
+        with span("mongo.find_many", collection=collection_name):
+            documents = await cursor.to_list(length=limit)
         for document in documents:
             if "_id" in document:
                 document["_id"] = str(document["_id"])
@@ -75,15 +169,54 @@ class MongoDBClient:
         self, 
         collection_name: str, 
         query: Dict[str, Any], 
-        update: Dict[str, Any]
+        update: Dict[str, Any],
+        upsert: bool = False,
     ) -> int:
         if "_id" in query and query["_id"] is not None and isinstance(query["_id"], str):
             query["_id"] = ObjectId(query["_id"])
 
         collection = self.get_collection(collection_name)
-        result = await collection.update_one(query, update)
+        with span("mongo.update_one", collection=collection_name):
+            result = await collection.update_one(query, update, upsert=upsert)
+        if query.get("_id") is not None:
+            self._notify_write(collection_name, query["_id"])
         return result.modified_count
     
+    async def find_one_and_update(
+        self,
+        collection_name: str,
+        query: Dict[str, Any],
+        update: Dict[str, Any],
+        return_document: bool = ReturnDocument.BEFORE,
+    ) -> Optional[Dict[str, Any]]:
+        if "_id" in query and query["_id"] is not None and isinstance(query["_id"], str):
+            query["_id"] = ObjectId(query["_id"])
+
+        collection = self.get_collection(collection_name)
+        with span("mongo.find_one_and_update", collection=collection_name):
+            document = await collection.find_one_and_update(
+                query, update, return_document=return_document
+            )
+
+        if document and "_id" in document:
+            self._notify_write(collection_name, document["_id"])
+            document["_id"] = str(document["_id"])
+
+        return document
+
+    async def buffered_set(
+        self,
+        collection_name: str,
+        document_id: str,
+        fields: Dict[str, Any],
+        wait: bool = True,
+    ):
+        """
+        `$set` through the write-behind buffer. Concurrent updates to the same document are
+        coalesced into a single write and flushed with other documents as one `bulk_write`.
+        """
+        await self.write_buffer.set(collection_name, document_id, fields, wait=wait)
+
     async def delete_one(self, collection_name: str, query: Dict[str, Any]) -> int:
         if "_id" in query and query["_id"] is not None and isinstance(query["_id"], str):
             query["_id"] = ObjectId(query["_id"])
@@ -92,13 +225,55 @@ class MongoDBClient:
         result = await collection.delete_one(query)
         return result.deleted_count
     
-    async def count_documents(self, collection_name: str, query: Dict[str, Any]) -> int:
-        collection = self.get_collection(collection_name)
-        return await collection.count_documents(query)
+    async def count_documents(
+        self,
+        collection_name: str,
+        query: Dict[str, Any],
+        read_preference: Optional[ReadPreference] = None,
+    ) -> int:
+        collection = self.get_collection(collection_name, read_preference)
+        with span("mongo.count_documents", collection=collection_name):
+            return await collection.count_documents(query)
     
-    def close(self):
-        self.client.close()
+    async def aggregate(
+        self,
+        collection_name: str,
+        pipeline: List[Dict[str, Any]],
+        read_preference: Optional[ReadPreference] = None,
+    ) -> List[Dict[str, Any]]:
+        collection = self.get_collection(collection_name, read_preference)
+        with span("mongo.aggregate", collection=collection_name):
+            cursor = await collection.aggregate(pipeline)
+            return await cursor.to_list()
+
+    async def stream_aggregate(
+        self,
+        collection_name: str,
+        pipeline: List[Dict[str, Any]],
+        batch_size: int = 1000,
+        read_preference: Optional[ReadPreference] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        # Note: Yields documents as the cursor's batches arrive instead of loading the whole result
+        collection = self.get_collection(collection_name, read_preference)
+        cursor = await collection.aggregate(pipeline, batchSize=batch_size)
+        try:
+            async for document in cursor:
+                if "_id" in document:
+                    document["_id"] = str(document["_id"])
+                yield document
+        finally:
+            await cursor.close()
+
+    async def create_index(
+        self, collection_name: str, keys: List[tuple], **kwargs: Any
+    ) -> str:
+        collection = self.get_collection(collection_name)
+        return await collection.create_index(keys, **kwargs)
+
+    async def close(self):
+        await self.write_buffer.close()
+        await self.client.close()
 
-    def ping(self):
-        return self.client.admin.command("ping")
+    async def ping(self):
+        return await self.client.admin.command("ping")
 
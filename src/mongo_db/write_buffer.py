@@ -0,0 +1,171 @@
+import asyncio
+import copy
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.write_concern import WriteConcern
+
+logger = logging.getLogger(__name__)
+
+
+def merge_set_fields(fields: Dict[str, Any], key: str, value: Any):
+    """
+    Merges one `$set` path into an accumulated `$set` document without creating paths
+    that conflict in MongoDB (e.g. `a` together with `a.b`). Later writes win.
+    """
+    for existing_key in [k for k in fields if k.startswith(f"{key}.")]:
+        del fields[existing_key]
+
+    for existing_key, existing_value in fields.items():
+        if key.startswith(f"{existing_key}.") and isinstance(existing_value, dict):
+            nested = copy.deepcopy(existing_value)
+            target = nested
+            parts = key[len(existing_key) + 1 :].split(".")
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+            fields[existing_key] = nested
+            return
+
+    fields[key] = value
+
+
+class WriteBuffer:
+    """
+    Write-behind buffer that coalesces `$set` updates per document and flushes them as
+    `bulk_write` batches once `max_batch_size` updates are pending or `flush_interval_ms`
+    has passed since the first pending update.
+
+    With `version_field` every flushed write also increments that field, once per write
+    however many updates it coalesced. `on_write` is called with the collection name and
+    document id of every document a flush wrote to.
+    """
+
+    def __init__(
+        self,
+        get_collection: Callable[[str], AsyncCollection],
+        max_batch_size: int = 100,
+        flush_interval_ms: float = 50,
+        write_concern: Optional[WriteConcern] = None,
+        version_field: Optional[str] = None,
+        on_write: Optional[Callable[[str, str], None]] = None,
+    ):
+        self.get_collection = get_collection
+        self.max_batch_size = max_batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.write_concern = write_concern
+        self.version_field = version_field
+        self.on_write = on_write
+
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._pending_updates = 0
+        self._waiters: List[asyncio.Future] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set[asyncio.Task] = set()
+        # Note: One flush at a time, an older batch landing after a newer one would undo its updates
+        self._flush_lock = asyncio.Lock()
+
+    async def set(
+        self,
+        collection_name: str,
+        document_id: str,
+        fields: Dict[str, Any],
+        wait: bool = True,
+    ):
+        """
+        Buffers a `$set` for a document. With `wait` the call returns once the batch
+        containing the update has been written, otherwise it returns immediately.
+        """
+        pending_fields = self._pending.setdefault((collection_name, str(document_id)), {})
+        for key, value in fields.items():
+            merge_set_fields(pending_fields, key, value)
+        self._pending_updates += 1
+
+        waiter: Optional[asyncio.Future] = None
+        if wait:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+
+        if self._pending_updates >= self.max_batch_size:
+            self._schedule_flush(0)
+        elif self._flush_handle is None:
+            self._schedule_flush(self.flush_interval_ms / 1000)
+
+        if waiter is not None:
+            await waiter
+
+    def _schedule_flush(self, delay: float):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+
+        loop = asyncio.get_running_loop()
+        self._flush_handle = loop.call_later(delay, self._start_flush)
+
+    def _start_flush(self):
+        self._flush_handle = None
+        task = asyncio.create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        async with self._flush_lock:
+            await self._flush_pending()
+
+    async def _flush_pending(self):
+        # Note: Taken under the lock, updates buffered while the previous flush was writing go out together
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        waiters, self._waiters = self._waiters, []
+        coalesced_updates, self._pending_updates = self._pending_updates, 0
+
+        operations_by_collection: Dict[str, List[UpdateOne]] = {}
+        for (collection_name, document_id), fields in pending.items():
+            update: Dict[str, Any] = {"$set": fields}
+            if self.version_field is not None:
+                update["$inc"] = {self.version_field: 1}
+            operations_by_collection.setdefault(collection_name, []).append(
+                UpdateOne({"_id": ObjectId(document_id)}, update)
+            )
+
+        error: Optional[BaseException] = None
+        for collection_name, operations in operations_by_collection.items():
+            collection = self.get_collection(collection_name)
+            if self.write_concern is not None:
+                collection = collection.with_options(write_concern=self.write_concern)
+            try:
+                await collection.bulk_write(operations, ordered=False)
+            except Exception as e:
+                logger.error("[WriteBuffer.flush] Error writing to %s: %s", collection_name, e)
+                error = e
+
+        # Note: Also called after a failed write, which may have applied part of the batch
+        if self.on_write is not None:
+            for collection_name, document_id in pending:
+                self.on_write(collection_name, document_id)
+
+        logger.debug(
+            "[WriteBuffer.flush] Coalesced %s updates into %s writes",
+            coalesced_updates,
+            len(pending),
+        )
+
+        for waiter in waiters:
+            if waiter.done():
+                continue
+            if error is not None:
+                waiter.set_exception(error)
+            else:
+                waiter.set_result(None)
+
+    async def close(self):
+        await self.flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
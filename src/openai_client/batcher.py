@@ -0,0 +1,210 @@
+import asyncio
+import json
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from openai.types.responses import ResponseInputParam
+    from .client import OpenAIClient
+
+logger = logging.getLogger(__name__)
+
+BATCH_INSTRUCTIONS = """
+
+# Batched requests
+You will receive several independent requests, each wrapped in a <request id="..."> block.
+Handle every request on its own, exactly as if it was the only input, following the instructions above.
+Return one entry in "responses" per request with its "request_id" and the "response" for that request.
+"""
+
+
+class _PendingRequest:
+    __slots__ = ("content", "future")
+
+    def __init__(self, content: str, future: asyncio.Future):
+        self.content = content
+        self.future = future
+
+
+class MicroBatcher:
+    """
+    Collects compatible `generate_response` calls (same model, system prompt, temperature
+    and JSON schema response format) for `window_ms` and sends them as a single request
+    whose schema returns one response per caller. Responses are demultiplexed back to the
+    waiting callers; requests that can't be batched or whose batched response is missing
+    are sent on their own.
+    """
+
+    def __init__(self, openai_client: "OpenAIClient", window_ms: float, max_batch_size: int):
+        self.openai_client = openai_client
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+
+        self._pending: Dict[Tuple[str, float, str], List[_PendingRequest]] = {}
+        self._timers: Dict[Tuple[str, float, str], asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def _batchable_content(
+        messages: "ResponseInputParam", response_format: Optional[Dict[str, Any]]
+    ) -> Optional[str]:
+        if not response_format or response_format.get("type") != "json_schema":
+            return None
+        if len(messages) != 1:
+            return None
+
+        message = messages[0]
+        if message.get("role") != "user" or not isinstance(message.get("content"), str):
+            return None
+        return message["content"]
+
+    async def submit(
+        self,
+        system_prompt: str,
+        messages: "ResponseInputParam",
+        temperature: float,
+        response_format: Optional[Dict[str, Any]],
+    ) -> str:
+        content = self._batchable_content(messages, response_format)
+        if content is None:
+            return await self.openai_client._create_response(
+                system_prompt, messages, temperature, response_format
+            )
+
+        key = (system_prompt, temperature, json.dumps(response_format, sort_keys=True))
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append(_PendingRequest(content, future))
+
+        if len(pending) >= self.max_batch_size:
+            self._dispatch(key, response_format)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.get_running_loop().call_later(
+                self.window_ms / 1000, self._dispatch, key, response_format
+            )
+
+        return await future
+
+    def _dispatch(self, key: Tuple[str, float, str], response_format: Dict[str, Any]):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        # Note: Callers cancelled while waiting for the window cancel their future, don't send them
+        requests = [request for request in self._pending.pop(key, []) if not request.future.done()]
+        if not requests:
+            return
+
+        task = asyncio.create_task(self._send(key[0], key[1], response_format, requests))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _batched_response_format(response_format: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "type": "json_schema",
+            "name": f"batched_{response_format['name']}",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "responses": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "request_id": {"type": "integer"},
+                                "response": response_format["schema"],
+                            },
+                            "required": ["request_id", "response"],
+                            "additionalProperties": False,
+                        },
+                    }
+                },
+                "required": ["responses"],
+                "additionalProperties": False,
+            },
+        }
+
+    async def _send_single(
+        self,
+        system_prompt: str,
+        temperature: float,
+        response_format: Dict[str, Any],
+        request: _PendingRequest,
+    ):
+        try:
+            response = await self.openai_client._create_response(
+                system_prompt,
+                [{"role": "user", "content": request.content}],
+                temperature,
+                response_format,
+            )
+            if not request.future.done():
+                request.future.set_result(response)
+        except Exception as e:
+            if not request.future.done():
+                request.future.set_exception(e)
+
+    async def _send(
+        self,
+        system_prompt: str,
+        temperature: float,
+        response_format: Dict[str, Any],
+        requests: List[_PendingRequest],
+    ):
+        if len(requests) == 1:
+            await self._send_single(system_prompt, temperature, response_format, requests[0])
+            return
+
+        user_prompt = "\n".join(
+            f'<request id="{request_id}">\n{request.content}\n</request>'
+            for request_id, request in enumerate(requests)
+        )
+
+        responses: Dict[int, Any] = {}
+        try:
+            batched_response = await self.openai_client._create_response(
+                system_prompt + BATCH_INSTRUCTIONS,
+                [{"role": "user", "content": user_prompt}],
+                temperature,
+                self._batched_response_format(response_format),
+            )
+            for entry in json.loads(batched_response)["responses"]:
+                responses[entry["request_id"]] = entry["response"]
+        except Exception as e:
+            logger.warning("[MicroBatcher._send] Batched request failed, sending individually: %s", e)
+
+        fallbacks = []
+        for request_id, request in enumerate(requests):
+            # Note: Callers cancelled while the batch was in flight have nothing left to answer
+            if request.future.done():
+                continue
+            if request_id in responses:
+                request.future.set_result(json.dumps(responses[request_id]))
+            else:
+                fallbacks.append(
+                    self._send_single(system_prompt, temperature, response_format, request)
+                )
+
+        logger.info(
+            "[MicroBatcher._send] Batched %s requests, %s sent individually",
+            len(requests),
+            len(fallbacks),
+        )
+        await asyncio.gather(*fallbacks)
+
+
+_micro_batchers: Dict[Tuple[str, str], MicroBatcher] = {}
+
+
+def get_micro_batcher(openai_client: "OpenAIClient") -> MicroBatcher:
+    # Note: Shared per model and key so calls from different requests and services batch together
+    key = (openai_client.model, openai_client.api_key)
+    if key not in _micro_batchers:
+        _micro_batchers[key] = MicroBatcher(
+            openai_client,
+            window_ms=openai_client.micro_batch_window_ms,
+            max_batch_size=openai_client.micro_batch_max_size,
+        )
+    return _micro_batchers[key]
@@ -1,25 +1,110 @@
 import os
-from typing import List, Dict, Optional, Any
-from openai import AsyncOpenAI
-from openai.types.responses import ResponseInputParam
+import time
+from typing import TYPE_CHECKING, List, Dict, Optional, Any
+from src.profiling import span
+from .batcher import get_micro_batcher
+from .limiter import get_llm_limiter
+from .recorder import get_record_replay, request_key
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+    from openai.types.responses import ResponseInputParam
 
 
 class OpenAIClient:
     def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini"):
+        self.model = model
+        self.adaptive_concurrency = (
+            os.getenv("OPENAI_ADAPTIVE_CONCURRENCY", "true").lower() == "true"
+        )
+
+        # Note: Recording or replaying responses is off unless OPENAI_RECORD_MODE is set
+        self.record_replay = get_record_replay()
+        if self.record_replay is not None and self.record_replay.mode == "replay":
+            # Note: Replays are served from the recording, so no key or connection is needed
+            self.api_key = api_key
+            self.client: Optional["AsyncOpenAI"] = None
+            self.micro_batch_window_ms = 0.0
+            return
+
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError(
                 "OpenAI API key not found. Please provide it as a parameter "
                 "or set the OPENAI_API_KEY environment variable."
             )
-        
-        self.client: AsyncOpenAI = AsyncOpenAI(api_key=self.api_key)
-        self.model = model
-    
+
+        # Note: Imported on first use, the openai package is most of the API's import time
+        from openai import AsyncOpenAI
+
+        self.client = AsyncOpenAI(api_key=self.api_key)
+
+        # Note: Micro-batching of concurrent structured-output requests is off unless a window is set
+        self.micro_batch_window_ms = float(os.getenv("OPENAI_MICRO_BATCH_WINDOW_MS", "0"))
+        self.micro_batch_max_size = int(os.getenv("OPENAI_MICRO_BATCH_MAX_SIZE", "8"))
+
     async def generate_response(
         self,
         system_prompt: str,
-        messages: ResponseInputParam,
+        messages: "ResponseInputParam",
+        temperature: float = 0,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        with span("openai.generate_response", model=self.model):
+            if not self.adaptive_concurrency:
+                return await self._record_or_replay(
+                    system_prompt, messages, temperature, response_format
+                )
+
+            # Note: Shared by every model's client, they all draw on the same upstream capacity
+            async with get_llm_limiter().slot():
+                return await self._record_or_replay(
+                    system_prompt, messages, temperature, response_format
+                )
+
+    async def _record_or_replay(
+        self,
+        system_prompt: str,
+        messages: "ResponseInputParam",
+        temperature: float = 0,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        if self.record_replay is None:
+            return await self._generate_response(
+                system_prompt, messages, temperature, response_format
+            )
+
+        key = request_key(self.model, system_prompt, messages, temperature, response_format)
+        if self.record_replay.mode == "replay":
+            return await self.record_replay.replay(key)
+
+        started_at = time.monotonic()
+        output_text = await self._generate_response(
+            system_prompt, messages, temperature, response_format
+        )
+        self.record_replay.record(key, self.model, output_text, time.monotonic() - started_at)
+        return output_text
+
+    async def _generate_response(
+        self,
+        system_prompt: str,
+        messages: "ResponseInputParam",
+        temperature: float = 0,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        if self.micro_batch_window_ms > 0:
+            return await get_micro_batcher(self).submit(
+                system_prompt, messages, temperature, response_format
+            )
+
+        return await self._create_response(
+            system_prompt, messages, temperature, response_format
+        )
+
+    async def _create_response(
+        self,
+        system_prompt: str,
+        messages: "ResponseInputParam",
         temperature: float = 0,
         response_format: Optional[Dict[str, Any]] = None,
     ) -> str:
@@ -29,11 +114,20 @@ class OpenAIClient:
             "input": messages,
             "temperature": temperature,
         }
-        
+
         if response_format is not None:
             kwargs["text"] = {"format": response_format}
-        
+
         response = await self.client.responses.create(**kwargs)
-        
+
         return response.output_text
 
+
+_openai_clients: Dict[str, OpenAIClient] = {}
+
+
+def get_openai_client(model: str = "gpt-4o-mini") -> OpenAIClient:
+    # Note: Shared per model so the underlying HTTP connection pool is reused across requests
+    if model not in _openai_clients:
+        _openai_clients[model] = OpenAIClient(model=model)
+    return _openai_clients[model]
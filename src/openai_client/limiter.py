@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Note: Matched by name so the openai package isn't imported just to classify errors
+OVERLOAD_ERRORS = {"RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError"}
+
+
+class _TranscriptScope:
+    __slots__ = ("in_flight",)
+
+    def __init__(self):
+        self.in_flight = 0
+
+
+_transcript_scope: ContextVar[Optional[_TranscriptScope]] = ContextVar(
+    "llm_transcript_scope", default=None
+)
+
+
+def is_overload_error(error: BaseException) -> bool:
+    return type(error).__name__ in OVERLOAD_ERRORS or isinstance(error, asyncio.TimeoutError)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits the LLM calls in flight in this worker and tunes the limit from their latency,
+    in the style of the gradient limiters:
+
+    - A short and a long moving average of the call latency are kept. While the short one
+      stays within `tolerance` times the long one the limit grows by about its square root
+      per call, once it climbs above that the limit shrinks with the ratio of the two, so
+      it settles where adding calls starts queueing them upstream.
+    - Rate limit, timeout and server errors cut the limit by `backoff_ratio`.
+
+    Calls made inside a `transcript_scope` are also held to `transcript_share` of the
+    limit, so one transcript with many transfers can't take every slot.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = 16,
+        min_limit: float = 2,
+        max_limit: float = 128,
+        transcript_share: float = 0.25,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        backoff_ratio: float = 0.9,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.transcript_share = transcript_share
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.backoff_ratio = backoff_ratio
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.successes = 0
+        self.overloads = 0
+        self.short_latency: Optional[float] = None
+        self.long_latency: Optional[float] = None
+
+        self._condition: Optional[asyncio.Condition] = None
+        self._condition_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def transcript_limit(self) -> int:
+        return max(1, int(self.limit * self.transcript_share))
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+        return self._condition
+
+    @contextmanager
+    def transcript_scope(self) -> Iterator[None]:
+        """Counts the LLM calls made inside the block, including its child tasks, as one transcript's."""
+        token = _transcript_scope.set(_TranscriptScope())
+        try:
+            yield
+        finally:
+            _transcript_scope.reset(token)
+
+    def _has_slot(self, scope: Optional[_TranscriptScope]) -> bool:
+        if self.in_flight >= max(1, int(self.limit)):
+            return False
+        return scope is None or scope.in_flight < self.transcript_limit
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Waits for a free slot, then times the call made in the block to adjust the limit."""
+        scope = _transcript_scope.get()
+        condition = self._get_condition()
+
+        async with condition:
+            self.waiting += 1
+            try:
+                await condition.wait_for(lambda: self._has_slot(scope))
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            if scope is not None:
+                scope.in_flight += 1
+
+        started_at = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            if is_overload_error(e):
+                self._on_overload(e)
+            raise
+        else:
+            self._on_success(time.monotonic() - started_at)
+        finally:
+            self.in_flight -= 1
+            if scope is not None:
+                scope.in_flight -= 1
+            async with condition:
+                condition.notify_all()
+
+    def _on_success(self, latency: float):
+        self.successes += 1
+        if self.short_latency is None or self.long_latency is None:
+            self.short_latency = self.long_latency = latency
+            return
+
+        self.short_latency = 0.7 * self.short_latency + 0.3 * latency
+        self.long_latency = 0.98 * self.long_latency + 0.02 * latency
+        # Note: Once upstream has been slow for a while, lower the baseline faster when it recovers
+        if self.long_latency > 2 * self.short_latency:
+            self.long_latency *= 0.95
+
+        gradient = max(0.5, min(1.0, self.tolerance * self.long_latency / self.short_latency))
+        new_limit = self.limit * gradient + math.sqrt(self.limit)
+        # Note: Calls that never fill the limit say nothing about a higher one, don't grow past them
+        if new_limit > self.limit and self.in_flight < self.limit / 2:
+            return
+        self._set_limit(self.limit * (1 - self.smoothing) + new_limit * self.smoothing)
+
+    def _on_overload(self, error: Exception):
+        self.overloads += 1
+        self._set_limit(self.limit * self.backoff_ratio)
+        logger.warning(
+            "[AdaptiveConcurrencyLimiter] %s, concurrency limit lowered to %.1f",
+            type(error).__name__,
+            self.limit,
+        )
+
+    def _set_limit(self, limit: float):
+        # Note: Waiters are woken when the call that changed the limit releases its slot
+        self.limit = max(self.min_limit, min(self.max_limit, limit))
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "transcript_limit": self.transcript_limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "successes": self.successes,
+            "overloads": self.overloads,
+            "short_latency_ms": round(self.short_latency * 1000, 1) if self.short_latency else None,
+            "long_latency_ms": round(self.long_latency * 1000, 1) if self.long_latency else None,
+        }
+
+
+_llm_limiter: Optional[AdaptiveConcurrencyLimiter] = None
+
+
+def get_llm_limiter() -> AdaptiveConcurrencyLimiter:
+    global _llm_limiter
+    if _llm_limiter is None:
+        _llm_limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=float(os.getenv("OPENAI_INITIAL_CONCURRENCY", "16")),
+            min_limit=float(os.getenv("OPENAI_MIN_CONCURRENCY", "2")),
+            max_limit=float(os.getenv("OPENAI_MAX_CONCURRENCY", "128")),
+            transcript_share=float(os.getenv("OPENAI_TRANSCRIPT_CONCURRENCY_SHARE", "0.25")),
+        )
+    return _llm_limiter
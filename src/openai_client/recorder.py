@@ -0,0 +1,145 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import IO, Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RECORD_MODES = ("off", "record", "replay")
+
+
+class ReplayMissError(KeyError):
+    """Raised in replay mode for a request that is not in the recording."""
+
+
+def request_key(
+    model: str,
+    system_prompt: str,
+    messages: Any,
+    temperature: float,
+    response_format: Optional[Dict[str, Any]],
+) -> str:
+    """Stable hash of everything that determines a response, used to match replayed requests."""
+    request = json.dumps(
+        [model, system_prompt, messages, temperature, response_format],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    # Note: Recordings ending in .gz are gzip compressed, appends add a new gzip member
+    if path.endswith(".gz"):
+        return gzip.open(path, f"{mode}t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class ResponseRecorder:
+    """
+    Appends one JSON line per model response to `path`: the request key, the response
+    text and how long the request took. Lines are flushed as they are written so a
+    recording survives the process being killed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = _open(path, "a")
+
+    def record(self, key: str, model: str, output_text: str, latency_seconds: float):
+        line = json.dumps(
+            {
+                "key": key,
+                "model": model,
+                "output_text": output_text,
+                "latency_ms": round(latency_seconds * 1000, 1),
+            },
+            ensure_ascii=False,
+        )
+        self._file.write(line + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ResponseReplayer:
+    """
+    Serves recorded responses by request key, without the network. Identical requests
+    recorded several times are served in their recorded order, the last one repeating.
+    Each response is delayed by its recorded latency times `latency_scale`, `0` for none.
+    """
+
+    def __init__(self, path: str, latency_scale: float = 1.0):
+        self.path = path
+        self.latency_scale = latency_scale
+        self._entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._served: Dict[str, int] = defaultdict(int)
+
+        with _open(path, "r") as file:
+            for line in file:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+
+        logger.info(
+            "[ResponseReplayer] Loaded %s responses from %s",
+            sum(len(entries) for entries in self._entries.values()),
+            path,
+        )
+
+    async def replay(self, key: str) -> str:
+        entries = self._entries.get(key)
+        if not entries:
+            raise ReplayMissError(f"No recorded response for request {key} in {self.path}")
+
+        entry = entries[min(self._served[key], len(entries) - 1)]
+        self._served[key] += 1
+
+        if self.latency_scale > 0:
+            await asyncio.sleep(entry["latency_ms"] / 1000 * self.latency_scale)
+        return entry["output_text"]
+
+
+class RecordReplay:
+    """Records or replays `OpenAIClient` responses, picked with `OPENAI_RECORD_MODE`."""
+
+    def __init__(self, mode: str, path: str, latency_scale: float = 1.0):
+        if mode not in RECORD_MODES:
+            raise ValueError(f"Unknown OpenAI record mode: {mode}")
+        self.mode = mode
+        self.recorder = ResponseRecorder(path) if mode == "record" else None
+        self.replayer = ResponseReplayer(path, latency_scale) if mode == "replay" else None
+
+    async def replay(self, key: str) -> str:
+        return await self.replayer.replay(key)
+
+    def record(self, key: str, model: str, output_text: str, latency_seconds: float):
+        self.recorder.record(key, model, output_text, latency_seconds)
+
+
+_record_replay: Optional[RecordReplay] = None
+
+
+def get_record_replay() -> Optional[RecordReplay]:
+    """The process wide recorder or replayer, `None` unless `OPENAI_RECORD_MODE` is set."""
+    global _record_replay
+    mode = os.getenv("OPENAI_RECORD_MODE", "off")
+    if mode == "off":
+        return None
+
+    if _record_replay is None:
+        path = os.getenv("OPENAI_RECORD_PATH")
+        if not path:
+            raise ValueError(
+                "OpenAI recording path not found. Please set the OPENAI_RECORD_PATH environment variable."
+            )
+        _record_replay = RecordReplay(
+            mode, path, float(os.getenv("OPENAI_REPLAY_LATENCY_SCALE", "1"))
+        )
+    return _record_replay
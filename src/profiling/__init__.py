@@ -0,0 +1,11 @@
+from .log_format import JsonLogFormatter
+from .sampler import StackSampler, get_stack_sampler
+from .spans import (
+    Span,
+    get_slow_audit_ms,
+    get_slow_request_ms,
+    span,
+    trace,
+    traced,
+)
+
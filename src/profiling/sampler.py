@@ -0,0 +1,90 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 64
+
+
+class StackSampler:
+    """
+    Samples the event loop thread's Python stack every `interval_ms` from a background
+    thread and keeps the last `max_samples`. Snapshots fold the samples taken during a
+    time range into their most frequent stacks, like a flame graph's input.
+    """
+
+    def __init__(self, interval_ms: float, max_samples: int = 50_000):
+        self.interval_ms = interval_ms
+        self._samples: deque[tuple[float, tuple[str, ...]]] = deque(maxlen=max_samples)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._target_thread_id: Optional[int] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        """Starts sampling the calling thread, call from the event loop."""
+        if self._thread is not None or self.interval_ms <= 0:
+            return
+        self._target_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        logger.info("[StackSampler.start] Sampling every %sms", self.interval_ms)
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        interval = self.interval_ms / 1000
+        while not self._stopped.wait(interval):
+            frame = sys._current_frames().get(self._target_thread_id)
+            if frame is None:
+                continue
+            stack: list[str] = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append(f"{code.co_filename}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            self._samples.append((time.monotonic(), tuple(reversed(stack))))
+
+    def snapshot(
+        self, started_at: float, ended_at: float, top: int = 20
+    ) -> Optional[dict[str, Any]]:
+        """The `top` stacks sampled between `started_at` and `ended_at`, `None` when not sampling."""
+        if not self.running:
+            return None
+
+        # Note: The loop thread runs every request's code, samples include concurrent work
+        stacks = Counter(
+            stack for sampled_at, stack in list(self._samples) if started_at <= sampled_at <= ended_at
+        )
+        return {
+            "interval_ms": self.interval_ms,
+            "samples": sum(stacks.values()),
+            "stacks": [
+                {"stack": ";".join(stack), "samples": samples}
+                for stack, samples in stacks.most_common(top)
+            ],
+        }
+
+
+_stack_sampler: Optional[StackSampler] = None
+
+
+def get_stack_sampler() -> StackSampler:
+    global _stack_sampler
+    if _stack_sampler is None:
+        _stack_sampler = StackSampler(float(os.getenv("PROFILING_SAMPLER_INTERVAL_MS", "0")))
+    return _stack_sampler
@@ -0,0 +1,130 @@
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+from .sampler import get_stack_sampler
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("profiling_span", default=None)
+
+
+def get_slow_request_ms() -> float:
+    return float(os.getenv("PROFILING_SLOW_REQUEST_MS", "0"))
+
+
+def get_slow_audit_ms() -> float:
+    return float(os.getenv("PROFILING_SLOW_AUDIT_MS", "0"))
+
+
+class Span:
+    __slots__ = ("name", "attributes", "started_at", "ended_at", "children")
+
+    def __init__(self, name: str, attributes: dict[str, Any]):
+        self.name = name
+        self.attributes = attributes
+        self.started_at = time.monotonic()
+        self.ended_at: Optional[float] = None
+        self.children: list[Span] = []
+
+    @property
+    def duration_ms(self) -> float:
+        ended_at = self.ended_at if self.ended_at is not None else time.monotonic()
+        return (ended_at - self.started_at) * 1000
+
+    def to_dict(self, root_started_at: Optional[float] = None) -> dict[str, Any]:
+        root_started_at = self.started_at if root_started_at is None else root_started_at
+        span: dict[str, Any] = {
+            "name": self.name,
+            "start_ms": round((self.started_at - root_started_at) * 1000, 1),
+            "duration_ms": round(self.duration_ms, 1),
+        }
+        if self.attributes:
+            span["attributes"] = self.attributes
+        if self.children:
+            span["children"] = [child.to_dict(root_started_at) for child in self.children]
+        return span
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Times the block as a child of the current span, a no-op outside of a profiled trace."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = Span(name, attributes)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    finally:
+        child.ended_at = time.monotonic()
+        _current_span.reset(token)
+
+
+def traced(name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorates a coroutine function to run in a span."""
+
+    def decorator(function: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(function)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            with span(name):
+                return await function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def trace(name: str, slow_ms: float, force: bool = False, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Starts a new span tree for a request or background audit. Profiling is on when
+    `slow_ms` is set or `force` is true, and the tree is logged when the trace took at
+    least `slow_ms` (always when forced), with a sampled stack profile if the sampler runs.
+    """
+    root = Span(name, attributes) if slow_ms > 0 or force else None
+    # Note: Also reset when off, so background audits don't attach to the request that spawned them
+    token = _current_span.set(root)
+    try:
+        yield root
+    finally:
+        _current_span.reset(token)
+        if root is not None:
+            root.ended_at = time.monotonic()
+            if force or root.duration_ms >= slow_ms:
+                log_slow_trace(root)
+
+
+def log_slow_trace(root: Span):
+    span_tree = root.to_dict()
+    profile = get_stack_sampler().snapshot(root.started_at, root.ended_at)
+    if profile is not None:
+        span_tree["profile"] = profile
+
+    logger.warning(
+        "[profiling] Slow %s took %.0fms: %s",
+        root.name,
+        root.duration_ms,
+        # Note: Serialised lazily, only if the record is emitted
+        _LazyJson(span_tree),
+        extra={"trace": span_tree},
+    )
+
+
+class _LazyJson:
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __str__(self) -> str:
+        return json.dumps(self.value, default=str)
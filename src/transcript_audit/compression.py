@@ -0,0 +1,86 @@
+import os
+import zlib
+from typing import Any, Optional
+from src.transcript_audit.schemas import Conversation, _from_time_array, _to_time_array
+from src.transcript_audit.util import json_dumps, json_loads
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIONS = ("off", "zstd", "zlib")
+
+# Note: Blob header, format version then codec, so stored blobs stay readable if either changes
+FORMAT_VERSION = 1
+CODEC_IDS = {"zstd": 1, "zlib": 2}
+CODEC_NAMES = {codec_id: name for name, codec_id in CODEC_IDS.items()}
+
+ZSTD_LEVEL = 6
+ZLIB_LEVEL = 6
+
+
+def get_transcript_compression() -> Optional[str]:
+    """
+    Codec new transcripts are stored with, `None` to store them as plain message lists.
+    `zstd` falls back to `zlib` when the zstandard package isn't installed.
+    """
+    compression = os.getenv("TRANSCRIPT_COMPRESSION", "off").lower()
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown transcript compression: {compression}")
+    if compression == "off":
+        return None
+    if compression == "zstd" and zstandard is None:
+        return "zlib"
+    return compression
+
+
+def _encode(conversation: Conversation) -> dict[str, Any]:
+    # Note: Roles repeat on every message, they are stored once and referenced by index
+    role_ids: dict[str, int] = {}
+    roles = [role_ids.setdefault(role, len(role_ids)) for role in conversation.roles]
+    payload: dict[str, Any] = {
+        "ids": conversation.ids,
+        "role_names": list(role_ids),
+        "roles": roles,
+        "contents": conversation.contents,
+    }
+    if conversation.has_timings:
+        payload["start_times"] = _from_time_array(conversation.start_times)
+        payload["end_times"] = _from_time_array(conversation.end_times)
+    return payload
+
+
+def compress_conversation(conversation: Conversation, compression: str) -> bytes:
+    """Packs the conversation's columns, roles dictionary encoded, into a compressed blob."""
+    payload = json_dumps(_encode(conversation))
+    if compression == "zstd":
+        body = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+    elif compression == "zlib":
+        body = zlib.compress(payload, ZLIB_LEVEL)
+    else:
+        raise ValueError(f"Unknown transcript compression: {compression}")
+    return bytes([FORMAT_VERSION, CODEC_IDS[compression]]) + body
+
+
+def decompress_conversation(blob: bytes) -> Conversation:
+    if len(blob) < 2 or blob[0] != FORMAT_VERSION or blob[1] not in CODEC_NAMES:
+        raise ValueError("Unsupported compressed conversation")
+
+    codec = CODEC_NAMES[blob[1]]
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("Conversation is zstd compressed but zstandard is not installed")
+        payload = zstandard.ZstdDecompressor().decompress(blob[2:])
+    else:
+        payload = zlib.decompress(blob[2:])
+
+    data = json_loads(payload)
+    role_names = data["role_names"]
+    return Conversation(
+        data["ids"],
+        [role_names[role] for role in data["roles"]],
+        data["contents"],
+        _to_time_array(data["start_times"]) if "start_times" in data else None,
+        _to_time_array(data["end_times"]) if "end_times" in data else None,
+    )
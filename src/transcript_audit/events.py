@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Optional
+from src.transcript_audit.schemas import AuditType, AuditStatus
+
+logger = logging.getLogger(__name__)
+
+
+class AuditEventBroker:
+    """
+    In-process pub/sub for audit progress, keyed by transcript audit result id.
+
+    Audit services publish an event the moment an audit type finishes so that
+    streaming endpoints in the same worker can forward it without polling Mongo.
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+
+    def subscribe(self, transcript_audit_result_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers[transcript_audit_result_id].add(queue)
+        return queue
+
+    def unsubscribe(self, transcript_audit_result_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(transcript_audit_result_id)
+        if not subscribers:
+            return
+
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[transcript_audit_result_id]
+
+    def publish(
+        self,
+        transcript_audit_result_id: str,
+        audit_type: AuditType,
+        status: AuditStatus,
+        result: Optional[Any] = None,
+        error: Optional[str] = None,
+    ):
+        event = {
+            "transcript_audit_result_id": transcript_audit_result_id,
+            "audit_type": audit_type.value,
+            "status": status.value,
+            "result": result,
+            "error": error,
+        }
+
+        for queue in list(self._subscribers.get(transcript_audit_result_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning(
+                    "[AuditEventBroker.publish] Dropping event for slow subscriber of %s",
+                    transcript_audit_result_id,
+                )
+
+
+_audit_event_broker = AuditEventBroker()
+
+
+def get_audit_event_broker() -> AuditEventBroker:
+    return _audit_event_broker
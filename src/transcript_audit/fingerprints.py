@@ -0,0 +1,15 @@
+import hashlib
+import json
+from typing import Any
+
+# Note: Stands in for the agent name in system prompts that embed it
+AGENT_NAME_PLACEHOLDER = "{agent_name}"
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Short stable hash of what produces an audit step's output: its model, prompts and
+    response schema. Stored with the results, a different fingerprint marks them stale.
+    """
+    content = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
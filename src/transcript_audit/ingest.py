@@ -0,0 +1,69 @@
+import logging
+from src.profiling import span
+from src.transcript_audit.models import TranscriptAuditResult
+from src.transcript_audit.schemas import AuditStatus, AuditType, Conversation
+from src.transcript_audit.util import (
+    extract_message_times,
+    load_transcript_json,
+    relativize_message_times,
+)
+
+logger = logging.getLogger(__name__)
+
+# Note: Accepted types per message field, uploads are untrusted so nothing else is stringified
+MESSAGE_FIELD_TYPES = {"_id": (str, int), "role": (str,), "content": (str,)}
+
+
+def _message_field(message: dict, position: int, field: str) -> str:
+    value = message.get(field) if isinstance(message, dict) else None
+    if isinstance(value, bool) or not isinstance(value, MESSAGE_FIELD_TYPES[field]):
+        raise ValueError(
+            f"Message {position} has an invalid {field}: expected "
+            f"{' or '.join(t.__name__ for t in MESSAGE_FIELD_TYPES[field])}, got {type(value).__name__}"
+        )
+    return str(value)
+
+
+def parse_transcript(
+    content: bytes, transcript_file_name: str, audit_types: list[AuditType]
+) -> TranscriptAuditResult:
+    """
+    Builds a pending transcript audit result from an exported JSON or NDJSON transcript.
+    Shared by the API and the bulk audit CLI, nothing is stored.
+    """
+    with span("parse_transcript.load_json", bytes=len(content)):
+        json_content: dict = load_transcript_json(content)
+
+    context = json_content.get("data", {}).get("context", {})
+    variables = context.get("variables", {})
+    user_data = context.get("user_data", {})
+
+    conversation_history = variables.get("review_conversation_history", [])
+    agent_first_name = variables.get("agent_first_name", "")
+    agent_last_name = variables.get("agent_last_name", "")
+
+    logger.info("[parse_transcript] Conversation history: %d", len(conversation_history))
+
+    with span("parse_transcript.build_conversation", messages=len(conversation_history)):
+        conversation = Conversation()
+
+        for position, message in enumerate(conversation_history):
+            conversation.append(
+                _message_field(message, position, "_id"),
+                _message_field(message, position, "role"),
+                _message_field(message, position, "content"),
+                *extract_message_times(message),
+            )
+
+        relativize_message_times(conversation)
+
+    with span("parse_transcript.validate"):
+        return TranscriptAuditResult(
+            org_id=user_data.get("org_id", ""),
+            session_id=user_data.get("session_id", ""),
+            transcript_file_name=transcript_file_name,
+            agent_name=f"{agent_first_name} {agent_last_name}",
+            audit_types=audit_types,
+            conversation_history=conversation,
+            status={audit_type: AuditStatus.PENDING for audit_type in audit_types},
+        )
@@ -2,32 +2,146 @@ from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 from src.transcript_audit.schemas import AuditType, AuditStatus
-from src.transcript_audit.schemas import TranscriptMessage
+from src.transcript_audit.schemas import Conversation
+from src.transcript_audit.compression import (
+    compress_conversation,
+    decompress_conversation,
+    get_transcript_compression,
+)
+from src.transcript_audit.util import json_dumps
 
 class TranscriptAuditResult(BaseModel):
     id: Optional[str] = Field(None, alias="_id")
     org_id: str
     session_id: str
     transcript_file_name: str
+    agent_name: str = ""
     audit_types: List[AuditType] = Field(default_factory=list)
-    conversation_history: List[TranscriptMessage] = Field(default_factory=list)
+    conversation_history: Conversation = Field(default_factory=Conversation)
     status: Dict[AuditType, AuditStatus] = Field(default_factory=dict)
     audit_results: Optional[Dict[AuditType, Any]] = Field(default_factory=dict)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    
+    # Note: Audit types interrupted by a worker shutdown, picked up again by the next worker that starts
+    requeued_audit_types: List[AuditType] = Field(default_factory=list)
+    # Note: Only stored while `requeued_audit_types` is not empty, backs the resumer's partial index
+    requeued: Optional[bool] = None
+    # Note: Fingerprint of the prompts, schemas and model each audit type's results were produced with
+    audit_fingerprints: Dict[AuditType, str] = Field(default_factory=dict)
+    # Note: Incremented on every update, the ETag of GET /transcript/audits/{id}
+    version: int = 0
+
     class Config:
         populate_by_name = True
         json_encoders = {
             datetime: lambda v: v.isoformat()
         }
-    
+
     @staticmethod
     def collection_name() -> str:
         return "TranscriptAuditResults"
-    
-    def to_mongo(self) -> dict:
-        data = self.model_dump(by_alias=True, exclude_none=True)
+
+    @staticmethod
+    def shard_key() -> dict:
+        # Note: Org queries target the org's shards, the hashed _id spreads one large org across chunks
+        return {"org_id": 1, "_id": "hashed"}
+
+    def to_mongo(self, compress: bool = True) -> dict:
+        """
+        Document to store. With `TRANSCRIPT_COMPRESSION` set and `compress` left on, the
+        conversation and its timings are stored as one `conversation_history_compressed` blob.
+        """
+        compression = get_transcript_compression() if compress else None
+        if compression is None:
+            data = self.model_dump(by_alias=True, exclude_none=True)
+            # Note: Message timings are stored as parallel arrays next to the conversation
+            data.update(self.conversation_history.timings_to_mongo())
+        else:
+            data = self.model_dump(
+                by_alias=True, exclude_none=True, exclude={"conversation_history"}
+            )
+            data["conversation_history_compressed"] = compress_conversation(
+                self.conversation_history, compression
+            )
+            data["total_messages"] = len(self.conversation_history)
         if "_id" in data and data["_id"] is None:
             del data["_id"]
         return data
 
+    @classmethod
+    def from_mongo(cls, document: Dict[str, Any]) -> "TranscriptAuditResult":
+        # Note: Documents in our collection were validated when inserted, so skip re-validation
+        data = dict(document)
+        data["id"] = data.pop("_id", None)
+        data["audit_types"] = [AuditType(audit_type) for audit_type in data.get("audit_types", [])]
+        data["requeued_audit_types"] = [
+            AuditType(audit_type) for audit_type in data.get("requeued_audit_types", [])
+        ]
+        data["status"] = {
+            AuditType(audit_type): AuditStatus(status)
+            for audit_type, status in data.get("status", {}).items()
+        }
+        data["audit_results"] = {
+            AuditType(audit_type): result
+            for audit_type, result in (data.get("audit_results") or {}).items()
+        }
+        compressed = data.pop("conversation_history_compressed", None)
+        data.pop("total_messages", None)
+        if compressed is not None:
+            data["conversation_history"] = decompress_conversation(compressed)
+        else:
+            data["conversation_history"] = Conversation.from_mongo(
+                data.get("conversation_history", []),
+                data.pop("message_start_times", None),
+                data.pop("message_end_times", None),
+            )
+        return cls.model_construct(**data)
+
+    @staticmethod
+    def decode_mongo(document: Dict[str, Any]) -> Dict[str, Any]:
+        """Expands a compressed conversation in a raw document back into its stored list form."""
+        compressed = document.pop("conversation_history_compressed", None)
+        if compressed is not None:
+            conversation = decompress_conversation(compressed)
+            document.pop("total_messages", None)
+            document["conversation_history"] = conversation.to_mongo()
+            document.update(conversation.timings_to_mongo())
+        return document
+
+    @staticmethod
+    def mongo_to_json(document: Any) -> bytes:
+        # Note: Serialises raw mongo documents straight into the response body without building models
+        return json_dumps(document, default=_json_default)
+
+
+class TranscriptAuditDailyStats(BaseModel):
+    """Daily compliance rollup for one agent of an org, keyed by `(org_id, agent_name, date)`."""
+
+    id: Optional[str] = Field(None, alias="_id")
+    org_id: str
+    agent_name: str = ""
+    date: str
+    recorded_line_audits: int = 0
+    total_human_transfers: int = 0
+    total_recorded_line_phrases: int = 0
+    section_breakdown_audits: int = 0
+    section_counts: Dict[str, int] = Field(default_factory=dict)
+    section_length_histogram: Dict[str, Dict[str, int]] = Field(default_factory=dict)
+    section_duration_histogram: Dict[str, Dict[str, int]] = Field(default_factory=dict)
+
+    class Config:
+        populate_by_name = True
+
+    @staticmethod
+    def collection_name() -> str:
+        return "TranscriptAuditDailyStats"
+
+    @staticmethod
+    def shard_key() -> dict:
+        # Note: Same fields as the unique rollup key, which must be prefixed by the shard key
+        return {"org_id": 1, "agent_name": 1, "date": 1}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,123 @@
+import os
+import re
+from typing import Optional
+from src.transcript_audit.schemas import Conversation
+
+# Note: Silence / pause markers carry nothing for the audits, DTMF tones are kept since IVR menus depend on them
+SILENCE_TOKEN_PATTERN = re.compile(r"</?sp\s*/?>", re.IGNORECASE)
+ADJACENT_DTMF_PATTERN = re.compile(r"</dtmf>\s*<dtmf>", re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def is_normalization_enabled() -> bool:
+    return os.getenv("TRANSCRIPT_NORMALIZATION", "true").lower() == "true"
+
+
+def get_min_repeat_run() -> int:
+    return max(2, int(os.getenv("TRANSCRIPT_MIN_REPEAT_RUN", "3")))
+
+
+def get_normalization_settings() -> dict[str, object]:
+    """Settings that change the prompts built from a conversation, part of the audit fingerprints."""
+    return {"enabled": is_normalization_enabled(), "min_repeat_run": get_min_repeat_run()}
+
+
+def clean_content(content: str) -> str:
+    content = SILENCE_TOKEN_PATTERN.sub(" ", content)
+    content = ADJACENT_DTMF_PATTERN.sub("", content)
+    return WHITESPACE_PATTERN.sub(" ", content).strip()
+
+
+class NormalizedConversation:
+    """
+    Compacted copy of a conversation for prompting, with the span of original messages
+    behind each compacted one:
+
+    - Messages left empty once silence markers are removed are folded into the message
+      before them (the first kept message for leading ones).
+    - Runs of at least `min_repeat_run` messages with the same role and content, like IVR
+      hold announcements, become one message noting how often it repeated.
+
+    Indices the model returns for the compacted conversation map back with `original_index`,
+    the original message a compacted one was built from, or with `original_start` /
+    `original_end`, the first / last original message it stands for.
+    """
+
+    __slots__ = ("conversation", "indices", "run_starts", "run_ends")
+
+    def __init__(
+        self,
+        conversation: Conversation,
+        indices: list[int],
+        run_starts: list[int],
+        run_ends: list[int],
+    ):
+        self.conversation = conversation
+        self.indices = indices
+        self.run_starts = run_starts
+        self.run_ends = run_ends
+
+    @classmethod
+    def identity(cls, conversation: Conversation) -> "NormalizedConversation":
+        indices = list(range(len(conversation)))
+        return cls(conversation, indices, indices, indices)
+
+    def original_index(self, index: int) -> int:
+        return self.indices[index]
+
+    def original_start(self, index: int) -> int:
+        return self.run_starts[index]
+
+    def original_end(self, index: int) -> int:
+        return self.run_ends[index]
+
+    def __len__(self) -> int:
+        return len(self.conversation)
+
+
+def normalize_conversation(
+    conversation: Conversation, min_repeat_run: Optional[int] = None
+) -> NormalizedConversation:
+    if not is_normalization_enabled():
+        return NormalizedConversation.identity(conversation)
+    if min_repeat_run is None:
+        min_repeat_run = get_min_repeat_run()
+
+    # Note: [role, cleaned content, index, first original index, last original index] per kept message
+    kept: list[list] = []
+    for index, (role, content) in enumerate(zip(conversation.roles, conversation.contents)):
+        content = clean_content(content)
+        if content:
+            kept.append([role, content, index, index, index])
+        elif kept:
+            kept[-1][4] = index
+
+    if not kept:
+        return NormalizedConversation.identity(conversation)
+    kept[0][3] = 0
+
+    normalized = NormalizedConversation(Conversation(), [], [], [])
+    position = 0
+    while position < len(kept):
+        role, content, index, run_start, run_end = kept[position]
+        run_length = 1
+        while (
+            position + run_length < len(kept)
+            and kept[position + run_length][0] == role
+            and kept[position + run_length][1].casefold() == content.casefold()
+        ):
+            run_length += 1
+
+        if run_length >= min_repeat_run:
+            run_end = kept[position + run_length - 1][4]
+            content = f"{content} [repeated {run_length} times]"
+        else:
+            run_length = 1
+
+        normalized.conversation.append(conversation.ids[index], role, content)
+        normalized.indices.append(index)
+        normalized.run_starts.append(run_start)
+        normalized.run_ends.append(run_end)
+        position += run_length
+
+    return normalized
@@ -0,0 +1,299 @@
+import os
+from collections import OrderedDict
+from datetime import datetime
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+from urllib.parse import quote
+from src.transcript_audit.util import json_dumps
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet output requires pyarrow, install it with `pip install pyarrow`") from e
+    return pyarrow
+
+
+def get_audit_result_schema() -> "pa.Schema":
+    """Flat columns for analytics, nested audit results are kept as JSON strings."""
+    pa = _import_pyarrow()
+    return pa.schema(
+        [
+            ("id", pa.string()),
+            ("org_id", pa.string()),
+            ("session_id", pa.string()),
+            ("transcript_file_name", pa.string()),
+            ("agent_name", pa.string()),
+            ("created_at", pa.timestamp("ms", tz="UTC")),
+            ("date", pa.string()),
+            ("audit_types", pa.list_(pa.string())),
+            ("status", pa.map_(pa.string(), pa.string())),
+            ("total_messages", pa.int32()),
+            ("total_human_transfers", pa.int32()),
+            ("total_recorded_line_phrases", pa.int32()),
+            ("failed_chunks", pa.int32()),
+            ("total_sections", pa.int32()),
+            ("section_durations", pa.map_(pa.string(), pa.float64())),
+            ("audit_results", pa.string()),
+            ("audit_errors", pa.string()),
+        ]
+    )
+
+
+def get_recorded_line_chunk_schema() -> "pa.Schema":
+    """One row per human transfer of a recorded line audit."""
+    pa = _import_pyarrow()
+    return pa.schema(
+        [
+            ("audit_id", pa.string()),
+            ("org_id", pa.string()),
+            ("agent_name", pa.string()),
+            ("created_at", pa.timestamp("ms", tz="UTC")),
+            ("date", pa.string()),
+            ("chunk_index", pa.int32()),
+            ("status", pa.string()),
+            ("human_transfer_message_id", pa.string()),
+            ("human_transfer_time", pa.float64()),
+            ("has_recorded_line_phrase", pa.bool_()),
+            ("recorded_line_phrase_message_id", pa.string()),
+            ("recorded_line_phrase_time", pa.float64()),
+            ("error", pa.string()),
+        ]
+    )
+
+
+def get_section_schema() -> "pa.Schema":
+    """One row per section of a section breakdown audit."""
+    pa = _import_pyarrow()
+    return pa.schema(
+        [
+            ("audit_id", pa.string()),
+            ("org_id", pa.string()),
+            ("agent_name", pa.string()),
+            ("created_at", pa.timestamp("ms", tz="UTC")),
+            ("date", pa.string()),
+            ("section_index", pa.int32()),
+            ("section_type", pa.string()),
+            ("start_index", pa.int32()),
+            ("end_index", pa.int32()),
+            ("start_time", pa.float64()),
+            ("end_time", pa.float64()),
+            ("duration_seconds", pa.float64()),
+        ]
+    )
+
+
+def _string(value: Any) -> str:
+    return value.value if isinstance(value, Enum) else str(value)
+
+
+def _json_string(value: Any) -> Optional[str]:
+    return json_dumps(value, default=str).decode("utf-8") if value else None
+
+
+def _partition_columns(document: dict[str, Any]) -> dict[str, Any]:
+    created_at: Optional[datetime] = document.get("created_at")
+    return {
+        "audit_id": str(document["_id"]) if document.get("_id") else None,
+        "org_id": document.get("org_id"),
+        "agent_name": document.get("agent_name", ""),
+        "created_at": created_at,
+        "date": created_at.strftime("%Y-%m-%d") if created_at else None,
+    }
+
+
+def audit_result_to_row(
+    document: dict[str, Any], include_audit_results: bool = True
+) -> dict[str, Any]:
+    """
+    Flattens a stored transcript audit result document into a row of `get_audit_result_schema`.
+    `total_messages` is taken from the document when the conversation was projected away.
+    """
+    audit_results = document.get("audit_results") or {}
+    recorded_line_phrases = audit_results.get("recorded_line_phrases") or {}
+    section_breakdown = audit_results.get("section_breakdown") or {}
+    created_at: Optional[datetime] = document.get("created_at")
+
+    return {
+        "id": str(document["_id"]) if document.get("_id") else None,
+        "org_id": document.get("org_id"),
+        "session_id": document.get("session_id"),
+        "transcript_file_name": document.get("transcript_file_name"),
+        "agent_name": document.get("agent_name", ""),
+        "created_at": created_at,
+        "date": created_at.strftime("%Y-%m-%d") if created_at else None,
+        "audit_types": [_string(audit_type) for audit_type in document.get("audit_types", [])],
+        "status": [
+            (_string(audit_type), _string(status))
+            for audit_type, status in (document.get("status") or {}).items()
+        ],
+        "total_messages": document.get(
+            "total_messages", len(document.get("conversation_history", []))
+        ),
+        "total_human_transfers": recorded_line_phrases.get("total_human_transfers"),
+        "total_recorded_line_phrases": recorded_line_phrases.get("total_recorded_line_phrases"),
+        "failed_chunks": recorded_line_phrases.get("failed_chunks"),
+        "total_sections": section_breakdown.get("total_sections"),
+        "section_durations": list((section_breakdown.get("section_durations") or {}).items()) or None,
+        "audit_results": _json_string(audit_results) if include_audit_results else None,
+        "audit_errors": _json_string(document.get("audit_errors")),
+    }
+
+
+def recorded_line_chunk_rows(document: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Rows of `get_recorded_line_chunk_schema` for the document's recorded line audit, if any."""
+    audit_results = document.get("audit_results") or {}
+    recorded_line_phrases = audit_results.get("recorded_line_phrases") or {}
+    partition_columns = _partition_columns(document)
+
+    for chunk_index, chunk in enumerate(recorded_line_phrases.get("auditted_chunks", [])):
+        yield {
+            **partition_columns,
+            "chunk_index": chunk_index,
+            # Note: Chunks saved before per-chunk statuses were added are all completed
+            "status": _string(chunk.get("status", "completed")),
+            "human_transfer_message_id": chunk.get("human_transfer_message_id"),
+            "human_transfer_time": chunk.get("human_transfer_time"),
+            "has_recorded_line_phrase": chunk.get("has_recorded_line_phrase"),
+            "recorded_line_phrase_message_id": chunk.get("recorded_line_phrase_message_id"),
+            "recorded_line_phrase_time": chunk.get("recorded_line_phrase_time"),
+            "error": chunk.get("error"),
+        }
+
+
+def section_rows(document: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Rows of `get_section_schema` for the document's section breakdown audit, if any."""
+    audit_results = document.get("audit_results") or {}
+    section_breakdown = audit_results.get("section_breakdown") or {}
+    partition_columns = _partition_columns(document)
+
+    for section_index, section in enumerate(section_breakdown.get("section_breakdown", [])):
+        yield {
+            **partition_columns,
+            "section_index": section_index,
+            "section_type": section.get("section_type"),
+            "start_index": section.get("start_index"),
+            "end_index": section.get("end_index"),
+            "start_time": section.get("start_time"),
+            "end_time": section.get("end_time"),
+            "duration_seconds": section.get("duration_seconds"),
+        }
+
+
+class ParquetBatchWriter:
+    """Appends rows to a Parquet file one row group per `batch_size` rows."""
+
+    def __init__(self, path: str, batch_size: int = 1000, schema: Optional["pa.Schema"] = None):
+        pa = _import_pyarrow()
+        self.schema = schema if schema is not None else get_audit_result_schema()
+        self.batch_size = batch_size
+        self._rows: list[dict[str, Any]] = []
+        self._writer: "pq.ParquetWriter" = pa.parquet.ParquetWriter(
+            path, self.schema, compression="zstd"
+        )
+
+    def write(self, row: dict[str, Any]):
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        pa = _import_pyarrow()
+        self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self.schema))
+        self._rows = []
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+
+class PartitionedParquetWriter:
+    """
+    Writes rows under `root/org_id=<org>/date=<date>/<file_name>`, the Hive layout that
+    Arrow, DuckDB and Spark read as partition columns.
+
+    Rows are expected in date order: partitions of earlier dates are closed as soon as a
+    later date arrives, and at most `max_open_writers` partitions stay open, least recently
+    written closed first. A closed partition that gets rows again continues in a new
+    `<file_name>-<n>` file next to the first one.
+    """
+
+    PARTITION_COLUMNS = ("org_id", "date")
+
+    def __init__(
+        self,
+        root: str,
+        file_name: str,
+        schema: "pa.Schema",
+        batch_size: int = 1000,
+        max_open_writers: int = 64,
+    ):
+        self.root = root
+        self.file_name = file_name
+        self.max_open_writers = max_open_writers
+        # Note: Partition columns come from the directory names, so they're left out of the files
+        self.schema = schema
+        for column in self.PARTITION_COLUMNS:
+            self.schema = self.schema.remove(self.schema.get_field_index(column))
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._writers: OrderedDict[tuple[str, str], ParquetBatchWriter] = OrderedDict()
+        # Note: Files written per partition so far, a reopened partition never overwrites its earlier file
+        self._files_written: dict[tuple[str, str], int] = {}
+        self._latest_date = ""
+
+    def write(self, row: dict[str, Any]):
+        partition = (row.get("org_id") or "", row.get("date") or "")
+        if partition[1] > self._latest_date:
+            self._latest_date = partition[1]
+            for open_partition in [key for key in self._writers if key[1] < self._latest_date]:
+                self._close_writer(open_partition)
+
+        writer = self._writers.get(partition)
+        if writer is None:
+            writer = self._open_writer(partition)
+        else:
+            self._writers.move_to_end(partition)
+        writer.write(row)
+        self.rows_written += 1
+
+    def _open_writer(self, partition: tuple[str, str]) -> ParquetBatchWriter:
+        while len(self._writers) >= self.max_open_writers:
+            self._close_writer(next(iter(self._writers)))
+
+        directory = os.path.join(
+            self.root,
+            f"org_id={quote(partition[0], safe='')}",
+            f"date={partition[1]}",
+        )
+        os.makedirs(directory, exist_ok=True)
+
+        files_written = self._files_written.get(partition, 0)
+        file_name = self.file_name
+        if files_written:
+            stem, extension = os.path.splitext(self.file_name)
+            file_name = f"{stem}-{files_written}{extension}"
+        self._files_written[partition] = files_written + 1
+
+        writer = ParquetBatchWriter(os.path.join(directory, file_name), self.batch_size, self.schema)
+        self._writers[partition] = writer
+        return writer
+
+    def _close_writer(self, partition: tuple[str, str]):
+        self._writers.pop(partition).close()
+
+    @property
+    def open_writers(self) -> int:
+        return len(self._writers)
+
+    def close(self):
+        for partition in list(self._writers):
+            self._close_writer(partition)
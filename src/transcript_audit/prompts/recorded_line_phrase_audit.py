@@ -1,3 +1,8 @@
+from functools import cache, lru_cache
+
+
+# Note: Takes no arguments, rendered once
+@cache
 def get_human_transfer_detection_audit_prompt():
     return """
 You are an auditing assistant that analyzes call transcripts to find when a new human agent (on the pharmacy/insurance side) first comes on the line.
@@ -108,18 +113,21 @@ Output: [2]
 """
 
 
+# Note: Rendered once per agent name, bounded so the number of agent names can't grow memory
+@lru_cache(maxsize=256)
 def get_recorded_line_phrase_audit_prompt(agent_name: str):
     return f"""
 You are an auditing assistant that analyzes call transcripts to find whether the voice agent (on the USA side) explicitly stated that the call is on a recorded line when introducing itself to a human agent (on the pharmacy/insurance side).
 Note that the transcript is a chunk of the full transcript. Hence indexes will not start from 0 and will represent the index of the message as per the full transcript.
+The chunk can contain more than one human agent transfer. You will be given the <index> values of the messages where a new human agent comes on the line.
 The transcript is formatted as <message> blocks in XML. Each block has:
 - <index>: a unique integer identifier
 - <role>: either "assistant" (our voice agent) or "user" (the pharmacy/insurance side, IVR or human)
 - <content>: the spoken text
 
-Your task:
-1. Focus only on the "assistant" (our voice agent) messages in the provided chunk.
-2. Determine if the assistant explicitly stated that the call is on a recorded line when introducing itself to a human agent.
+Your task, for each human agent transfer:
+1. Focus only on the "assistant" (our voice agent) messages that follow the transfer and come before the next transfer in the chunk.
+2. Determine if the assistant explicitly stated that the call is on a recorded line when introducing itself to that human agent.
    - Look for phrases like "we are on a recorded line", "this call is recorded", "you are on a recorded line", "this is a recorded line", "this is a recorded call", "this is a recorded conversation", "this is a recorded line call", "this is a recorded line conversation".
    - Variations in wording are acceptable as long as the meaning is clearly that the call is recorded.
 3. Ignore cases where the assistant is just responding normally without an introduction.
@@ -127,13 +135,18 @@ Your task:
 Agent name: {agent_name}
 
 Output format:
-- Always return a JSON object with two fields:
+- Always return a JSON object with a "verdicts" array containing exactly one entry per given transfer:
   {{
-    "recorded_line_said": true/false,
-    "index": <index> of the message where the voice agent introduced itself to the human staff and irrespective of whether it stated that the call is on a recorded line.
+    "verdicts": [
+      {{
+        "transfer_index": <index> of the message where the human agent came on the line (one of the given transfer indices),
+        "has_recorded_line_phrase": true/false,
+        "index": <index> of the message where the voice agent introduced itself to that human agent and irrespective of whether it stated that the call is on a recorded line.
+      }}
+    ]
   }}
 
 Notes:
-- If multiple assistant messages appear, choose the one that seems to be the introduction (usually the first message after the human agent's greeting).
+- If multiple assistant messages appear after a transfer, choose the one that seems to be the introduction (usually the first message after the human agent's greeting).
 - If the assistant failed to include the recorded line phrase, return false but still include the <index> of the introduction message.
 """
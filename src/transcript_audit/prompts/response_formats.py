@@ -0,0 +1,143 @@
+from typing import Any, Generic, Literal, TypeVar, get_args
+from pydantic import ConfigDict, StrictBool, TypeAdapter
+from typing_extensions import TypedDict
+
+T = TypeVar("T")
+
+SectionType = Literal["IVR", "INTRODUCTION", "TRANSFER", "BENEFITS_COLLECTION"]
+SECTION_TYPES = list(get_args(SectionType))
+
+
+class StructuredOutput(Generic[T]):
+    """
+    A strict JSON schema `response_format` together with the validator of its responses.
+    Both are built once at import and shared by every request.
+    """
+
+    def __init__(self, name: str, schema: dict[str, Any], response_type: type[T]):
+        self.response_format: dict[str, Any] = {
+            "type": "json_schema",
+            "name": name,
+            "strict": True,
+            "schema": schema,
+        }
+        self._validator = TypeAdapter(response_type)
+
+    def parse(self, response: str) -> T:
+        """Parses and validates a raw model response, raises `pydantic.ValidationError` if invalid."""
+        return self._validator.validate_json(response)
+
+
+class HumanTransferIndicesResponse(TypedDict):
+    __pydantic_config__ = ConfigDict(strict=True)
+
+    indices: list[int]
+
+
+class RecordedLineVerdict(TypedDict):
+    __pydantic_config__ = ConfigDict(strict=True)
+
+    transfer_index: int
+    has_recorded_line_phrase: StrictBool
+    index: int
+
+
+class RecordedLineResponse(TypedDict):
+    # Note: Verdicts are validated one by one with RECORDED_LINE_VERDICT so a bad one doesn't drop the rest
+    verdicts: list[Any]
+
+
+class Section(TypedDict):
+    __pydantic_config__ = ConfigDict(strict=True)
+
+    section_type: SectionType
+    start_index: int
+    end_index: int
+
+
+class SectionBreakdownResponse(TypedDict):
+    sections: list[Section]
+
+
+HUMAN_TRANSFER_INDICES = StructuredOutput(
+    "human_transfer_indices",
+    {
+        "type": "object",
+        "properties": {
+            "indices": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "List of message indices where a new human agent comes on the line",
+            }
+        },
+        "required": ["indices"],
+        "additionalProperties": False,
+    },
+    HumanTransferIndicesResponse,
+)
+
+RECORDED_LINE_VERDICTS = StructuredOutput(
+    "recorded_line_detection",
+    {
+        "type": "object",
+        "properties": {
+            "verdicts": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "transfer_index": {
+                            "type": "integer",
+                            "description": "The <index> of the message where the human agent came on the line, one of the transfer indices listed in the request",
+                        },
+                        "has_recorded_line_phrase": {
+                            "type": "boolean",
+                            "description": "Whether the voice agent explicitly stated that the call is on a recorded line",
+                        },
+                        "index": {
+                            "type": "integer",
+                            "description": "The value of the <index> tag of the message where the voice agent introduced itself to the human staff and irrespective of whether it stated that the call is on a recorded line.",
+                        },
+                    },
+                    "required": ["transfer_index", "has_recorded_line_phrase", "index"],
+                    "additionalProperties": False,
+                },
+                "description": "One verdict per human agent transfer",
+            }
+        },
+        "required": ["verdicts"],
+        "additionalProperties": False,
+    },
+    RecordedLineResponse,
+)
+
+RECORDED_LINE_VERDICT: TypeAdapter[RecordedLineVerdict] = TypeAdapter(RecordedLineVerdict)
+
+SECTION_BREAKDOWN = StructuredOutput(
+    "conversation_section_breakdown",
+    {
+        "type": "object",
+        "properties": {
+            "sections": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "section_type": {
+                            "type": "string",
+                            "enum": SECTION_TYPES,
+                        },
+                        "start_index": {"type": "integer"},
+                        "end_index": {"type": "integer"},
+                    },
+                    "required": ["section_type", "start_index", "end_index"],
+                    "additionalProperties": False,
+                },
+                "description": "List of sections in the conversation",
+            }
+        },
+        "required": ["sections"],
+        "additionalProperties": False,
+    },
+    SectionBreakdownResponse,
+)
@@ -1,3 +1,7 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=256)
 def get_section_breakdown_audit_prompt(agent_name: str = "Agent"):
     return f"""
 You are an expert call auditing assistant for healthcare and pharmacy insurance verification calls.
@@ -0,0 +1,130 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from src.transcript_audit.models import TranscriptAuditResult
+from src.transcript_audit.schemas import AuditStatus
+
+TERMINAL_STATUSES = {AuditStatus.COMPLETED.value, AuditStatus.FAILED.value}
+
+
+class CachedAuditResult:
+    __slots__ = ("body", "etag", "expires_at")
+
+    def __init__(self, body: bytes, etag: str, expires_at: float):
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+
+
+def get_etag(document: dict[str, Any]) -> str:
+    # Note: Weak, the body may be gzip encoded on the way out
+    return f'W/"{document.get("version", 0)}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or etag.removeprefix("W/") in tags
+
+
+class AuditResultCache:
+    """
+    LRU of serialised `GET /transcript/audits/{id}` responses, evicted by total body size.
+
+    Audits whose every type is completed or failed are kept for `finished_ttl_seconds`,
+    audits still running for `running_ttl_seconds`. Writes made by this worker invalidate
+    the entry as soon as they land; the TTLs bound how long writes from other workers and
+    jobs take to show up.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        finished_ttl_seconds: float = 600,
+        running_ttl_seconds: float = 1,
+    ):
+        self.max_bytes = max_bytes
+        self.finished_ttl_seconds = finished_ttl_seconds
+        self.running_ttl_seconds = running_ttl_seconds
+
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # Note: Bumped by every invalidation, a read that started before one is not cached
+        self.generation = 0
+        self._entries: OrderedDict[str, CachedAuditResult] = OrderedDict()
+
+    def get(self, transcript_audit_id: str) -> Optional[CachedAuditResult]:
+        entry = self._entries.get(transcript_audit_id)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._remove(transcript_audit_id)
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(transcript_audit_id)
+        self.hits += 1
+        return entry
+
+    def put(
+        self, transcript_audit_id: str, document: dict[str, Any], generation: int
+    ) -> CachedAuditResult:
+        """Serialises the document and caches it unless it was invalidated since `generation`."""
+        finished = bool(document.get("status")) and all(
+            getattr(status, "value", status) in TERMINAL_STATUSES
+            for status in document["status"].values()
+        )
+        entry = CachedAuditResult(
+            body=TranscriptAuditResult.mongo_to_json(TranscriptAuditResult.decode_mongo(document)),
+            etag=get_etag(document),
+            expires_at=time.monotonic()
+            + (self.finished_ttl_seconds if finished else self.running_ttl_seconds),
+        )
+        if generation != self.generation or len(entry.body) > self.max_bytes:
+            return entry
+
+        self._remove(transcript_audit_id)
+        self._entries[transcript_audit_id] = entry
+        self.size += len(entry.body)
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+        return entry
+
+    def invalidate(self, transcript_audit_id: str):
+        self.generation += 1
+        self._remove(transcript_audit_id)
+
+    def on_write(self, collection_name: str, document_id: str):
+        if collection_name == TranscriptAuditResult.collection_name():
+            self.invalidate(document_id)
+
+    def _remove(self, transcript_audit_id: str):
+        entry = self._entries.pop(transcript_audit_id, None)
+        if entry is not None:
+            self.size -= len(entry.body)
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_audit_result_cache: Optional[AuditResultCache] = None
+
+
+def get_audit_result_cache() -> AuditResultCache:
+    global _audit_result_cache
+    if _audit_result_cache is None:
+        _audit_result_cache = AuditResultCache(
+            max_bytes=int(os.getenv("AUDIT_CACHE_MAX_MB", "64")) * 1024 * 1024,
+            finished_ttl_seconds=float(os.getenv("AUDIT_CACHE_FINISHED_TTL_SECONDS", "600")),
+            running_ttl_seconds=float(os.getenv("AUDIT_CACHE_RUNNING_TTL_SECONDS", "1")),
+        )
+    return _audit_result_cache
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, File, UploadFile, Form, Depends, HTTPException
-from typing import Optional
+from fastapi import APIRouter, File, UploadFile, Form, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Coroutine, Optional
+from datetime import date, datetime
 import json
 import logging
 import asyncio
@@ -7,15 +9,105 @@ from bson.objectid import ObjectId
 from src.transcript_audit.models import TranscriptAuditResult
 from src.transcript_audit.services.recorded_line_audit_service import (
     RecordedLineAuditService,
+    get_recorded_line_audit_service,
 )
-from src.transcript_audit.schemas import AuditStatus, TranscriptMessage, AuditType
+from src.transcript_audit.schemas import AuditStatus, AuditType
+from src.transcript_audit.ingest import parse_transcript
+from src.transcript_audit.events import get_audit_event_broker
+from src.transcript_audit.result_cache import etag_matches, get_audit_result_cache
+from src.transcript_audit.scheduler import (
+    AuditAdmissionError,
+    estimate_audit_tokens,
+    get_audit_scheduler,
+)
+from src.transcript_audit.tasks import get_audit_task_registry
 from src.mongo_db import get_mongo_client
-from src.transcript_audit.services.section_audit_service import SectionAuditService
+from src.profiling import span
+from src.transcript_audit.services.section_audit_service import (
+    SectionAuditService,
+    get_section_audit_service,
+)
+from src.transcript_audit.services.search_service import (
+    TranscriptSearchService,
+    get_search_service,
+)
+from src.transcript_audit.services.stats_service import AuditStatsService, get_stats_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+EVENTS_POLL_INTERVAL_SECONDS = 5.0
+# Note: The event stream only needs the statuses and results, not the transcript
+EVENTS_PROJECTION = {"status": 1, "audit_results": 1}
+
+
+async def _create_transcript_audit_result(
+    transcript_file: UploadFile, audit_types: list[AuditType]
+) -> tuple[TranscriptAuditResult, str]:
+    mongo_client = get_mongo_client()
+
+    with span("read_upload"):
+        content = await transcript_file.read()
+
+    with span("parse_transcript"):
+        transcript_audit_result = parse_transcript(content, transcript_file.filename, audit_types)
+
+    # Note: Admitted before anything is stored, a rejected request leaves no pending audit behind
+    with span("admit"):
+        get_audit_scheduler().admit(
+            transcript_audit_result.org_id,
+            estimate_audit_tokens(transcript_audit_result.conversation_history.contents)
+            * len(audit_types),
+        )
+
+    # Note: Storing it initially to make it avaialble for workflows running as workers via the task queues
+    transcript_audit_result_id = await mongo_client.insert_one(
+        TranscriptAuditResult.collection_name(),
+        document=transcript_audit_result.to_mongo(),
+    )
+
+    transcript_audit_result.id = transcript_audit_result_id
+
+    logger.info("[audit_transcript] Transcript audit result id: %s", transcript_audit_result_id)
+
+    return transcript_audit_result, transcript_audit_result.agent_name
+
+
+def _build_audit_tasks(
+    transcript_audit_result_id: str,
+    agent_name: str,
+    audit_types: list[AuditType],
+    recorded_line_audit_service: RecordedLineAuditService,
+    section_audit_service: SectionAuditService,
+) -> dict[AuditType, Coroutine[Any, Any, Any]]:
+    audit_tasks: dict[AuditType, Coroutine[Any, Any, Any]] = {}
+
+    if AuditType.RECORDED_LINE_PHRASES in audit_types:
+        audit_tasks[AuditType.RECORDED_LINE_PHRASES] = recorded_line_audit_service.audit(
+            transcript_audit_result_id, agent_name
+        )
+
+    if AuditType.SECTION_BREAKDOWN in audit_types:
+        audit_tasks[AuditType.SECTION_BREAKDOWN] = section_audit_service.audit(
+            transcript_audit_result_id, agent_name
+        )
+
+    return audit_tasks
+
+
+def _too_many_requests(error: AuditAdmissionError) -> HTTPException:
+    logger.warning("[audit_transcript] Rejected: %s", error)
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after_seconds)},
+    )
+
+
+def _ndjson_line(payload: dict) -> bytes:
+    return TranscriptAuditResult.mongo_to_json(payload) + b"\n"
+
 
 @router.post("/transcript/audits")
 async def audit_transcript(
@@ -26,107 +118,131 @@ async def audit_transcript(
         ..., description="List of audit types to perform"
     ),
     recorded_line_audit_service: RecordedLineAuditService = Depends(
-        RecordedLineAuditService
+        get_recorded_line_audit_service
     ),
-    section_audit_service: SectionAuditService = Depends(SectionAuditService),
+    section_audit_service: SectionAuditService = Depends(get_section_audit_service),
 ):
     try:
-        mongo_client = get_mongo_client()
-
-        content = await transcript_file.read()
-
-        try:
-            json_content: dict = json.loads(content)
-        except json.JSONDecodeError:
-            text_content = content.decode('utf-8')
-            lines = text_content.strip().split('\n')
-
-            last_json_object = None
-            for line in reversed(lines):
-                line = line.strip()
-                if line:
-                    try:
-                        last_json_object = json.loads(line)
-                        break
-                    except json.JSONDecodeError:
-                        continue
-            
-            if last_json_object is None:
-                raise ValueError("No valid JSON object found in NDJSON file")
-            
-            json_content = last_json_object
-
-        context = json_content.get("data", {}).get("context", {})
-        variables = context.get("variables", {})
-        user_data = context.get("user_data", {})
-
-        conversation_history = variables.get("review_conversation_history", [])
-        agent_first_name = variables.get("agent_first_name", "")
-        agent_last_name = variables.get("agent_last_name", "")
-
-        org_id = user_data.get("org_id", "")
-        session_id = user_data.get("session_id", "")
-
-        logger.info(
-            f"[audit_transcript] Conversation history: {len(conversation_history)}"
+        transcript_audit_result, agent_name = await _create_transcript_audit_result(
+            transcript_file, audit_types
         )
 
-        conversation: list[TranscriptMessage] = []
+        # Run audit workflows concurrently
+        audit_tasks = _build_audit_tasks(
+            transcript_audit_result.id,
+            agent_name,
+            audit_types,
+            recorded_line_audit_service,
+            section_audit_service,
+        )
 
-        for message in conversation_history:
-            conversation.append(
-                TranscriptMessage(
-                    id=message["_id"], role=message["role"], content=message["content"]
-                )
+        registry = get_audit_task_registry()
+        estimated_tokens = estimate_audit_tokens(transcript_audit_result.conversation_history.contents)
+        running_tasks = [
+            registry.spawn(
+                transcript_audit_result.id,
+                audit_type,
+                audit_task,
+                org_id=transcript_audit_result.org_id,
+                estimated_tokens=estimated_tokens,
             )
+            for audit_type, audit_task in audit_tasks.items()
+        ]
 
-        # Note: Storing it initially to make it avaialble for workflows running as workers via the task queues
-        transcript_audit_result = TranscriptAuditResult(
-            org_id=org_id,
-            session_id=session_id,
-            transcript_file_name=transcript_file.filename,
-            audit_types=audit_types,
-            conversation_history=conversation,
-            status={audit_type: AuditStatus.PENDING for audit_type in audit_types},
-        )
+        if running_tasks:
+            # Note: asyncio.wait doesn't cancel the audits when this request is cancelled on shutdown,
+            # the registry drains or requeues them instead
+            await asyncio.wait(running_tasks)
+            for task in running_tasks:
+                task.result()
 
-        transcript_audit_result_id = await mongo_client.insert_one(
-            TranscriptAuditResult.collection_name(),
-            document=transcript_audit_result.to_mongo(),
-        )
+    except AuditAdmissionError as e:
+        raise _too_many_requests(e)
+    except json.JSONDecodeError as e:
+        return {"error": "Invalid JSON file", "message": str(e)}
+    except ValueError as e:
+        return {"error": "Invalid file format", "message": str(e)}
 
-        transcript_audit_result.id = transcript_audit_result_id
+    # Note: Re-read so the response carries the statuses and results written by the audits
+    transcript_audit = await get_mongo_client().find_one(
+        TranscriptAuditResult.collection_name(), {"_id": transcript_audit_result.id}
+    )
 
-        logger.info(
-            f"[audit_transcript] Transcript audit result id: {transcript_audit_result_id}"
-        )
+    return TranscriptAuditResult.from_mongo(transcript_audit)
 
-        # Run audit workflows concurrently
-        audit_tasks = []
-        
-        if AuditType.RECORDED_LINE_PHRASES in audit_types:
-            audit_tasks.append(
-                recorded_line_audit_service.audit(
-                    transcript_audit_result_id, f"{agent_first_name} {agent_last_name}"
-                )
-            )
-
-        if AuditType.SECTION_BREAKDOWN in audit_types:
-            audit_tasks.append(
-                section_audit_service.audit(
-                    transcript_audit_result_id, f"{agent_first_name} {agent_last_name}"
-                )
-            )
-        
-        if audit_tasks:
-            await asyncio.gather(*audit_tasks)
 
+@router.post("/transcript/audits/stream")
+async def audit_transcript_stream(
+    transcript_file: UploadFile = File(
+        ..., description="JSON or NDJSON file containing transcript data"
+    ),
+    audit_types: list[AuditType] = Form(
+        ..., description="List of audit types to perform"
+    ),
+    recorded_line_audit_service: RecordedLineAuditService = Depends(
+        get_recorded_line_audit_service
+    ),
+    section_audit_service: SectionAuditService = Depends(get_section_audit_service),
+):
+    """
+    Same as `POST /transcript/audits` but responds with NDJSON: a `created` event with the
+    stored transcript audit result, one `audit` event per audit type as soon as it finishes,
+    and a final `done` event.
+    """
+    try:
+        transcript_audit_result, agent_name = await _create_transcript_audit_result(
+            transcript_file, audit_types
+        )
+    except AuditAdmissionError as e:
+        raise _too_many_requests(e)
     except json.JSONDecodeError as e:
         return {"error": "Invalid JSON file", "message": str(e)}
     except ValueError as e:
         return {"error": "Invalid file format", "message": str(e)}
 
-    return transcript_audit_result
+    audit_tasks = _build_audit_tasks(
+        transcript_audit_result.id,
+        agent_name,
+        audit_types,
+        recorded_line_audit_service,
+        section_audit_service,
+    )
+
+    async def run_audit(audit_type: AuditType, audit_task: Coroutine) -> dict:
+        try:
+            result = await audit_task
+            return {"audit_type": audit_type.value, "status": AuditStatus.COMPLETED.value, "result": result}
+        except Exception as e:
+            return {"audit_type": audit_type.value, "status": AuditStatus.FAILED.value, "error": str(e)}
+
+    # Note: Audits run as independent tasks so a disconnecting client doesn't cancel them
+    registry = get_audit_task_registry()
+    estimated_tokens = estimate_audit_tokens(transcript_audit_result.conversation_history.contents)
+    running_tasks = [
+        registry.spawn(
+            transcript_audit_result.id,
+            audit_type,
+            run_audit(audit_type, audit_task),
+            org_id=transcript_audit_result.org_id,
+            estimated_tokens=estimated_tokens,
+        )
+        for audit_type, audit_task in audit_tasks.items()
+    ]
+
+    async def stream() -> AsyncIterator[bytes]:
+        yield _ndjson_line(
+            {"event": "created", "transcript_audit_result": transcript_audit_result.model_dump(mode="json", by_alias=True)}
+        )
+
+        for completed_task in asyncio.as_completed(running_tasks):
+            yield _ndjson_line({"event": "audit", **(await completed_task)})
+
+        yield _ndjson_line({"event": "done", "transcript_audit_result_id": transcript_audit_result.id})
+
+    # Note: Marked as already encoded so the gzip middleware doesn't buffer events until the stream ends
+    return StreamingResponse(
+        stream(), media_type="application/x-ndjson", headers={"Content-Encoding": "identity"}
+    )
 
 
 # TODO: Add pagination
@@ -134,21 +250,238 @@ async def audit_transcript(
 async def get_transcript_audits():
     mongo_client = get_mongo_client()
     transcript_audits = await mongo_client.find_many(
-        TranscriptAuditResult.collection_name(), {}
+        TranscriptAuditResult.collection_name(),
+        {},
+        read_preference=mongo_client.analytics_read_preference,
+    )
+    return Response(
+        content=TranscriptAuditResult.mongo_to_json(
+            [TranscriptAuditResult.decode_mongo(document) for document in transcript_audits]
+        ),
+        media_type="application/json",
+    )
+
+
+@router.get("/transcript/audits/stats")
+async def get_transcript_audit_stats(
+    org_id: str = Query(...),
+    agent_name: Optional[str] = Query(None, description="Restrict the stats to one agent"),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    stats_service: AuditStatsService = Depends(get_stats_service),
+):
+    stats = await stats_service.get_stats(org_id, agent_name, start_date, end_date)
+    return Response(
+        content=TranscriptAuditResult.mongo_to_json(stats),
+        media_type="application/json",
+    )
+
+
+@router.get("/transcript/search")
+async def search_transcript_audits(
+    q: Optional[str] = Query(
+        None, description="Keywords to search for in transcripts, compressed transcripts are not covered"
+    ),
+    org_id: Optional[str] = Query(None),
+    agent_name: Optional[str] = Query(None),
+    recorded_line_missing: Optional[bool] = Query(
+        None, description="Only audits where at least one transfer was missing the recorded line phrase"
+    ),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    section_type: Optional[str] = Query(
+        None, description="Section type to filter on with min/max_section_seconds, e.g. IVR"
+    ),
+    min_section_seconds: Optional[float] = Query(None, ge=0),
+    max_section_seconds: Optional[float] = Query(None, ge=0),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    search_service: TranscriptSearchService = Depends(get_search_service),
+):
+    try:
+        search_results = await search_service.search(
+            text=q,
+            org_id=org_id,
+            agent_name=agent_name,
+            recorded_line_missing=recorded_line_missing,
+            created_from=created_from,
+            created_to=created_to,
+            section_type=section_type,
+            min_section_seconds=min_section_seconds,
+            max_section_seconds=max_section_seconds,
+            skip=skip,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(
+        content=TranscriptAuditResult.mongo_to_json(search_results),
+        media_type="application/json",
     )
-    return [
-        TranscriptAuditResult(**transcript_audit)
-        for transcript_audit in transcript_audits
-    ]
 
 
 @router.get("/transcript/audits/{transcript_audit_id}")
-async def get_transcript_audit(transcript_audit_id: str):
+async def get_transcript_audit(transcript_audit_id: str, request: Request):
+    """
+    Served from the worker's result cache when possible. Responses carry an ETag of the
+    document version, polls sending it back in `If-None-Match` get `304 Not Modified`.
+    """
+    if not ObjectId.is_valid(transcript_audit_id):
+        raise HTTPException(status_code=400, detail="Invalid transcript audit id")
+
+    cache = get_audit_result_cache()
+    cached = cache.get(transcript_audit_id)
+    if cached is None:
+        generation = cache.generation
+        mongo_client = get_mongo_client()
+        transcript_audit = await mongo_client.find_one(
+            TranscriptAuditResult.collection_name(), {"_id": transcript_audit_id}
+        )
+        if not transcript_audit:
+            raise HTTPException(status_code=404, detail="Transcript audit not found")
+        cached = cache.put(transcript_audit_id, transcript_audit, generation)
+
+    # Note: no-cache makes clients revalidate every poll instead of reusing a stale status
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+@router.get("/transcript/audits/{transcript_audit_id}/timeline")
+async def get_transcript_audit_timeline(
+    transcript_audit_id: str,
+    start_seconds: float = Query(0, ge=0),
+    end_seconds: Optional[float] = Query(None, ge=0),
+):
+    """
+    Sections and recorded line verdicts with timecodes that overlap the given time window.
+    Reads only the audit results, not the transcript.
+    """
     if not ObjectId.is_valid(transcript_audit_id):
         raise HTTPException(status_code=400, detail="Invalid transcript audit id")
 
     mongo_client = get_mongo_client()
     transcript_audit = await mongo_client.find_one(
-        TranscriptAuditResult.collection_name(), {"_id": transcript_audit_id}
+        TranscriptAuditResult.collection_name(),
+        {"_id": transcript_audit_id},
+        projection={"audit_results": 1},
+    )
+    if not transcript_audit:
+        raise HTTPException(status_code=404, detail="Transcript audit not found")
+
+    window_end = end_seconds if end_seconds is not None else float("inf")
+    audit_results: dict = transcript_audit.get("audit_results") or {}
+
+    sections = [
+        section
+        for section in (audit_results.get("section_breakdown") or {}).get("section_breakdown", [])
+        if "start_time" in section
+        and section["start_time"] <= window_end
+        and section["end_time"] >= start_seconds
+    ]
+    recorded_line_verdicts = [
+        chunk
+        for chunk in (audit_results.get("recorded_line_phrases") or {}).get("auditted_chunks", [])
+        if "human_transfer_time" in chunk
+        and start_seconds <= chunk["human_transfer_time"] <= window_end
+    ]
+
+    return Response(
+        content=TranscriptAuditResult.mongo_to_json(
+            {
+                "transcript_audit_result_id": transcript_audit_id,
+                "start_seconds": start_seconds,
+                "end_seconds": end_seconds,
+                "sections": sections,
+                "recorded_line_verdicts": recorded_line_verdicts,
+            }
+        ),
+        media_type="application/json",
     )
-    return TranscriptAuditResult(**transcript_audit)
+
+
+@router.get("/transcript/audits/{transcript_audit_id}/events")
+async def stream_transcript_audit_events(transcript_audit_id: str):
+    """
+    Server-Sent Events for an existing transcript audit. Emits the current status of every
+    audit type, then one event per audit type as it completes, and closes once all audit
+    types are completed or failed. Completions in this worker arrive through the in-process
+    broker; audits running in other workers are picked up by re-reading the document every
+    `EVENTS_POLL_INTERVAL_SECONDS`.
+    """
+    if not ObjectId.is_valid(transcript_audit_id):
+        raise HTTPException(status_code=400, detail="Invalid transcript audit id")
+
+    broker = get_audit_event_broker()
+    # Note: Subscribe before reading the document so no completion between the two is missed
+    queue = broker.subscribe(transcript_audit_id)
+
+    mongo_client = get_mongo_client()
+    transcript_audit = await mongo_client.find_one(
+        TranscriptAuditResult.collection_name(),
+        {"_id": transcript_audit_id},
+        projection=EVENTS_PROJECTION,
+    )
+    if not transcript_audit:
+        broker.unsubscribe(transcript_audit_id, queue)
+        raise HTTPException(status_code=404, detail="Transcript audit not found")
+
+    terminal_statuses = {AuditStatus.COMPLETED.value, AuditStatus.FAILED.value}
+    status: dict[str, str] = dict(transcript_audit.get("status", {}))
+    audit_results: dict = transcript_audit.get("audit_results") or {}
+
+    def sse_event(payload: dict) -> bytes:
+        return b"event: audit\ndata: " + TranscriptAuditResult.mongo_to_json(payload) + b"\n\n"
+
+    async def stream() -> AsyncIterator[bytes]:
+        try:
+            for audit_type, audit_status in status.items():
+                yield sse_event(
+                    {
+                        "transcript_audit_result_id": transcript_audit_id,
+                        "audit_type": audit_type,
+                        "status": audit_status,
+                        "result": audit_results.get(audit_type),
+                        "error": None,
+                    }
+                )
+
+            while any(audit_status not in terminal_statuses for audit_status in status.values()):
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=EVENTS_POLL_INTERVAL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    latest = await mongo_client.find_one(
+                        TranscriptAuditResult.collection_name(),
+                        {"_id": transcript_audit_id},
+                        projection=EVENTS_PROJECTION,
+                    )
+                    if not latest:
+                        return
+
+                    latest_results: dict = latest.get("audit_results") or {}
+                    for audit_type, audit_status in latest.get("status", {}).items():
+                        if status.get(audit_type) != audit_status:
+                            status[audit_type] = audit_status
+                            yield sse_event(
+                                {
+                                    "transcript_audit_result_id": transcript_audit_id,
+                                    "audit_type": audit_type,
+                                    "status": audit_status,
+                                    "result": latest_results.get(audit_type),
+                                    "error": None,
+                                }
+                            )
+                    continue
+
+                if status.get(event["audit_type"]) == event["status"]:
+                    continue
+                status[event["audit_type"]] = event["status"]
+                yield sse_event(event)
+        finally:
+            broker.unsubscribe(transcript_audit_id, queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
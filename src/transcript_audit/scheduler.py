@@ -0,0 +1,209 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Coroutine, Iterable, Optional
+from src.profiling import span
+
+# Note: Rough size of the system prompts and schemas sent along with the transcript per audit type
+PROMPT_TOKENS_ESTIMATE = 2000
+
+# Note: Used for Retry-After until this worker has finished an audit
+DEFAULT_AUDIT_SECONDS = 30.0
+
+
+def estimate_audit_tokens(contents: Iterable[str]) -> int:
+    """Estimated LLM tokens for one audit type of a transcript, at ~4 characters per token."""
+    return sum(len(content) for content in contents) // 4 + PROMPT_TOKENS_ESTIMATE
+
+
+def _parse_org_weights(value: str) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for entry in value.split(","):
+        if "=" in entry:
+            org_id, weight = entry.split("=", 1)
+            weights[org_id.strip()] = float(weight)
+    return weights
+
+
+class AuditAdmissionError(Exception):
+    """Raised when an org is over its queue or token budget, the request should be retried later."""
+
+    def __init__(self, message: str, retry_after_seconds: float):
+        super().__init__(message)
+        self.retry_after_seconds = max(1, math.ceil(retry_after_seconds))
+
+
+class _OrgState:
+    __slots__ = ("weight", "queue", "running", "virtual_finish", "tokens", "tokens_updated_at")
+
+    def __init__(self, weight: float, token_capacity: float):
+        self.weight = weight
+        self.queue: deque[tuple[float, asyncio.Future]] = deque()
+        self.running = 0
+        self.virtual_finish = 0.0
+        self.tokens = token_capacity
+        self.tokens_updated_at = time.monotonic()
+
+
+class AuditScheduler:
+    """
+    Runs audits with weighted fair queuing across orgs. Every audit gets a virtual start
+    time from its org's previous finish time plus its estimated tokens divided by the org's
+    weight, and free slots go to the queued audit with the earliest virtual start. A bulk
+    load therefore only delays its own org, while a small org's audits start as soon as a
+    slot frees up.
+
+    Admission control bounds the audits each org can have queued and the tokens it can
+    submit per minute. Requests over either limit are rejected with a retry-after hint
+    instead of queueing without bound.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        org_max_concurrency: int,
+        org_max_queued: int,
+        org_tokens_per_minute: int = 0,
+        org_weights: Optional[dict[str, float]] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.org_max_concurrency = org_max_concurrency
+        self.org_max_queued = org_max_queued
+        self.org_tokens_per_minute = org_tokens_per_minute
+        self.org_weights = org_weights or {}
+
+        self._orgs: dict[str, _OrgState] = {}
+        self._running = 0
+        self._virtual_time = 0.0
+        self._average_audit_seconds: Optional[float] = None
+
+    def _org(self, org_id: str) -> _OrgState:
+        if org_id not in self._orgs:
+            self._orgs[org_id] = _OrgState(
+                self.org_weights.get(org_id, 1.0), float(self.org_tokens_per_minute)
+            )
+        return self._orgs[org_id]
+
+    def _refill_tokens(self, org: _OrgState):
+        now = time.monotonic()
+        org.tokens = min(
+            float(self.org_tokens_per_minute),
+            org.tokens + (now - org.tokens_updated_at) * self.org_tokens_per_minute / 60,
+        )
+        org.tokens_updated_at = now
+
+    def admit(self, org_id: str, estimated_tokens: int):
+        """Reserves `estimated_tokens` of the org's budget, raises `AuditAdmissionError` if over a limit."""
+        org = self._org(org_id)
+
+        if self.org_max_queued and len(org.queue) >= self.org_max_queued:
+            average_audit_seconds = self._average_audit_seconds or DEFAULT_AUDIT_SECONDS
+            raise AuditAdmissionError(
+                f"Too many queued audits for org {org_id}",
+                average_audit_seconds * len(org.queue) / self.org_max_concurrency,
+            )
+
+        if self.org_tokens_per_minute:
+            self._refill_tokens(org)
+            # Note: A transcript larger than the whole budget is let through once the budget is full
+            required_tokens = min(estimated_tokens, self.org_tokens_per_minute)
+            if org.tokens < required_tokens:
+                raise AuditAdmissionError(
+                    f"Token budget exceeded for org {org_id}",
+                    (required_tokens - org.tokens) * 60 / self.org_tokens_per_minute,
+                )
+            org.tokens -= estimated_tokens
+
+    async def run(
+        self, org_id: str, estimated_tokens: int, audit: Coroutine[Any, Any, Any]
+    ) -> Any:
+        """Waits for a slot for the org, then runs the audit in it."""
+        org = self._org(org_id)
+
+        virtual_start = max(self._virtual_time, org.virtual_finish)
+        org.virtual_finish = virtual_start + max(1, estimated_tokens) / org.weight
+
+        slot = asyncio.get_running_loop().create_future()
+        entry = (virtual_start, slot)
+        org.queue.append(entry)
+        self._dispatch()
+
+        try:
+            with span("scheduler.queue", org_id=org_id):
+                await slot
+        except asyncio.CancelledError:
+            if slot.done() and not slot.cancelled():
+                self._release(org)
+            elif entry in org.queue:
+                org.queue.remove(entry)
+            audit.close()
+            raise
+
+        started_at = time.monotonic()
+        try:
+            return await audit
+        finally:
+            self._record_audit_seconds(time.monotonic() - started_at)
+            self._release(org)
+
+    def _dispatch(self):
+        while self._running < self.max_concurrency:
+            next_org: Optional[_OrgState] = None
+            for org in self._orgs.values():
+                if not org.queue or org.running >= self.org_max_concurrency:
+                    continue
+                if next_org is None or org.queue[0][0] < next_org.queue[0][0]:
+                    next_org = org
+
+            if next_org is None:
+                return
+
+            virtual_start, slot = next_org.queue.popleft()
+            # Note: The waiting audit was cancelled but hasn't removed itself from the queue yet
+            if slot.done():
+                continue
+            self._virtual_time = max(self._virtual_time, virtual_start)
+            next_org.running += 1
+            self._running += 1
+            slot.set_result(None)
+
+    def _release(self, org: _OrgState):
+        org.running -= 1
+        self._running -= 1
+        self._dispatch()
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "running": self._running,
+            "queued": sum(len(org.queue) for org in self._orgs.values()),
+            "average_audit_seconds": self._average_audit_seconds,
+            "orgs": {
+                org_id: {"running": org.running, "queued": len(org.queue)}
+                for org_id, org in self._orgs.items()
+                if org.running or org.queue
+            },
+        }
+
+    def _record_audit_seconds(self, seconds: float):
+        if self._average_audit_seconds is None:
+            self._average_audit_seconds = seconds
+        else:
+            self._average_audit_seconds = 0.9 * self._average_audit_seconds + 0.1 * seconds
+
+
+_audit_scheduler: Optional[AuditScheduler] = None
+
+
+def get_audit_scheduler() -> AuditScheduler:
+    global _audit_scheduler
+    if _audit_scheduler is None:
+        _audit_scheduler = AuditScheduler(
+            max_concurrency=int(os.getenv("AUDIT_MAX_CONCURRENCY", "16")),
+            org_max_concurrency=int(os.getenv("AUDIT_ORG_MAX_CONCURRENCY", "4")),
+            org_max_queued=int(os.getenv("AUDIT_ORG_MAX_QUEUED", "200")),
+            org_tokens_per_minute=int(os.getenv("AUDIT_ORG_TOKENS_PER_MINUTE", "0")),
+            org_weights=_parse_org_weights(os.getenv("AUDIT_ORG_WEIGHTS", "")),
+        )
+    return _audit_scheduler
@@ -1,5 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic_core import core_schema
 from enum import Enum
+from array import array
+from math import isnan
+from typing import Any, Iterable, Iterator, Optional, Union
 
 class AuditType(str, Enum):
     RECORDED_LINE_PHRASES = "recorded_line_phrases"
@@ -17,3 +21,181 @@ class TranscriptMessage(BaseModel):
     role: str
     content: str
 
+
+class Conversation:
+    """
+    Columnar container for a transcript's messages.
+
+    Keeps ids, roles and contents in parallel lists instead of one pydantic model per
+    message. Indexing and iteration hand out `TranscriptMessage` objects built with
+    `model_construct`, so callers keep the same `.id` / `.role` / `.content` interface.
+
+    When the export carries timing, message start / end times (seconds) are kept in
+    `array("d")` columns with NaN for messages without a timestamp.
+    """
+
+    __slots__ = ("ids", "roles", "contents", "start_times", "end_times")
+
+    def __init__(
+        self,
+        ids: Optional[list[str]] = None,
+        roles: Optional[list[str]] = None,
+        contents: Optional[list[str]] = None,
+        start_times: Optional[array] = None,
+        end_times: Optional[array] = None,
+    ):
+        self.ids: list[str] = ids if ids is not None else []
+        self.roles: list[str] = roles if roles is not None else []
+        self.contents: list[str] = contents if contents is not None else []
+        self.start_times: Optional[array] = start_times
+        self.end_times: Optional[array] = end_times
+
+    @classmethod
+    def from_messages(
+        cls, messages: Iterable[Union[TranscriptMessage, dict]]
+    ) -> "Conversation":
+        conversation = cls()
+        for message in messages:
+            if not isinstance(message, TranscriptMessage):
+                message = TranscriptMessage.model_validate(message)
+            conversation.append(message.id, message.role, message.content)
+        return conversation
+
+    @classmethod
+    def from_mongo(
+        cls,
+        documents: list[dict],
+        start_times: Optional[list[Optional[float]]] = None,
+        end_times: Optional[list[Optional[float]]] = None,
+    ) -> "Conversation":
+        # Note: Trusted path for documents we stored ourselves, no per-message validation
+        return cls(
+            [document["id"] for document in documents],
+            [document["role"] for document in documents],
+            [document["content"] for document in documents],
+            _to_time_array(start_times) if start_times else None,
+            _to_time_array(end_times) if end_times else None,
+        )
+
+    def append(
+        self,
+        id: str,
+        role: str,
+        content: str,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+    ):
+        if (start_time is not None or end_time is not None) and self.start_times is None:
+            self.start_times = array("d", [float("nan")] * len(self.ids))
+            self.end_times = array("d", [float("nan")] * len(self.ids))
+
+        self.ids.append(id)
+        self.roles.append(role)
+        self.contents.append(content)
+
+        if self.start_times is not None:
+            self.start_times.append(float("nan") if start_time is None else start_time)
+            self.end_times.append(float("nan") if end_time is None else end_time)
+
+    def to_mongo(self) -> list[dict]:
+        return [
+            {"id": id, "role": role, "content": content}
+            for id, role, content in zip(self.ids, self.roles, self.contents)
+        ]
+
+    @property
+    def has_timings(self) -> bool:
+        return self.start_times is not None
+
+    def timings_to_mongo(self) -> dict[str, list[Optional[float]]]:
+        if not self.has_timings:
+            return {}
+        return {
+            "message_start_times": _from_time_array(self.start_times),
+            "message_end_times": _from_time_array(self.end_times),
+        }
+
+    def message_time_range(self, index: int) -> Optional[tuple[float, float]]:
+        if not self.has_timings:
+            return None
+
+        start, end = self.start_times[index], self.end_times[index]
+        if isnan(start):
+            return None
+        return start, start if isnan(end) else end
+
+    def time_range(self, start_index: int, end_index: int) -> Optional[tuple[float, float]]:
+        """Start time of `start_index` and end time of `end_index`, None without timing."""
+        start = self.message_time_range(start_index)
+        end = self.message_time_range(end_index)
+        if start is None or end is None:
+            return None
+        return start[0], end[1]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return Conversation(
+                self.ids[index],
+                self.roles[index],
+                self.contents[index],
+                self.start_times[index] if self.has_timings else None,
+                self.end_times[index] if self.has_timings else None,
+            )
+
+        return TranscriptMessage.model_construct(
+            id=self.ids[index], role=self.roles[index], content=self.contents[index]
+        )
+
+    def __iter__(self) -> Iterator[TranscriptMessage]:
+        for id, role, content in zip(self.ids, self.roles, self.contents):
+            yield TranscriptMessage.model_construct(id=id, role=role, content=content)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Conversation):
+            return NotImplemented
+        return (
+            self.ids == other.ids
+            and self.roles == other.roles
+            and self.contents == other.contents
+        )
+
+    def __repr__(self) -> str:
+        return f"Conversation(messages={len(self)})"
+
+    @classmethod
+    def _validate(cls, value: Any) -> "Conversation":
+        if isinstance(value, Conversation):
+            return value
+        if isinstance(value, (list, tuple)):
+            return cls.from_messages(value)
+        raise ValueError("conversation must be a list of transcript messages")
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source_type: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda conversation: conversation.to_mongo()
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls, _core_schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler
+    ) -> dict[str, Any]:
+        return handler(
+            core_schema.list_schema(TranscriptMessage.__pydantic_core_schema__)
+        )
+
+
+def _to_time_array(times: list[Optional[float]]) -> array:
+    return array("d", [float("nan") if time is None else time for time in times])
+
+
+def _from_time_array(times: array) -> list[Optional[float]]:
+    return [None if isnan(time) else time for time in times]
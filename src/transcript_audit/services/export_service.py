@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+from contextlib import aclosing
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from bson.objectid import ObjectId
+from pymongo import ASCENDING
+from src.mongo_db import get_mongo_client
+from src.transcript_audit.models import TranscriptAuditResult
+from src.transcript_audit.parquet import (
+    PartitionedParquetWriter,
+    audit_result_to_row,
+    get_audit_result_schema,
+    get_recorded_line_chunk_schema,
+    get_section_schema,
+    recorded_line_chunk_rows,
+    section_rows,
+)
+from src.transcript_audit.schemas import AuditStatus
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_FILE_NAME = "_watermark.json"
+
+IN_PROGRESS_STATUSES = {AuditStatus.PENDING.value, AuditStatus.PROCESSING.value}
+
+
+class AuditExportService:
+    """
+    Exports audit results to Parquet tables for analytics, without the transcripts:
+
+    - `audits`: one row per transcript with its statuses and totals
+    - `recorded_line_chunks`: one row per human transfer
+    - `sections`: one row per section
+
+    Each table is partitioned by org and date. Exports are incremental, every run picks up
+    after the `(created_at, _id)` watermark saved by the previous one in the output directory.
+    """
+
+    async def ensure_indexes(self):
+        await get_mongo_client().create_index(
+            TranscriptAuditResult.collection_name(),
+            [("created_at", ASCENDING), ("_id", ASCENDING)],
+            name="transcript_export_created_at",
+        )
+
+    @staticmethod
+    def read_watermark(output_dir: str) -> Optional[tuple[datetime, str]]:
+        path = os.path.join(output_dir, WATERMARK_FILE_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path) as file:
+            watermark = json.load(file)
+        return datetime.fromisoformat(watermark["created_at"]), watermark["id"]
+
+    @staticmethod
+    def write_watermark(output_dir: str, watermark: tuple[datetime, str]):
+        path = os.path.join(output_dir, WATERMARK_FILE_NAME)
+        # Note: Written to a temporary file first so an interrupted run never leaves a partial watermark
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(
+                {
+                    "created_at": watermark[0].isoformat(),
+                    "id": watermark[1],
+                    "exported_at": datetime.now(timezone.utc).isoformat(),
+                },
+                file,
+            )
+        os.replace(f"{path}.tmp", path)
+
+    @staticmethod
+    def get_export_pipeline(watermark: Optional[tuple[datetime, str]]) -> list[dict[str, Any]]:
+        pipeline: list[dict[str, Any]] = []
+        if watermark is not None:
+            created_at, id = watermark
+            # Note: The _id tie break keeps audits created in the same millisecond from being skipped
+            pipeline.append(
+                {
+                    "$match": {
+                        "$or": [
+                            {"created_at": {"$gt": created_at}},
+                            {"created_at": created_at, "_id": {"$gt": ObjectId(id)}},
+                        ]
+                    }
+                }
+            )
+
+        pipeline += [
+            {"$sort": {"created_at": ASCENDING, "_id": ASCENDING}},
+            # Note: The transcript is most of each document, only its length is exported
+            # Note: Compressed transcripts store their length next to the blob
+            {
+                "$set": {
+                    "total_messages": {
+                        "$ifNull": [
+                            "$total_messages",
+                            {"$size": {"$ifNull": ["$conversation_history", []]}},
+                        ]
+                    }
+                }
+            },
+            {
+                "$unset": [
+                    "conversation_history",
+                    "conversation_history_compressed",
+                    "message_start_times",
+                    "message_end_times",
+                ]
+            },
+        ]
+        return pipeline
+
+    @staticmethod
+    def is_in_progress(document: dict[str, Any]) -> bool:
+        return any(
+            getattr(status, "value", status) in IN_PROGRESS_STATUSES
+            for status in (document.get("status") or {}).values()
+        )
+
+    async def export(
+        self,
+        output_dir: str,
+        full: bool = False,
+        in_progress_timeout: timedelta = timedelta(hours=1),
+        batch_size: int = 1000,
+    ) -> dict[str, Any]:
+        mongo_client = get_mongo_client()
+        await self.ensure_indexes()
+
+        watermark = None if full else self.read_watermark(output_dir)
+        logger.info("[AuditExportService.export] Exporting audits after watermark %s", watermark)
+
+        # Note: Every run writes new files, so exports never rewrite what analytics already loaded
+        file_name = f"part-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}.parquet"
+        writers = {
+            "audits": PartitionedParquetWriter(
+                os.path.join(output_dir, "audits"), file_name, get_audit_result_schema(), batch_size
+            ),
+            "recorded_line_chunks": PartitionedParquetWriter(
+                os.path.join(output_dir, "recorded_line_chunks"),
+                file_name,
+                get_recorded_line_chunk_schema(),
+                batch_size,
+            ),
+            "sections": PartitionedParquetWriter(
+                os.path.join(output_dir, "sections"), file_name, get_section_schema(), batch_size
+            ),
+        }
+
+        in_progress_before = datetime.now(timezone.utc) - in_progress_timeout
+        new_watermark = watermark
+        try:
+            documents = mongo_client.stream_aggregate(
+                TranscriptAuditResult.collection_name(),
+                self.get_export_pipeline(watermark),
+                batch_size=batch_size,
+                read_preference=mongo_client.analytics_read_preference,
+            )
+            async with aclosing(documents):
+                async for document in documents:
+                    created_at: datetime = document["created_at"]
+                    if created_at.tzinfo is None:
+                        created_at = created_at.replace(tzinfo=timezone.utc)
+
+                    # Note: Stops at the first unfinished audit so the watermark never skips past it,
+                    # audits stuck for longer than the timeout are exported as they are
+                    if self.is_in_progress(document) and created_at > in_progress_before:
+                        logger.info(
+                            "[AuditExportService.export] Stopping at in progress audit %s",
+                            document["_id"],
+                        )
+                        break
+
+                    writers["audits"].write(
+                        audit_result_to_row(document, include_audit_results=False)
+                    )
+                    for row in recorded_line_chunk_rows(document):
+                        writers["recorded_line_chunks"].write(row)
+                    for row in section_rows(document):
+                        writers["sections"].write(row)
+                    new_watermark = (document["created_at"], document["_id"])
+        finally:
+            for writer in writers.values():
+                writer.close()
+            # Note: Also saved when the export fails part way, the closed files hold every row up to it
+            if new_watermark is not None and new_watermark != watermark:
+                self.write_watermark(output_dir, new_watermark)
+
+        summary = {table: writer.rows_written for table, writer in writers.items()}
+        logger.info(
+            "[AuditExportService.export] Exported %s, watermark %s", summary, new_watermark
+        )
+        return summary
+
+
+_export_service = AuditExportService()
+
+
+def get_export_service() -> AuditExportService:
+    return _export_service
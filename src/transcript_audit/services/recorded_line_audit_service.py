@@ -1,34 +1,90 @@
 import os
 import logging
-import json
 import asyncio
 from bson.objectid import ObjectId
-from src.transcript_audit.schemas import TranscriptMessage, AuditStatus
-from src.transcript_audit.util import convert_transcript_message_to_xml
-from src.openai_client.client import OpenAIClient
+from pydantic import ValidationError
+from src.transcript_audit.schemas import Conversation, TranscriptMessage, AuditStatus, AuditType
+from src.transcript_audit.util import (
+    convert_transcript_message_to_xml,
+    get_audit_unit_max_attempts,
+    retry_unit,
+)
+from src.transcript_audit.windows import TransferWindow, plan_transfer_windows
+from src.transcript_audit.normalize import get_normalization_settings, normalize_conversation
+from src.openai_client.client import OpenAIClient, get_openai_client
+from src.openai_client.limiter import get_llm_limiter
 from src.transcript_audit.prompts.recorded_line_phrase_audit import (
     get_human_transfer_detection_audit_prompt,
     get_recorded_line_phrase_audit_prompt,
 )
 from src.mongo_db import get_mongo_client
+from src.transcript_audit.prompts.response_formats import (
+    HUMAN_TRANSFER_INDICES,
+    RECORDED_LINE_VERDICT,
+    RECORDED_LINE_VERDICTS,
+)
 from src.transcript_audit.models import TranscriptAuditResult
-from typing import Any
+from src.transcript_audit.events import get_audit_event_broker
+from src.transcript_audit.services.stats_service import get_stats_service
+from src.transcript_audit.fingerprints import AGENT_NAME_PLACEHOLDER, fingerprint
+from src.profiling import span, traced
+from typing import Any, Optional
 
 logger = logging.getLogger(__name__)
 
-
 class RecordedLineAuditService:
+    MODEL = "chatgpt-4o-latest"
+    # Note: Bump when the user prompts built below change, system prompts and schemas are hashed already
+    PROMPT_VERSION = 1
+
+    def get_step_fingerprints(self) -> dict[str, str]:
+        """Fingerprints of the transfer detection and recorded line steps, stored with the results."""
+        return {
+            "human_transfers": fingerprint(
+                self.MODEL,
+                self.PROMPT_VERSION,
+                get_human_transfer_detection_audit_prompt(),
+                HUMAN_TRANSFER_INDICES.response_format,
+                get_normalization_settings(),
+            ),
+            "recorded_line": fingerprint(
+                self.MODEL,
+                self.PROMPT_VERSION,
+                get_recorded_line_phrase_audit_prompt(AGENT_NAME_PLACEHOLDER),
+                RECORDED_LINE_VERDICTS.response_format,
+                os.getenv("RECORDED_LINE_WINDOW_START_OFFSET", "3"),
+                os.getenv("RECORDED_LINE_WINDOW_END_OFFSET", "4"),
+                os.getenv("RECORDED_LINE_BATCH_MODE", "false").lower(),
+            ),
+        }
+
+    def get_fingerprint(self) -> str:
+        return fingerprint(self.get_step_fingerprints())
+
+    def get_reusable_transfer_indices(self, previous_audit: Optional[dict]) -> Optional[list[int]]:
+        """Stored transfer indices, when they were detected with the current transfer detection step."""
+        if not previous_audit or "human_transfer_indices" not in previous_audit:
+            return None
+        stored_fingerprint = previous_audit.get("fingerprints", {}).get("human_transfers")
+        if stored_fingerprint != self.get_step_fingerprints()["human_transfers"]:
+            return None
+        return previous_audit["human_transfer_indices"]
+
+    @traced("recorded_line.human_transfers")
     async def _get_human_agent_transfers(
-        self, conversation: list[TranscriptMessage]
+        self, conversation: Conversation
     ) -> list[int]:
-        openai_client = OpenAIClient(model="chatgpt-4o-latest")
+        openai_client = get_openai_client(model=self.MODEL)
 
-        xml_messages = []
+        with span("prompt.human_transfers"):
+            # Note: Detection reads the whole transcript, compacted so hold loops and silences aren't sent verbatim
+            normalized = normalize_conversation(conversation)
+            xml_messages = []
 
-        for index, message in enumerate(conversation):
-            xml_messages.append(convert_transcript_message_to_xml(message, index))
+            for index, message in enumerate(normalized.conversation):
+                xml_messages.append(convert_transcript_message_to_xml(message, index))
 
-        user_prompt = f"""
+            user_prompt = f"""
 Here is the conversation history:
 <messages>
 {"\n".join(xml_messages)}
@@ -37,120 +93,335 @@ Here is the conversation history:
 Please return the indices of the messages where every time a new human agent comes on the line.
 """
         logger.info(
-            "[RecordedLineAuditService._get_human_agent_transfers] Getting indices of human agent transfers"
+            "[RecordedLineAuditService._get_human_agent_transfers] Getting indices of human agent transfers in %d of %d messages",
+            len(normalized),
+            len(conversation),
         )
 
-        response_format = {
-            "type": "json_schema",
-            "name": "human_transfer_indices",
-            "strict": True,
-            "schema": {
-                "type": "object",
-                "properties": {
-                    "indices": {
-                        "type": "array",
-                        "items": {"type": "integer"},
-                        "description": "List of message indices where a new human agent comes on the line",
-                    }
-                },
-                "required": ["indices"],
-                "additionalProperties": False,
-            },
+        async def detect_transfers() -> list[int]:
+            response = await openai_client.generate_response(
+                system_prompt=get_human_transfer_detection_audit_prompt(),
+                messages=[{"role": "user", "content": user_prompt}],
+                response_format=HUMAN_TRANSFER_INDICES.response_format,
+            )
+            return HUMAN_TRANSFER_INDICES.parse(response)["indices"]
+
+        indices = await retry_unit(detect_transfers, "Human transfer detection")
+
+        # Note: Indices outside of the conversation can't be audited, drop them instead of failing the audit
+        transfer_indices = sorted(
+            {normalized.original_index(index) for index in indices if 0 <= index < len(normalized)}
+        )
+        if len(transfer_indices) != len(indices):
+            logger.warning(
+                "[RecordedLineAuditService._get_human_agent_transfers] Dropped invalid or duplicate transfer indices: %s",
+                indices,
+            )
+
+        return transfer_indices
+
+    @staticmethod
+    def _window_to_xml(conversation: Conversation, window: TransferWindow) -> str:
+        xml_messages = []
+
+        for i, message in enumerate(conversation[window.start : window.end]):
+            xml_messages.append(
+                convert_transcript_message_to_xml(message, window.start + i)
+            )
+
+        return "\n".join(xml_messages)
+
+    @staticmethod
+    def _collect_verdicts(
+        verdicts: list[dict], windows: list[TransferWindow]
+    ) -> dict[int, dict]:
+        """
+        Validates verdicts one by one against the windows they belong to and returns the
+        valid ones keyed by transfer index. Invalid or unexpected verdicts are dropped.
+        """
+        window_by_transfer_index = {
+            transfer_index: window
+            for window in windows
+            for transfer_index in window.transfer_indices
         }
 
+        audit_results: dict[int, dict] = {}
+
+        for raw_verdict in verdicts:
+            try:
+                verdict = RECORDED_LINE_VERDICT.validate_python(raw_verdict)
+            except ValidationError:
+                continue
+
+            window = window_by_transfer_index.get(verdict["transfer_index"])
+            index = verdict["index"]
+            if window is None or not window.start <= index < window.end:
+                continue
+
+            audit_results[verdict["transfer_index"]] = {
+                "status": AuditStatus.COMPLETED,
+                "has_recorded_line_phrase": verdict["has_recorded_line_phrase"],
+                "recorded_line_phrase_index": index,
+            }
+
+        return audit_results
+
+    async def _get_window_verdicts(
+        self,
+        openai_client: OpenAIClient,
+        conversation: Conversation,
+        window: TransferWindow,
+        agent_name: str,
+    ) -> dict[int, dict]:
+        with span("prompt.recorded_line_window", transfers=len(window.transfer_indices)):
+            user_prompt = f"""
+Here is the conversation chunk:
+<messages>
+{self._window_to_xml(conversation, window)}
+</messages>
+
+A new human agent comes on the line at the messages with these <index> values: {window.transfer_indices}
+
+For each of these transfers, please return whether the voice agent explicitly stated that the call is on a recorded line when introducing itself to that human agent.
+"""
+
         response = await openai_client.generate_response(
-            system_prompt=get_human_transfer_detection_audit_prompt(),
+            system_prompt=get_recorded_line_phrase_audit_prompt(agent_name),
             messages=[{"role": "user", "content": user_prompt}],
-            response_format=response_format,
+            response_format=RECORDED_LINE_VERDICTS.response_format,
+        )
+
+        return self._collect_verdicts(
+            RECORDED_LINE_VERDICTS.parse(response)["verdicts"], [window]
         )
 
-        return json.loads(response)["indices"]
+    async def _get_batched_verdicts(
+        self,
+        openai_client: OpenAIClient,
+        conversation: Conversation,
+        windows: list[TransferWindow],
+        agent_name: str,
+    ) -> dict[int, dict]:
+        chunks = []
 
+        for window in windows:
+            chunks.append(
+                f"""<chunk>
+<transfer_indices>{window.transfer_indices}</transfer_indices>
+<messages>
+{self._window_to_xml(conversation, window)}
+</messages>
+</chunk>"""
+            )
+
+        user_prompt = f"""
+Here are the conversation chunks around every human agent transfer in the call. Each chunk lists the <index> values where a new human agent comes on the line in <transfer_indices>:
+{"\n".join(chunks)}
+
+For every transfer index of every chunk, please return whether the voice agent explicitly stated that the call is on a recorded line when introducing itself to that human agent.
+"""
+
+        # Note: Any request or parse error leaves every transfer missing, so the per window path audits them
+        try:
+            response = await openai_client.generate_response(
+                system_prompt=get_recorded_line_phrase_audit_prompt(agent_name),
+                messages=[{"role": "user", "content": user_prompt}],
+                response_format=RECORDED_LINE_VERDICTS.response_format,
+            )
+            verdicts = RECORDED_LINE_VERDICTS.parse(response)["verdicts"]
+        except Exception as e:
+            logger.warning(
+                "[RecordedLineAuditService._get_batched_verdicts] Batched request failed, falling back per window: %s",
+                e,
+            )
+            return {}
+
+        return self._collect_verdicts(verdicts, windows)
+
+    @traced("recorded_line.verdicts")
     async def _get_recorded_line_phrases(
         self,
-        conversation: list[TranscriptMessage],
+        conversation: Conversation,
         human_transfer_indices: list[int],
         agent_name: str,
     ) -> dict[int, dict]:
-        openai_client = OpenAIClient(model="chatgpt-4o-latest")
-        start_offset = 3
-        end_offset = 4
+        openai_client = get_openai_client(model=self.MODEL)
+
+        # Note: Messages before / after each human transfer sent along with it for the recorded line check
+        start_offset = int(os.getenv("RECORDED_LINE_WINDOW_START_OFFSET", "3"))
+        end_offset = int(os.getenv("RECORDED_LINE_WINDOW_END_OFFSET", "4"))
+        windows = plan_transfer_windows(
+            human_transfer_indices, len(conversation), start_offset, end_offset
+        )
 
         logger.info(
-            f"[RecordedLineAuditService._get_recorded_line_phrases] Getting recorded line phrases for {human_transfer_indices} transfers"
+            "[RecordedLineAuditService._get_recorded_line_phrases] Getting recorded line phrases for %s transfers in %d windows",
+            human_transfer_indices,
+            len(windows),
         )
 
-        # Prepare all prompts and data first
-        tasks = []
-        transfer_indices_order = []
+        audit_results: dict[int, dict] = {}
+
+        # Note: Opt-in, sends every window in one request so the long system prompt is paid once per transcript
+        if len(windows) > 1 and os.getenv("RECORDED_LINE_BATCH_MODE", "false").lower() == "true":
+            audit_results = await self._get_batched_verdicts(
+                openai_client, conversation, windows, agent_name
+            )
 
-        for transfer_index in human_transfer_indices:
-            conversation_chunk = conversation[
-                transfer_index - start_offset : transfer_index + end_offset
+            missing_transfer_indices = [
+                transfer_index
+                for window in windows
+                for transfer_index in window.transfer_indices
+                if transfer_index not in audit_results
             ]
+            if missing_transfer_indices:
+                logger.info(
+                    "[RecordedLineAuditService._get_recorded_line_phrases] Falling back per window for transfers %s",
+                    missing_transfer_indices,
+                )
+            windows = plan_transfer_windows(
+                missing_transfer_indices, len(conversation), start_offset, end_offset
+            )
 
-            xml_messages = []
+        # Note: Each attempt only re-requests the transfers still missing a valid verdict
+        errors: dict[int, str] = {}
+        max_attempts = get_audit_unit_max_attempts()
+        for attempt in range(1, max_attempts + 1):
+            if not windows:
+                break
+
+            window_results = await asyncio.gather(
+                *[
+                    self._get_window_verdicts(openai_client, conversation, window, agent_name)
+                    for window in windows
+                ],
+                return_exceptions=True,
+            )
 
-            for i, message in enumerate(conversation_chunk):
-                xml_messages.append(
-                    convert_transcript_message_to_xml(
-                        message, transfer_index - start_offset + i
+            for window, window_result in zip(windows, window_results):
+                if isinstance(window_result, asyncio.CancelledError):
+                    raise window_result
+                if isinstance(window_result, Exception):
+                    logger.warning(
+                        "[RecordedLineAuditService._get_recorded_line_phrases] Window %d-%d failed (attempt %d/%d): %s",
+                        window.start,
+                        window.end,
+                        attempt,
+                        max_attempts,
+                        window_result,
                     )
-                )
+                    for transfer_index in window.transfer_indices:
+                        errors[transfer_index] = str(window_result)
+                else:
+                    audit_results.update(window_result)
+
+            missing_transfer_indices = [
+                transfer_index
+                for window in windows
+                for transfer_index in window.transfer_indices
+                if transfer_index not in audit_results
+            ]
+            windows = plan_transfer_windows(
+                missing_transfer_indices, len(conversation), start_offset, end_offset
+            )
 
-            user_prompt = f"""
-Here is the conversation chunk:
-<messages>
-{"\n".join(xml_messages)}
-</messages>
+        for transfer_index in [index for window in windows for index in window.transfer_indices]:
+            audit_results[transfer_index] = {
+                "status": AuditStatus.FAILED,
+                "error": errors.get(transfer_index, "Missing recorded line verdict"),
+            }
 
-Please return whether the voice agent explicitly stated that the call is on a recorded line when introducing itself to a human agent.
-"""
+        return audit_results
 
-            response_format = {
-                "type": "json_schema",
-                "name": "recorded_line_detection",
-                "strict": True,
-                "schema": {
-                    "type": "object",
-                    "properties": {
-                        "has_recorded_line_phrase": {
-                            "type": "boolean",
-                            "description": "Whether the voice agent explicitly stated that the call is on a recorded line",
-                        },
-                        "index": {
-                            "type": "integer",
-                            "description": "The value of the <index> tag of the message where the voice agent introduced itself to the human staff and irrespective of whether it stated that the call is on a recorded line.",
-                        },
-                    },
-                    "required": ["has_recorded_line_phrase", "index"],
-                    "additionalProperties": False,
-                },
-            }
+    @traced("recorded_line.run")
+    async def run(
+        self,
+        conversation: Conversation,
+        agent_name: str,
+        human_transfer_indices: Optional[list[int]] = None,
+    ) -> dict:
+        """
+        Runs the recorded line audit of a conversation without reading or writing MongoDB.
+        Transfer detection is skipped when `human_transfer_indices` are given.
+        """
+        logger.info("[RecordedLineAuditService.run] Starting audit")
+        # Note: The transcript's window fan-out is capped to a share of the LLM concurrency limit
+        with get_llm_limiter().transcript_scope():
+            if human_transfer_indices is None:
+                human_transfer_indices = await self._get_human_agent_transfers(conversation)
+            logger.info(
+                "[RecordedLineAuditService.run] Human transfer indices: %s", human_transfer_indices
+            )
 
-            task = openai_client.generate_response(
-                system_prompt=get_recorded_line_phrase_audit_prompt(agent_name),
-                messages=[{"role": "user", "content": user_prompt}],
-                response_format=response_format,
+            recorded_line_phrases = await self._get_recorded_line_phrases(
+                conversation, human_transfer_indices, agent_name
             )
-            tasks.append(task)
-            transfer_indices_order.append(transfer_index)
 
-        responses = await asyncio.gather(*tasks)
+        recorded_lines_audit: dict[str, Any] = {
+            "total_human_transfers": len(human_transfer_indices),
+            "total_recorded_line_phrases": 0,
+            "failed_chunks": 0,
+            "auditted_chunks": [],
+            # Note: Kept so a re-audit after a recorded line prompt change can skip transfer detection
+            "human_transfer_indices": human_transfer_indices,
+            "fingerprints": self.get_step_fingerprints(),
+        }
 
-        audit_results: dict[int, dict] = {}
+        for index, phrase_result in sorted(recorded_line_phrases.items()):
+            human_transfer_message: TranscriptMessage = conversation[index]
+            auditted_chunk = {
+                "status": phrase_result["status"],
+                "human_transfer_message_id": human_transfer_message.id,
+                "human_transfer_message_content": human_transfer_message.content,
+            }
 
-        for transfer_index, response in zip(transfer_indices_order, responses):
-            result: dict = json.loads(response)
+            human_transfer_time = conversation.message_time_range(index)
+            if human_transfer_time is not None:
+                auditted_chunk["human_transfer_time"] = human_transfer_time[0]
 
-            audit_results[transfer_index] = {
-                "has_recorded_line_phrase": result["has_recorded_line_phrase"],
-                "recorded_line_phrase_index": result["index"],
-            }
+            # Note: Failed chunks are kept with their error so the rest of the audit is still saved
+            if phrase_result["status"] == AuditStatus.FAILED:
+                auditted_chunk["error"] = phrase_result["error"]
+                recorded_lines_audit["failed_chunks"] += 1
+                recorded_lines_audit["auditted_chunks"].append(auditted_chunk)
+                continue
 
-        return audit_results
+            recorded_line_phrase_index: int = phrase_result[
+                "recorded_line_phrase_index"
+            ]
+            recorded_line_phrase_message: TranscriptMessage = conversation[
+                recorded_line_phrase_index
+            ]
+
+            if phrase_result["has_recorded_line_phrase"]:
+                recorded_lines_audit["total_recorded_line_phrases"] += 1
+
+            auditted_chunk["has_recorded_line_phrase"] = phrase_result["has_recorded_line_phrase"]
+            auditted_chunk["recorded_line_phrase_message_id"] = recorded_line_phrase_message.id
+            auditted_chunk["recorded_line_phrase_message_content"] = recorded_line_phrase_message.content
+
+            recorded_line_phrase_time = conversation.message_time_range(recorded_line_phrase_index)
+            if recorded_line_phrase_time is not None:
+                auditted_chunk["recorded_line_phrase_time"] = recorded_line_phrase_time[0]
+
+            recorded_lines_audit["auditted_chunks"].append(auditted_chunk)
+
+        if human_transfer_indices and recorded_lines_audit["failed_chunks"] == len(human_transfer_indices):
+            raise ValueError("Recorded line audit failed for every human transfer")
 
-    async def audit(self, transcript_audit_result_id: str, agent_name: str):
+        return recorded_lines_audit
+
+    async def audit(
+        self,
+        transcript_audit_result_id: str,
+        agent_name: str,
+        record_stats: bool = True,
+        reaudit: bool = False,
+    ):
+        """
+        Audits a stored transcript and saves the results. With `reaudit` the stored status
+        and results are only replaced once the new audit succeeds.
+        """
         try:
             mongo_client = get_mongo_client()
             transcript_audit_result_document = await mongo_client.find_one(
@@ -163,72 +434,75 @@ Please return whether the voice agent explicitly stated that the call is on a re
                     f"Transcript audit result with id {transcript_audit_result_id} not found"
                 )
 
-            transcript_audit_result = TranscriptAuditResult(
-                **transcript_audit_result_document
-            )
+            with span("from_mongo"):
+                transcript_audit_result = TranscriptAuditResult.from_mongo(
+                    transcript_audit_result_document
+                )
 
             conversation = transcript_audit_result.conversation_history
 
-            logger.info("[RecordedLineAuditService.audit] Starting audit")
-            human_transfer_indices: list[int] = await self._get_human_agent_transfers(
-                conversation
+            # Note: Re-audits reuse the stored transfers when only the recorded line step changed
+            human_transfer_indices = self.get_reusable_transfer_indices(
+                (transcript_audit_result.audit_results or {}).get(AuditType.RECORDED_LINE_PHRASES)
             )
+            recorded_lines_audit = await self.run(conversation, agent_name, human_transfer_indices)
+
             logger.info(
-                f"[RecordedLineAuditService.audit] Human transfer indices: {human_transfer_indices}"
+                "Saving audit results to database for transcript audit result id: %s",
+                transcript_audit_result_id,
             )
 
-            recorded_line_phrases = await self._get_recorded_line_phrases(
-                conversation, human_transfer_indices, agent_name
+            await mongo_client.buffered_set(
+                TranscriptAuditResult.collection_name(),
+                transcript_audit_result_id,
+                {
+                    "audit_results.recorded_line_phrases": recorded_lines_audit,
+                    "status.recorded_line_phrases": AuditStatus.COMPLETED,
+                    "audit_fingerprints.recorded_line_phrases": self.get_fingerprint(),
+                },
             )
-
-            recorded_lines_audit: dict[str, Any] = {
-                "total_human_transfers": len(human_transfer_indices),
-                "total_recorded_line_phrases": 0,
-                "auditted_chunks": [],
-            }
-
-            for index, phrase_result in recorded_line_phrases.items():
-                recorded_line_phrase_index: int = phrase_result[
-                    "recorded_line_phrase_index"
-                ]
-
-                human_transfer_message: TranscriptMessage = conversation[index]
-                recorded_line_phrase_message: TranscriptMessage = conversation[
-                    recorded_line_phrase_index
-                ]
-
-                if phrase_result["has_recorded_line_phrase"]:
-                    recorded_lines_audit["total_recorded_line_phrases"] += 1
-
-                recorded_lines_audit["auditted_chunks"].append(
-                    {
-                        "has_recorded_line_phrase": phrase_result[
-                            "has_recorded_line_phrase"
-                        ],
-                        "human_transfer_message_id": human_transfer_message.id,
-                        "human_transfer_message_content": human_transfer_message.content,
-                        "recorded_line_phrase_message_id": recorded_line_phrase_message.id,
-                        "recorded_line_phrase_message_content": recorded_line_phrase_message.content,
-                    }
-                )
-
             logger.info(
-                f"Saving audit results to database for transcript audit result id: {transcript_audit_result_id}"
+                "Audit results saved to database for transcript audit result id: %s",
+                transcript_audit_result_id,
             )
 
-            await mongo_client.update_one(
-                TranscriptAuditResult.collection_name(),
-                {"_id": ObjectId(transcript_audit_result_id)},
-                {"$set": {"audit_results.recorded_line_phrases": recorded_lines_audit, "status.recorded_line_phrases": AuditStatus.COMPLETED}},
+            # Note: Re-audits rebuild the affected days' stats with a backfill instead of incrementing twice
+            if record_stats:
+                try:
+                    await get_stats_service().record_recorded_line_audit(transcript_audit_result, recorded_lines_audit)
+                except Exception as e:
+                    logger.error("[RecordedLineAuditService.audit] Failed to update stats: %s", e)
+
+            get_audit_event_broker().publish(
+                transcript_audit_result_id,
+                AuditType.RECORDED_LINE_PHRASES,
+                AuditStatus.COMPLETED,
+                result=recorded_lines_audit,
             )
-            logger.info(f"Audit results saved to database for transcript audit result id: {transcript_audit_result_id}")
 
             return recorded_lines_audit
         except Exception as e:
-            await mongo_client.update_one(
+            logger.error("[RecordedLineAuditService.audit] Error: %s", e)
+            # Note: A failed re-audit leaves the previous results and status in place
+            if reaudit:
+                raise e
+
+            await mongo_client.buffered_set(
                 TranscriptAuditResult.collection_name(),
-                {"_id": ObjectId(transcript_audit_result_id)},
-                {"$set": {"status.recorded_line_phrases": AuditStatus.FAILED}},
+                transcript_audit_result_id,
+                {"status.recorded_line_phrases": AuditStatus.FAILED},
+            )
+            get_audit_event_broker().publish(
+                transcript_audit_result_id,
+                AuditType.RECORDED_LINE_PHRASES,
+                AuditStatus.FAILED,
+                error=str(e),
             )
-            logger.error(f"[RecordedLineAuditService.audit] Error: {e}")
             raise e
+
+
+_recorded_line_audit_service = RecordedLineAuditService()
+
+
+def get_recorded_line_audit_service() -> RecordedLineAuditService:
+    return _recorded_line_audit_service
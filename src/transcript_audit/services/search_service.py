@@ -0,0 +1,160 @@
+import logging
+from datetime import datetime
+from typing import Any, Optional
+from pymongo import ASCENDING, DESCENDING, TEXT
+from src.mongo_db import get_mongo_client
+from src.profiling import traced
+from src.transcript_audit.models import TranscriptAuditResult
+from src.transcript_audit.prompts.response_formats import SECTION_TYPES
+
+logger = logging.getLogger(__name__)
+
+RECORDED_LINE_VERDICT_FIELD = (
+    "audit_results.recorded_line_phrases.auditted_chunks.has_recorded_line_phrase"
+)
+
+SECTION_DURATIONS_FIELD = "audit_results.section_breakdown.section_durations"
+
+# Note: Search results are summaries, the full transcript is fetched through GET /transcript/audits/{id}
+SEARCH_RESULT_PROJECTION = {"conversation_history": 0, "conversation_history_compressed": 0}
+
+
+class TranscriptSearchService:
+    """
+    Cross-transcript search backed by MongoDB indexes on the audit result collection.
+    Indexes are maintained by MongoDB on every write, so results reflect audits as soon
+    as their results are saved.
+    """
+
+    async def ensure_indexes(self):
+        mongo_client = get_mongo_client()
+        collection_name = TranscriptAuditResult.collection_name()
+
+        await mongo_client.create_index(
+            collection_name,
+            [
+                ("conversation_history.content", TEXT),
+                ("transcript_file_name", TEXT),
+                ("agent_name", TEXT),
+            ],
+            name="transcript_search_text",
+            default_language="english",
+        )
+        await mongo_client.create_index(
+            collection_name,
+            [("org_id", ASCENDING), ("agent_name", ASCENDING), ("created_at", DESCENDING)],
+            name="transcript_search_org_agent",
+        )
+        await mongo_client.create_index(
+            collection_name,
+            [("org_id", ASCENDING), (RECORDED_LINE_VERDICT_FIELD, ASCENDING), ("created_at", DESCENDING)],
+            name="transcript_search_recorded_line",
+        )
+        await mongo_client.create_index(
+            collection_name,
+            [(f"{SECTION_DURATIONS_FIELD}.$**", ASCENDING)],
+            name="transcript_search_section_durations",
+        )
+        logger.info("[TranscriptSearchService.ensure_indexes] Search indexes ensured")
+
+    @staticmethod
+    def build_query(
+        text: Optional[str] = None,
+        org_id: Optional[str] = None,
+        agent_name: Optional[str] = None,
+        recorded_line_missing: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        section_type: Optional[str] = None,
+        min_section_seconds: Optional[float] = None,
+        max_section_seconds: Optional[float] = None,
+    ) -> dict[str, Any]:
+        # Note: The section type becomes part of a field path, anything else could address another field
+        if section_type is not None and section_type not in SECTION_TYPES:
+            raise ValueError(f"Unknown section type {section_type!r}, expected one of {SECTION_TYPES}")
+
+        query: dict[str, Any] = {}
+
+        if text:
+            query["$text"] = {"$search": text}
+        if org_id:
+            query["org_id"] = org_id
+        if agent_name:
+            query["agent_name"] = agent_name
+        if recorded_line_missing is True:
+            query[RECORDED_LINE_VERDICT_FIELD] = False
+        elif recorded_line_missing is False:
+            query["audit_results.recorded_line_phrases"] = {"$exists": True}
+            query[RECORDED_LINE_VERDICT_FIELD] = {"$ne": False}
+        if created_from or created_to:
+            query["created_at"] = {}
+            if created_from:
+                query["created_at"]["$gte"] = created_from
+            if created_to:
+                query["created_at"]["$lt"] = created_to
+        if section_type and (min_section_seconds is not None or max_section_seconds is not None):
+            duration_field = f"{SECTION_DURATIONS_FIELD}.{section_type}"
+            query[duration_field] = {}
+            if min_section_seconds is not None:
+                query[duration_field]["$gte"] = min_section_seconds
+            if max_section_seconds is not None:
+                query[duration_field]["$lte"] = max_section_seconds
+
+        return query
+
+    @traced("search")
+    async def search(
+        self,
+        text: Optional[str] = None,
+        org_id: Optional[str] = None,
+        agent_name: Optional[str] = None,
+        recorded_line_missing: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        section_type: Optional[str] = None,
+        min_section_seconds: Optional[float] = None,
+        max_section_seconds: Optional[float] = None,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> dict[str, Any]:
+        query = self.build_query(
+            text,
+            org_id,
+            agent_name,
+            recorded_line_missing,
+            created_from,
+            created_to,
+            section_type,
+            min_section_seconds,
+            max_section_seconds,
+        )
+        mongo_client = get_mongo_client()
+        collection_name = TranscriptAuditResult.collection_name()
+
+        projection = dict(SEARCH_RESULT_PROJECTION)
+        sort: list[tuple] = [("created_at", DESCENDING)]
+        if text:
+            projection["score"] = {"$meta": "textScore"}
+            sort = [("score", {"$meta": "textScore"}), ("created_at", DESCENDING)]
+
+        results = await mongo_client.find_many(
+            collection_name,
+            query,
+            limit=limit,
+            skip=skip,
+            sort=sort,
+            projection=projection,
+            read_preference=mongo_client.analytics_read_preference,
+        )
+        total = await mongo_client.count_documents(
+            collection_name, query, read_preference=mongo_client.analytics_read_preference
+        )
+
+        return {"total": total, "skip": skip, "limit": limit, "results": results}
+
+
+_search_service = TranscriptSearchService()
+
+
+def get_search_service() -> TranscriptSearchService:
+    return _search_service
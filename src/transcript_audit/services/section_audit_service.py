@@ -1,31 +1,49 @@
 import logging
-import json
 import asyncio
 from src.mongo_db import get_mongo_client
 from bson.objectid import ObjectId
-from src.transcript_audit.schemas import TranscriptMessage, AuditStatus
+from src.transcript_audit.schemas import Conversation, AuditStatus, AuditType
 from src.transcript_audit.models import TranscriptAuditResult
-from src.openai_client.client import OpenAIClient
+from src.transcript_audit.events import get_audit_event_broker
+from src.transcript_audit.services.stats_service import get_stats_service
+from src.openai_client.client import get_openai_client
 from src.transcript_audit.prompts.section_breakdown_audit import (
     get_section_breakdown_audit_prompt,
 )
-from src.transcript_audit.util import convert_transcript_message_to_xml
+from src.transcript_audit.prompts.response_formats import SECTION_BREAKDOWN
+from src.transcript_audit.util import convert_transcript_message_to_xml, retry_unit
+from src.transcript_audit.fingerprints import AGENT_NAME_PLACEHOLDER, fingerprint
+from src.transcript_audit.normalize import get_normalization_settings, normalize_conversation
+from src.profiling import span, traced
 
 logger = logging.getLogger(__name__)
 
 
 class SectionAuditService:
+    MODEL = "chatgpt-4o-latest"
+    # Note: Bump when the user prompt built below changes, the system prompt and schema are hashed already
+    PROMPT_VERSION = 1
+
+    def get_fingerprint(self) -> str:
+        return fingerprint(
+            self.MODEL,
+            self.PROMPT_VERSION,
+            get_section_breakdown_audit_prompt(AGENT_NAME_PLACEHOLDER),
+            SECTION_BREAKDOWN.response_format,
+            get_normalization_settings(),
+        )
 
     async def _get_section_breakdown(
-        self, conversation: list[TranscriptMessage], agent_name: str
+        self, conversation: Conversation, agent_name: str
     ) -> list[dict]:
-        openai_client = OpenAIClient(model="chatgpt-4o-latest")
+        openai_client = get_openai_client(model=self.MODEL)
 
-        xml_messages = []
+        with span("prompt.section_breakdown"):
+            xml_messages = []
 
-        for index, message in enumerate(conversation):
-            xml_messages.append(convert_transcript_message_to_xml(message, index))
-        user_prompt = f"""
+            for index, message in enumerate(conversation):
+                xml_messages.append(convert_transcript_message_to_xml(message, index))
+            user_prompt = f"""
 Here is the conversation history:
 <messages>
 {"\n".join(xml_messages)}
@@ -34,90 +52,163 @@ Here is the conversation history:
 Please return the section breakdown of the conversation in the specified JSON format.
 """
 
-        response_format = {
-            "type": "json_schema",
-            "name": "conversation_section_breakdown",
-            "strict": True,
-            "schema": {
-                "type": "object",
-                "properties": {
-                    "sections": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "section_type": {
-                                    "type": "string",
-                                    "enum": [
-                                        "IVR",
-                                        "INTRODUCTION",
-                                        "TRANSFER",
-                                        "BENEFITS_COLLECTION",
-                                    ],
-                                },
-                                "start_index": {"type": "integer"},
-                                "end_index": {"type": "integer"},
-                            },
-                            "required": ["section_type", "start_index", "end_index"],
-                            "additionalProperties": False,
-                        },
-                        "description": "List of sections in the conversation",
-                    }
-                },
-                "required": ["sections"],
-                "additionalProperties": False,
-            },
-        }
+        async def get_sections() -> list[dict]:
+            response = await openai_client.generate_response(
+                system_prompt=get_section_breakdown_audit_prompt(agent_name),
+                messages=[{"role": "user", "content": user_prompt}],
+                response_format=SECTION_BREAKDOWN.response_format,
+            )
+            return SECTION_BREAKDOWN.parse(response)["sections"]
 
-        response = await openai_client.generate_response(
-            system_prompt=get_section_breakdown_audit_prompt(agent_name),
-            messages=[{"role": "user", "content": user_prompt}],
-            response_format=response_format,
-        )
+        return await retry_unit(get_sections, "Section breakdown")
 
-        return json.loads(response)["sections"]
+    @staticmethod
+    def _split_valid_sections(
+        sections: list[dict], conversation_length: int
+    ) -> tuple[list[dict], list[dict]]:
+        """Splits sections into the ones whose indices fall within the conversation and the rest."""
+        valid_sections: list[dict] = []
+        invalid_sections: list[dict] = []
 
-    async def audit(self, transcript_audit_result_id: str, agent_name: str):
-        mongo_client = get_mongo_client()
-        transcript_audit_result_document = await mongo_client.find_one(
-            TranscriptAuditResult.collection_name(),
-            {"_id": ObjectId(transcript_audit_result_id)},
+        for section in sections:
+            if 0 <= section["start_index"] <= section["end_index"] < conversation_length:
+                valid_sections.append(section)
+            else:
+                invalid_sections.append(section)
+
+        return valid_sections, invalid_sections
+
+    @traced("section_breakdown.run")
+    async def run(self, conversation: Conversation, agent_name: str) -> dict:
+        """Runs the section breakdown audit of a conversation without reading or writing MongoDB."""
+        # Note: The model sections the compacted conversation, its indices are mapped back below
+        normalized = normalize_conversation(conversation)
+        sections, invalid_sections = self._split_valid_sections(
+            await self._get_section_breakdown(normalized.conversation, agent_name), len(normalized)
         )
-
-        if not transcript_audit_result_document:
-            raise ValueError(
-                f"Transcript audit result with id {transcript_audit_result_id} not found"
+        if invalid_sections:
+            logger.warning(
+                "[SectionAuditService.run] Dropped sections outside of the conversation: %s",
+                invalid_sections,
             )
 
-        transcript_audit_result = TranscriptAuditResult(
-            **transcript_audit_result_document
-        )
-
-        conversation = transcript_audit_result.conversation_history
-
-        sections: list[dict] = await self._get_section_breakdown(conversation, agent_name)
-
         section_breakdown: list[dict] = []
+        section_durations: dict[str, float] = {}
 
         for section in sections:
-            section_breakdown.append({
+            start_index = normalized.original_start(section["start_index"])
+            end_index = normalized.original_end(section["end_index"])
+            section_result = {
                 "section_type": section["section_type"],
-                "start_index": section["start_index"],
-                "end_index": section["end_index"],
-                "start_message_id": conversation[section["start_index"]].id,
-                "end_message_id": conversation[section["end_index"]].id,
-            })
+                "start_index": start_index,
+                "end_index": end_index,
+                "start_message_id": conversation[start_index].id,
+                "end_message_id": conversation[end_index].id,
+            }
+
+            time_range = conversation.time_range(start_index, end_index)
+            if time_range is not None:
+                section_result["start_time"], section_result["end_time"] = time_range
+                section_result["duration_seconds"] = time_range[1] - time_range[0]
+                section_durations[section["section_type"]] = (
+                    section_durations.get(section["section_type"], 0)
+                    + section_result["duration_seconds"]
+                )
+
+            section_breakdown.append(section_result)
 
         section_audit = {
             "section_breakdown": section_breakdown,
             "total_sections": len(section_breakdown),
+            "invalid_sections": len(invalid_sections),
+            "fingerprints": {"section_breakdown": self.get_fingerprint()},
         }
 
-        await mongo_client.update_one(
-            TranscriptAuditResult.collection_name(),
-            {"_id": ObjectId(transcript_audit_result_id)},
-            {"$set": {"audit_results.section_breakdown": section_audit, "status.section_breakdown": AuditStatus.COMPLETED}},
-        )
+        # Note: Total seconds per section type, indexed for time-based queries like "IVR time > 5 min"
+        if conversation.has_timings:
+            section_audit["section_durations"] = section_durations
 
         return section_audit
 
+    async def audit(
+        self,
+        transcript_audit_result_id: str,
+        agent_name: str,
+        record_stats: bool = True,
+        reaudit: bool = False,
+    ):
+        """
+        Audits a stored transcript and saves the results. With `reaudit` the stored status
+        and results are only replaced once the new audit succeeds.
+        """
+        mongo_client = get_mongo_client()
+        try:
+            transcript_audit_result_document = await mongo_client.find_one(
+                TranscriptAuditResult.collection_name(),
+                {"_id": ObjectId(transcript_audit_result_id)},
+            )
+
+            if not transcript_audit_result_document:
+                raise ValueError(
+                    f"Transcript audit result with id {transcript_audit_result_id} not found"
+                )
+
+            with span("from_mongo"):
+                transcript_audit_result = TranscriptAuditResult.from_mongo(
+                    transcript_audit_result_document
+                )
+
+            conversation = transcript_audit_result.conversation_history
+
+            section_audit = await self.run(conversation, agent_name)
+
+            await mongo_client.buffered_set(
+                TranscriptAuditResult.collection_name(),
+                transcript_audit_result_id,
+                {
+                    "audit_results.section_breakdown": section_audit,
+                    "status.section_breakdown": AuditStatus.COMPLETED,
+                    "audit_fingerprints.section_breakdown": self.get_fingerprint(),
+                },
+            )
+
+            # Note: Re-audits rebuild the affected days' stats with a backfill instead of incrementing twice
+            if record_stats:
+                try:
+                    await get_stats_service().record_section_audit(transcript_audit_result, section_audit)
+                except Exception as e:
+                    logger.error("[SectionAuditService.audit] Failed to update stats: %s", e)
+
+            get_audit_event_broker().publish(
+                transcript_audit_result_id,
+                AuditType.SECTION_BREAKDOWN,
+                AuditStatus.COMPLETED,
+                result=section_audit,
+            )
+
+            return section_audit
+        except Exception as e:
+            logger.error("[SectionAuditService.audit] Error: %s", e)
+            # Note: A failed re-audit leaves the previous results and status in place
+            if reaudit:
+                raise e
+
+            await mongo_client.buffered_set(
+                TranscriptAuditResult.collection_name(),
+                transcript_audit_result_id,
+                {"status.section_breakdown": AuditStatus.FAILED},
+            )
+            get_audit_event_broker().publish(
+                transcript_audit_result_id,
+                AuditType.SECTION_BREAKDOWN,
+                AuditStatus.FAILED,
+                error=str(e),
+            )
+            raise e
+
+
+_section_audit_service = SectionAuditService()
+
+
+def get_section_audit_service() -> SectionAuditService:
+    return _section_audit_service
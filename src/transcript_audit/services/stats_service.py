@@ -0,0 +1,388 @@
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Optional
+from pymongo import ASCENDING
+from src.mongo_db import get_mongo_client
+from src.profiling import traced
+from src.transcript_audit.models import TranscriptAuditResult, TranscriptAuditDailyStats
+from src.transcript_audit.schemas import AuditStatus
+
+logger = logging.getLogger(__name__)
+
+# Note: Upper bounds (in messages) of the section length histogram buckets
+SECTION_LENGTH_BUCKETS = [5, 10, 20, 50, 100]
+# Note: Upper bounds (in seconds) of the section duration histogram buckets, only sections with timings count
+SECTION_DURATION_BUCKETS = [30, 60, 120, 300, 600]
+
+STATS_KEY_FIELDS = ["org_id", "agent_name", "date"]
+
+
+def _get_bucket(value: float, upper_bounds: list[int]) -> str:
+    for upper_bound in upper_bounds:
+        if value <= upper_bound:
+            return f"le_{upper_bound}"
+    return f"gt_{upper_bounds[-1]}"
+
+
+def get_section_length_bucket(length: int) -> str:
+    return _get_bucket(length, SECTION_LENGTH_BUCKETS)
+
+
+def get_section_duration_bucket(duration_seconds: float) -> str:
+    return _get_bucket(duration_seconds, SECTION_DURATION_BUCKETS)
+
+
+def _bucket_switch(value: Any, upper_bounds: list[int]) -> dict[str, Any]:
+    return {
+        "$switch": {
+            "branches": [
+                {"case": {"$lte": [value, upper_bound]}, "then": f"le_{upper_bound}"}
+                for upper_bound in upper_bounds
+            ],
+            "default": f"gt_{upper_bounds[-1]}",
+        }
+    }
+
+
+def _stats_date(created_at: datetime) -> str:
+    # Note: Mongo returns naive datetimes that are already in UTC
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.strftime("%Y-%m-%d")
+
+
+def _rate(numerator: int, denominator: int) -> Optional[float]:
+    return numerator / denominator if denominator else None
+
+
+class AuditStatsService:
+    """
+    Maintains daily compliance rollups per org and agent in `TranscriptAuditDailyStats`.
+    Audit services increment them when an audit completes and `backfill` rebuilds them
+    from stored audit results with aggregation pipelines.
+    """
+
+    async def ensure_indexes(self):
+        await get_mongo_client().create_index(
+            TranscriptAuditDailyStats.collection_name(),
+            [(field, ASCENDING) for field in STATS_KEY_FIELDS],
+            name="daily_stats_key",
+            unique=True,
+        )
+
+    async def _increment(self, transcript_audit_result: TranscriptAuditResult, increments: dict[str, int]):
+        await get_mongo_client().update_one(
+            TranscriptAuditDailyStats.collection_name(),
+            {
+                "org_id": transcript_audit_result.org_id,
+                "agent_name": transcript_audit_result.agent_name,
+                "date": _stats_date(transcript_audit_result.created_at),
+            },
+            {"$inc": increments},
+            upsert=True,
+        )
+
+    async def record_recorded_line_audit(
+        self, transcript_audit_result: TranscriptAuditResult, recorded_lines_audit: dict
+    ):
+        await self._increment(
+            transcript_audit_result,
+            {
+                "recorded_line_audits": 1,
+                # Note: Transfers whose chunk failed have no verdict and must not lower the recorded line rate
+                "total_human_transfers": recorded_lines_audit["total_human_transfers"]
+                - recorded_lines_audit.get("failed_chunks", 0),
+                "total_recorded_line_phrases": recorded_lines_audit["total_recorded_line_phrases"],
+            },
+        )
+
+    async def record_section_audit(
+        self, transcript_audit_result: TranscriptAuditResult, section_audit: dict
+    ):
+        increments: dict[str, int] = defaultdict(int)
+        increments["section_breakdown_audits"] = 1
+
+        for section in section_audit["section_breakdown"]:
+            section_type = section["section_type"]
+            bucket = get_section_length_bucket(section["end_index"] - section["start_index"] + 1)
+            increments[f"section_counts.{section_type}"] += 1
+            increments[f"section_length_histogram.{section_type}.{bucket}"] += 1
+            if section.get("duration_seconds") is not None:
+                duration_bucket = get_section_duration_bucket(section["duration_seconds"])
+                increments[f"section_duration_histogram.{section_type}.{duration_bucket}"] += 1
+
+        await self._increment(transcript_audit_result, dict(increments))
+
+    @traced("stats.get_stats")
+    async def get_stats(
+        self,
+        org_id: str,
+        agent_name: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> dict[str, Any]:
+        query: dict[str, Any] = {"org_id": org_id}
+        if agent_name is not None:
+            query["agent_name"] = agent_name
+        if start_date or end_date:
+            query["date"] = {}
+            if start_date:
+                query["date"]["$gte"] = start_date.isoformat()
+            if end_date:
+                query["date"]["$lte"] = end_date.isoformat()
+
+        mongo_client = get_mongo_client()
+        rollups = await mongo_client.find_many(
+            TranscriptAuditDailyStats.collection_name(),
+            query,
+            sort=[("date", ASCENDING)],
+            read_preference=mongo_client.analytics_read_preference,
+        )
+
+        days: dict[str, dict[str, Any]] = {}
+        totals = self._empty_summary()
+        for rollup in rollups:
+            day = days.setdefault(rollup["date"], {"date": rollup["date"], **self._empty_summary()})
+            self._add_rollup(day, rollup)
+            self._add_rollup(totals, rollup)
+
+        for summary in [*days.values(), totals]:
+            summary["recorded_line_rate"] = _rate(
+                summary["total_recorded_line_phrases"], summary["total_human_transfers"]
+            )
+
+        return {
+            "org_id": org_id,
+            "agent_name": agent_name,
+            "days": list(days.values()),
+            "totals": totals,
+        }
+
+    @staticmethod
+    def _empty_summary() -> dict[str, Any]:
+        return {
+            "recorded_line_audits": 0,
+            "total_human_transfers": 0,
+            "total_recorded_line_phrases": 0,
+            "section_breakdown_audits": 0,
+            "section_counts": defaultdict(int),
+            "section_length_histogram": defaultdict(lambda: defaultdict(int)),
+            "section_duration_histogram": defaultdict(lambda: defaultdict(int)),
+        }
+
+    @staticmethod
+    def _add_rollup(summary: dict[str, Any], rollup: dict[str, Any]):
+        for field in [
+            "recorded_line_audits",
+            "total_human_transfers",
+            "total_recorded_line_phrases",
+            "section_breakdown_audits",
+        ]:
+            summary[field] += rollup.get(field, 0)
+
+        for section_type, count in rollup.get("section_counts", {}).items():
+            summary["section_counts"][section_type] += count
+
+        for histogram in ["section_length_histogram", "section_duration_histogram"]:
+            for section_type, buckets in rollup.get(histogram, {}).items():
+                for bucket, count in buckets.items():
+                    summary[histogram][section_type][bucket] += count
+
+    @staticmethod
+    def _backfill_match(
+        audit_type: str, start_date: Optional[date], end_date: Optional[date]
+    ) -> dict[str, Any]:
+        match: dict[str, Any] = {f"status.{audit_type}": AuditStatus.COMPLETED.value}
+        if start_date or end_date:
+            match["created_at"] = {}
+            if start_date:
+                match["created_at"]["$gte"] = datetime.combine(start_date, time.min)
+            if end_date:
+                match["created_at"]["$lt"] = datetime.combine(end_date + timedelta(days=1), time.min)
+        return match
+
+    @staticmethod
+    def _backfill_group_key() -> dict[str, Any]:
+        return {
+            "org_id": "$org_id",
+            "agent_name": {"$ifNull": ["$agent_name", ""]},
+            "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+        }
+
+    @staticmethod
+    def _merge_stage() -> dict[str, Any]:
+        return {
+            "$merge": {
+                "into": TranscriptAuditDailyStats.collection_name(),
+                "on": STATS_KEY_FIELDS,
+                "whenMatched": "merge",
+                "whenNotMatched": "insert",
+            }
+        }
+
+    def get_backfill_pipelines(
+        self, start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> list[list[dict[str, Any]]]:
+        key = self._backfill_group_key()
+        unpack_key = {"_id": 0, **{field: f"$_id.{field}" for field in STATS_KEY_FIELDS}}
+
+        recorded_line_pipeline = [
+            {"$match": self._backfill_match("recorded_line_phrases", start_date, end_date)},
+            {
+                "$group": {
+                    "_id": key,
+                    "recorded_line_audits": {"$sum": 1},
+                    "total_human_transfers": {
+                        "$sum": {
+                            "$subtract": [
+                                "$audit_results.recorded_line_phrases.total_human_transfers",
+                                {"$ifNull": ["$audit_results.recorded_line_phrases.failed_chunks", 0]},
+                            ]
+                        }
+                    },
+                    "total_recorded_line_phrases": {
+                        "$sum": "$audit_results.recorded_line_phrases.total_recorded_line_phrases"
+                    },
+                }
+            },
+            {
+                "$project": {
+                    **unpack_key,
+                    "recorded_line_audits": 1,
+                    "total_human_transfers": 1,
+                    "total_recorded_line_phrases": 1,
+                }
+            },
+            self._merge_stage(),
+        ]
+
+        section_audits_pipeline = [
+            {"$match": self._backfill_match("section_breakdown", start_date, end_date)},
+            {"$group": {"_id": key, "section_breakdown_audits": {"$sum": 1}}},
+            {"$project": {**unpack_key, "section_breakdown_audits": 1}},
+            self._merge_stage(),
+        ]
+
+        section_length = {
+            "$add": [
+                {"$subtract": ["$section.end_index", "$section.start_index"]},
+                1,
+            ]
+        }
+        section_histogram_pipeline = [
+            {"$match": self._backfill_match("section_breakdown", start_date, end_date)},
+            {
+                "$project": {
+                    "key": key,
+                    "section": "$audit_results.section_breakdown.section_breakdown",
+                }
+            },
+            {"$unwind": "$section"},
+            {
+                "$group": {
+                    "_id": {
+                        "key": "$key",
+                        "section_type": "$section.section_type",
+                        "bucket": _bucket_switch(section_length, SECTION_LENGTH_BUCKETS),
+                    },
+                    "count": {"$sum": 1},
+                }
+            },
+            {
+                "$group": {
+                    "_id": {"key": "$_id.key", "section_type": "$_id.section_type"},
+                    "total": {"$sum": "$count"},
+                    "buckets": {"$push": {"k": "$_id.bucket", "v": "$count"}},
+                }
+            },
+            {
+                "$group": {
+                    "_id": "$_id.key",
+                    "section_counts": {"$push": {"k": "$_id.section_type", "v": "$total"}},
+                    "section_length_histogram": {
+                        "$push": {"k": "$_id.section_type", "v": {"$arrayToObject": "$buckets"}}
+                    },
+                }
+            },
+            {
+                "$project": {
+                    **unpack_key,
+                    "section_counts": {"$arrayToObject": "$section_counts"},
+                    "section_length_histogram": {"$arrayToObject": "$section_length_histogram"},
+                }
+            },
+            self._merge_stage(),
+        ]
+
+        section_duration_pipeline = [
+            {"$match": self._backfill_match("section_breakdown", start_date, end_date)},
+            {
+                "$project": {
+                    "key": key,
+                    "section": "$audit_results.section_breakdown.section_breakdown",
+                }
+            },
+            {"$unwind": "$section"},
+            {"$match": {"section.duration_seconds": {"$type": "number"}}},
+            {
+                "$group": {
+                    "_id": {
+                        "key": "$key",
+                        "section_type": "$section.section_type",
+                        "bucket": _bucket_switch(
+                            "$section.duration_seconds", SECTION_DURATION_BUCKETS
+                        ),
+                    },
+                    "count": {"$sum": 1},
+                }
+            },
+            {
+                "$group": {
+                    "_id": {"key": "$_id.key", "section_type": "$_id.section_type"},
+                    "buckets": {"$push": {"k": "$_id.bucket", "v": "$count"}},
+                }
+            },
+            {
+                "$group": {
+                    "_id": "$_id.key",
+                    "section_duration_histogram": {
+                        "$push": {"k": "$_id.section_type", "v": {"$arrayToObject": "$buckets"}}
+                    },
+                }
+            },
+            {
+                "$project": {
+                    **unpack_key,
+                    "section_duration_histogram": {"$arrayToObject": "$section_duration_histogram"},
+                }
+            },
+            self._merge_stage(),
+        ]
+
+        return [
+            recorded_line_pipeline,
+            section_audits_pipeline,
+            section_histogram_pipeline,
+            section_duration_pipeline,
+        ]
+
+    async def backfill(self, start_date: Optional[date] = None, end_date: Optional[date] = None):
+        """
+        Recomputes the rollups of every day in `[start_date, end_date]` from the stored audit
+        results. Recomputed fields replace the existing values, so it is safe to re-run.
+        """
+        await self.ensure_indexes()
+
+        mongo_client = get_mongo_client()
+        for pipeline in self.get_backfill_pipelines(start_date, end_date):
+            await mongo_client.aggregate(TranscriptAuditResult.collection_name(), pipeline)
+
+        logger.info("[AuditStatsService.backfill] Backfilled stats from %s to %s", start_date, end_date)
+
+
+_stats_service = AuditStatsService()
+
+
+def get_stats_service() -> AuditStatsService:
+    return _stats_service
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+from typing import Any, Coroutine
+from bson.objectid import ObjectId
+from pymongo import ASCENDING
+from src.mongo_db import get_mongo_client
+from src.mongo_db.client import VERSION_FIELD
+from src.profiling import get_slow_audit_ms, trace
+from src.transcript_audit.models import TranscriptAuditResult
+from src.transcript_audit.schemas import AuditType, AuditStatus
+from src.transcript_audit.scheduler import estimate_audit_tokens, get_audit_scheduler
+from src.transcript_audit.services.recorded_line_audit_service import (
+    get_recorded_line_audit_service,
+)
+from src.transcript_audit.services.section_audit_service import get_section_audit_service
+
+logger = logging.getLogger(__name__)
+
+# Note: Set while a document has requeued audit types, so the resumer polls a tiny partial index
+REQUEUED_FIELD = "requeued"
+
+TERMINAL_STATUSES = [AuditStatus.COMPLETED.value, AuditStatus.FAILED.value]
+
+
+class AuditTaskRegistry:
+    """
+    Tracks the audit coroutines running in this worker so they outlive the request that
+    started them and can be drained when the worker shuts down.
+    """
+
+    def __init__(self):
+        self._tasks: dict[asyncio.Task, tuple[str, AuditType]] = {}
+
+    def spawn(
+        self,
+        transcript_audit_result_id: str,
+        audit_type: AuditType,
+        audit: Coroutine[Any, Any, Any],
+        org_id: str = "",
+        estimated_tokens: int = 0,
+    ) -> asyncio.Task:
+        # Note: Queued in the scheduler until the org gets a slot, drain requeues queued audits too
+        task = asyncio.create_task(
+            self._run(transcript_audit_result_id, audit_type, audit, org_id, estimated_tokens)
+        )
+        self._tasks[task] = (transcript_audit_result_id, audit_type)
+        task.add_done_callback(self._on_done)
+        return task
+
+    @staticmethod
+    async def _run(
+        transcript_audit_result_id: str,
+        audit_type: AuditType,
+        audit: Coroutine[Any, Any, Any],
+        org_id: str,
+        estimated_tokens: int,
+    ) -> Any:
+        with trace(
+            f"audit {audit_type.value}",
+            get_slow_audit_ms(),
+            transcript_audit_result_id=transcript_audit_result_id,
+            org_id=org_id,
+        ):
+            return await get_audit_scheduler().run(org_id, estimated_tokens, audit)
+
+    def _on_done(self, task: asyncio.Task):
+        self._tasks.pop(task, None)
+        # Note: Failures are already recorded on the document by the services, just mark them retrieved
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def drain(self, timeout: float) -> list[tuple[str, AuditType]]:
+        """
+        Waits up to `timeout` seconds for running audits, then cancels the rest and marks
+        them as requeued so another worker resumes them. Returns the requeued audits.
+        """
+        if not self._tasks:
+            return []
+
+        running = dict(self._tasks)
+        logger.info("[AuditTaskRegistry.drain] Waiting for %s running audits", len(running))
+
+        _, pending = await asyncio.wait(running.keys(), timeout=timeout)
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+        requeued = [running[task] for task in pending]
+
+        mongo_client = get_mongo_client()
+        # Note: Cancelled audits can leave buffered results behind, they must land before the requeue
+        await mongo_client.write_buffer.flush()
+        for transcript_audit_result_id, audit_type in requeued:
+            # Note: Audits whose results landed with the flush are finished and not requeued
+            await mongo_client.update_one(
+                TranscriptAuditResult.collection_name(),
+                {
+                    "_id": ObjectId(transcript_audit_result_id),
+                    f"status.{audit_type.value}": {"$nin": TERMINAL_STATUSES},
+                },
+                {
+                    "$set": {f"status.{audit_type.value}": AuditStatus.PENDING, REQUEUED_FIELD: True},
+                    "$addToSet": {"requeued_audit_types": audit_type},
+                    "$inc": {VERSION_FIELD: 1},
+                },
+            )
+
+        if requeued:
+            logger.warning("[AuditTaskRegistry.drain] Requeued %s unfinished audits", len(requeued))
+
+        return requeued
+
+
+_audit_task_registry = AuditTaskRegistry()
+
+
+def get_audit_task_registry() -> AuditTaskRegistry:
+    return _audit_task_registry
+
+
+async def ensure_indexes():
+    await get_mongo_client().create_index(
+        TranscriptAuditResult.collection_name(),
+        [(REQUEUED_FIELD, ASCENDING)],
+        name="audit_requeued",
+        partialFilterExpression={REQUEUED_FIELD: True},
+    )
+
+
+async def resume_requeued_audits() -> int:
+    """
+    Claims documents with requeued audit types one at a time and restarts their audits in
+    this worker. The claim is a single `find_one_and_update` that still requires the
+    `requeued` flag and clears it, so concurrent workers never resume the same audit twice.
+    """
+    services = {
+        AuditType.RECORDED_LINE_PHRASES: get_recorded_line_audit_service(),
+        AuditType.SECTION_BREAKDOWN: get_section_audit_service(),
+    }
+
+    mongo_client = get_mongo_client()
+    registry = get_audit_task_registry()
+    resumed = 0
+
+    while True:
+        candidate = await mongo_client.find_one(
+            TranscriptAuditResult.collection_name(),
+            {REQUEUED_FIELD: True},
+            projection={"_id": 1, "org_id": 1},
+        )
+        if not candidate:
+            break
+
+        # Note: Claimed by full shard key so the claim stays a single-shard write on a sharded collection
+        document = await mongo_client.find_one_and_update(
+            TranscriptAuditResult.collection_name(),
+            {
+                "_id": candidate["_id"],
+                "org_id": candidate.get("org_id"),
+                REQUEUED_FIELD: True,
+            },
+            {
+                "$set": {"requeued_audit_types": []},
+                "$unset": {REQUEUED_FIELD: ""},
+                "$inc": {VERSION_FIELD: 1},
+            },
+        )
+        if not document:
+            # Note: Claimed by another worker in the meantime
+            continue
+
+        for audit_type in document["requeued_audit_types"]:
+            audit_type = AuditType(audit_type)
+            registry.spawn(
+                document["_id"],
+                audit_type,
+                services[audit_type].audit(document["_id"], document.get("agent_name", "")),
+                org_id=document.get("org_id", ""),
+                estimated_tokens=estimate_audit_tokens(
+                    message["content"]
+                    for message in TranscriptAuditResult.decode_mongo(document).get(
+                        "conversation_history", []
+                    )
+                ),
+            )
+            resumed += 1
+
+    if resumed:
+        logger.info("[resume_requeued_audits] Resumed %s requeued audits", resumed)
+
+    return resumed
+
+
+async def run_requeued_audit_resumer(interval_seconds: float):
+    # Note: Keeps polling because during rolling deploys old workers requeue after new ones start
+    while True:
+        try:
+            await resume_requeued_audits()
+        except Exception as e:
+            logger.error("[run_requeued_audit_resumer] Error: %s", e)
+        await asyncio.sleep(interval_seconds)
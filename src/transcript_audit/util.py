@@ -1,4 +1,25 @@
-from .schemas import TranscriptMessage
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from math import isnan
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+from .schemas import Conversation, TranscriptMessage
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MESSAGE_START_TIME_KEYS = ("start_time", "startTime", "start", "timestamp")
+MESSAGE_END_TIME_KEYS = ("end_time", "endTime", "end")
+
+# Note: Timings above this are epoch seconds (after 2001), below it offsets into the call
+EPOCH_SECONDS_THRESHOLD = 1e9
 
 
 def convert_transcript_message_to_xml(message: TranscriptMessage, index: int = None) -> str:
@@ -13,3 +34,123 @@ def convert_transcript_message_to_xml(message: TranscriptMessage, index: int = N
     xml_parts.append("</message>")
     
     return "".join(xml_parts)
+
+
+def json_loads(content: str | bytes) -> Any:
+    # Note: orjson.JSONDecodeError subclasses json.JSONDecodeError, callers catch either the same way
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def json_dumps(value: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Compact UTF-8 JSON, serialised with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        value, default=default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def get_audit_unit_max_attempts() -> int:
+    return max(1, int(os.getenv("AUDIT_UNIT_MAX_ATTEMPTS", "2")))
+
+
+async def retry_unit(unit: Callable[[], Awaitable[T]], description: str) -> T:
+    """
+    Runs one unit of an audit, a single LLM call and the validation of its response, and
+    retries it up to `AUDIT_UNIT_MAX_ATTEMPTS` times so one bad response doesn't fail the audit.
+    """
+    max_attempts = get_audit_unit_max_attempts()
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return await unit()
+        except Exception as e:
+            if attempt == max_attempts:
+                raise
+            logger.warning(
+                "[retry_unit] %s failed (attempt %s/%s), retrying: %s",
+                description,
+                attempt,
+                max_attempts,
+                e,
+            )
+
+
+def load_transcript_json(content: bytes) -> dict:
+    try:
+        return json_loads(content)
+    except json.JSONDecodeError:
+        text_content = content.decode('utf-8')
+        lines = text_content.strip().split('\n')
+
+        for line in reversed(lines):
+            line = line.strip()
+            if line:
+                try:
+                    return json_loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+        raise ValueError("No valid JSON object found in NDJSON file")
+
+
+def parse_message_time(value: Any) -> Optional[float]:
+    """
+    Parses a message timestamp from the transcript export into seconds. Accepts numbers
+    (seconds, or epoch milliseconds) and ISO 8601 strings.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        # Note: Anything past year 5138 in seconds is an epoch in milliseconds
+        return value / 1000 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return None
+
+
+def extract_message_times(
+    message: dict,
+) -> tuple[Optional[float], Optional[float]]:
+    start_time = None
+    for key in MESSAGE_START_TIME_KEYS:
+        start_time = parse_message_time(message.get(key))
+        if start_time is not None:
+            break
+
+    end_time = None
+    for key in MESSAGE_END_TIME_KEYS:
+        end_time = parse_message_time(message.get(key))
+        if end_time is not None:
+            break
+
+    return start_time, end_time
+
+
+def relativize_message_times(conversation: Conversation):
+    """
+    Shifts absolute (epoch) timings so the call starts at 0 and timecodes line up with the
+    recording. Timings that are already offsets into the call are left as they are.
+    """
+    if not conversation.has_timings:
+        return
+
+    timed_starts = [time for time in conversation.start_times if not isnan(time)]
+    if not timed_starts or min(timed_starts) < EPOCH_SECONDS_THRESHOLD:
+        return
+
+    call_start = min(timed_starts)
+    for times in (conversation.start_times, conversation.end_times):
+        for index, time in enumerate(times):
+            times[index] = time - call_start
@@ -0,0 +1,41 @@
+from pydantic import BaseModel
+
+
+class TransferWindow(BaseModel):
+    """A slice `[start, end)` of the conversation covering one or more human transfers."""
+
+    start: int
+    end: int
+    transfer_indices: list[int]
+
+
+def plan_transfer_windows(
+    transfer_indices: list[int],
+    conversation_length: int,
+    start_offset: int = 3,
+    end_offset: int = 4,
+) -> list[TransferWindow]:
+    """
+    Builds the conversation windows to audit around each human transfer. Windows are
+    clamped to the conversation bounds and overlapping windows are merged, so transfers
+    that are close together are audited in a single chunk.
+    """
+    windows: list[TransferWindow] = []
+
+    for transfer_index in sorted(set(transfer_indices)):
+        # Note: Drop indices the model returned outside of the conversation
+        if transfer_index < 0 or transfer_index >= conversation_length:
+            continue
+
+        start = max(0, transfer_index - start_offset)
+        end = min(conversation_length, transfer_index + end_offset)
+
+        if windows and start < windows[-1].end:
+            windows[-1].end = max(windows[-1].end, end)
+            windows[-1].transfer_indices.append(transfer_index)
+        else:
+            windows.append(
+                TransferWindow(start=start, end=end, transfer_indices=[transfer_index])
+            )
+
+    return windows
@@ -0,0 +1,90 @@
+from datetime import date, datetime
+import pytest
+from src.jobs import reaudit_transcripts
+from src.jobs.reaudit_transcripts import build_stale_query
+from src.transcript_audit.schemas import AuditType
+
+
+def test_build_stale_query_matches_finished_audits_with_another_fingerprint():
+    query = build_stale_query(
+        AuditType.SECTION_BREAKDOWN,
+        "abc",
+        org_id="org",
+        created_from=datetime(2025, 1, 1),
+    )
+
+    assert query == {
+        "audit_types": "section_breakdown",
+        "audit_fingerprints.section_breakdown": {"$ne": "abc"},
+        "status.section_breakdown": {"$in": ["completed", "failed"]},
+        "org_id": "org",
+        "created_at": {"$gte": datetime(2025, 1, 1)},
+    }
+    assert "org_id" not in build_stale_query(AuditType.SECTION_BREAKDOWN, "abc")
+
+
+@pytest.mark.asyncio
+async def test_reaudit_runs_stale_audits_as_reaudits_and_backfills_their_days(mocker):
+    documents = [
+        {"_id": "a", "agent_name": "Jane", "created_at": datetime(2025, 1, 3)},
+        {"_id": "b", "agent_name": "Sam", "created_at": datetime(2025, 1, 1)},
+    ]
+    pipelines = []
+
+    async def stream_aggregate(collection_name, pipeline):
+        pipelines.append(pipeline)
+        for document in documents:
+            yield document
+
+    mongo_client = mocker.MagicMock()
+    mongo_client.stream_aggregate = stream_aggregate
+    service = mocker.MagicMock()
+    service.get_fingerprint.return_value = "current"
+    service.audit = mocker.AsyncMock(side_effect=[None, TimeoutError("upstream timeout")])
+    stats_service = mocker.MagicMock()
+    stats_service.backfill = mocker.AsyncMock()
+
+    mocker.patch.object(reaudit_transcripts, "init_mongo_db", mocker.AsyncMock())
+    mocker.patch.object(reaudit_transcripts, "close_mongo_db", mocker.AsyncMock())
+    mocker.patch.object(reaudit_transcripts, "get_mongo_client", return_value=mongo_client)
+    mocker.patch.object(
+        reaudit_transcripts,
+        "get_audit_services",
+        return_value={AuditType.RECORDED_LINE_PHRASES: service},
+    )
+    mocker.patch.object(reaudit_transcripts, "get_stats_service", return_value=stats_service)
+
+    await reaudit_transcripts.reaudit_transcripts(
+        [AuditType.RECORDED_LINE_PHRASES], None, None, None, 0, 1, dry_run=False
+    )
+
+    assert pipelines[0][0]["$match"]["audit_fingerprints.recorded_line_phrases"] == {"$ne": "current"}
+    assert [call.kwargs for call in service.audit.await_args_list] == [
+        {"record_stats": False, "reaudit": True}
+    ] * 2
+    # Note: Only the day of the successful re-audit is rebuilt
+    stats_service.backfill.assert_awaited_once_with(date(2025, 1, 3), date(2025, 1, 3))
+
+
+@pytest.mark.asyncio
+async def test_dry_run_only_counts_stale_audits(mocker):
+    async def stream_aggregate(collection_name, pipeline):
+        yield {"_id": "a", "agent_name": "", "created_at": datetime(2025, 1, 1)}
+
+    mongo_client = mocker.MagicMock()
+    mongo_client.stream_aggregate = stream_aggregate
+    service = mocker.MagicMock()
+    service.audit = mocker.AsyncMock()
+
+    mocker.patch.object(reaudit_transcripts, "init_mongo_db", mocker.AsyncMock())
+    mocker.patch.object(reaudit_transcripts, "close_mongo_db", mocker.AsyncMock())
+    mocker.patch.object(reaudit_transcripts, "get_mongo_client", return_value=mongo_client)
+    mocker.patch.object(
+        reaudit_transcripts, "get_audit_services", return_value={AuditType.SECTION_BREAKDOWN: service}
+    )
+
+    await reaudit_transcripts.reaudit_transcripts(
+        [AuditType.SECTION_BREAKDOWN], None, None, None, 0, 1, dry_run=True
+    )
+
+    service.audit.assert_not_awaited()
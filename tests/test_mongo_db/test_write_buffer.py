@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from bson.objectid import ObjectId
+from src.mongo_db.write_buffer import WriteBuffer, merge_set_fields
+
+
+class FakeCollection:
+    def __init__(self):
+        self.bulk_writes: list[list] = []
+
+    def with_options(self, **kwargs):
+        return self
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk_writes.append(operations)
+
+
+def test_merge_set_fields_avoids_conflicting_paths():
+    fields = {"audit_results.section_breakdown.total_sections": 1}
+    merge_set_fields(fields, "audit_results.section_breakdown", {"total_sections": 2})
+    assert fields == {"audit_results.section_breakdown": {"total_sections": 2}}
+
+    merge_set_fields(fields, "audit_results.section_breakdown.total_sections", 3)
+    assert fields == {"audit_results.section_breakdown": {"total_sections": 3}}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sets_are_coalesced_per_document():
+    collection = FakeCollection()
+    buffer = WriteBuffer(lambda name: collection, flush_interval_ms=10)
+    first_id, second_id = str(ObjectId()), str(ObjectId())
+
+    await asyncio.gather(
+        buffer.set("results", first_id, {"status.recorded_line_phrases": "completed"}),
+        buffer.set("results", first_id, {"status.section_breakdown": "completed"}),
+        buffer.set("results", second_id, {"status.section_breakdown": "failed"}),
+    )
+
+    assert len(collection.bulk_writes) == 1
+    operations = collection.bulk_writes[0]
+    assert len(operations) == 2
+    assert operations[0]._doc == {
+        "$set": {
+            "status.recorded_line_phrases": "completed",
+            "status.section_breakdown": "completed",
+        }
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_size_triggers_flush_and_close_flushes_remaining():
+    collection = FakeCollection()
+    buffer = WriteBuffer(lambda name: collection, max_batch_size=2, flush_interval_ms=60_000)
+    document_id = str(ObjectId())
+
+    await asyncio.gather(
+        buffer.set("results", document_id, {"a": 1}),
+        buffer.set("results", document_id, {"b": 2}),
+    )
+    assert len(collection.bulk_writes) == 1
+
+    await buffer.set("results", document_id, {"c": 3}, wait=False)
+    assert len(collection.bulk_writes) == 1
+
+    await buffer.close()
+    assert len(collection.bulk_writes) == 2
+
+
+@pytest.mark.asyncio
+async def test_flushes_are_written_in_order():
+    events: list[tuple[str, dict]] = []
+
+    class SlowCollection(FakeCollection):
+        async def bulk_write(self, operations, ordered=True):
+            events.append(("start", operations[0]._doc["$set"]))
+            await asyncio.sleep(0.02)
+            events.append(("end", operations[0]._doc["$set"]))
+
+    buffer = WriteBuffer(lambda name: SlowCollection(), max_batch_size=1, flush_interval_ms=60_000)
+    document_id = str(ObjectId())
+
+    await buffer.set("results", document_id, {"status.section_breakdown": "processing"}, wait=False)
+    await asyncio.sleep(0.005)
+    await buffer.set("results", document_id, {"status.section_breakdown": "completed"})
+
+    assert [event for event, _ in events] == ["start", "end", "start", "end"]
+    assert events[-1][1] == {"status.section_breakdown": "completed"}
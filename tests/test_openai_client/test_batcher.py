@@ -0,0 +1,119 @@
+import asyncio
+import json
+import re
+import pytest
+from src.openai_client.batcher import MicroBatcher
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "name": "echo",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {"value": {"type": "string"}},
+        "required": ["value"],
+        "additionalProperties": False,
+    },
+}
+
+
+class FakeOpenAIClient:
+    def __init__(self, drop_request_ids: tuple = ()):
+        self.drop_request_ids = drop_request_ids
+        self.calls: list[tuple[str, str]] = []
+
+    async def _create_response(self, system_prompt, messages, temperature, response_format):
+        content = messages[0]["content"]
+        self.calls.append((response_format["name"], content))
+
+        if response_format["name"].startswith("batched_"):
+            requests = re.findall(r'<request id="(\d+)">\n(.*?)\n</request>', content)
+            return json.dumps(
+                {
+                    "responses": [
+                        {"request_id": int(request_id), "response": {"value": body}}
+                        for request_id, body in requests
+                        if int(request_id) not in self.drop_request_ids
+                    ]
+                }
+            )
+        return json.dumps({"value": content})
+
+
+def submit(batcher: MicroBatcher, content: str, response_format=RESPONSE_FORMAT):
+    return batcher.submit("system", [{"role": "user", "content": content}], 0, response_format)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_batched_and_demultiplexed():
+    client = FakeOpenAIClient()
+    batcher = MicroBatcher(client, window_ms=5, max_batch_size=8)
+
+    responses = await asyncio.gather(*[submit(batcher, f"request {i}") for i in range(3)])
+
+    assert [json.loads(response)["value"] for response in responses] == [
+        "request 0",
+        "request 1",
+        "request 2",
+    ]
+    assert [name for name, _ in client.calls] == ["batched_echo"]
+
+
+@pytest.mark.asyncio
+async def test_missing_batched_responses_fall_back_individually():
+    client = FakeOpenAIClient(drop_request_ids=(1,))
+    batcher = MicroBatcher(client, window_ms=5, max_batch_size=8)
+
+    responses = await asyncio.gather(*[submit(batcher, f"request {i}") for i in range(2)])
+
+    assert json.loads(responses[1])["value"] == "request 1"
+    assert client.calls[1] == ("echo", "request 1")
+
+
+@pytest.mark.asyncio
+async def test_unstructured_requests_are_not_batched():
+    client = FakeOpenAIClient()
+    batcher = MicroBatcher(client, window_ms=5, max_batch_size=8)
+    text_format = {"type": "text", "name": "echo"}
+
+    await asyncio.gather(*[submit(batcher, f"request {i}", text_format) for i in range(2)])
+
+    assert [name for name, _ in client.calls] == ["echo", "echo"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_break_the_batch():
+    client = FakeOpenAIClient()
+    original_create_response = client._create_response
+
+    async def slow_create_response(*args):
+        await asyncio.sleep(0.02)
+        return await original_create_response(*args)
+
+    client._create_response = slow_create_response
+    batcher = MicroBatcher(client, window_ms=5, max_batch_size=8)
+
+    tasks = [asyncio.create_task(submit(batcher, f"request {i}")) for i in range(3)]
+    await asyncio.sleep(0.01)
+    tasks[1].cancel()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert [json.loads(results[i])["value"] for i in (0, 2)] == ["request 0", "request 2"]
+    assert [name for name, _ in client.calls] == ["batched_echo"]
+
+
+@pytest.mark.asyncio
+async def test_caller_cancelled_before_dispatch_is_not_sent():
+    client = FakeOpenAIClient()
+    batcher = MicroBatcher(client, window_ms=10, max_batch_size=8)
+
+    tasks = [asyncio.create_task(submit(batcher, f"request {i}")) for i in range(2)]
+    await asyncio.sleep(0)
+    tasks[0].cancel()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert json.loads(results[1])["value"] == "request 1"
+    assert client.calls == [("echo", "request 1")]
@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from src.openai_client.limiter import AdaptiveConcurrencyLimiter
+
+
+class RateLimitError(Exception):
+    pass
+
+
+async def call(limiter: AdaptiveConcurrencyLimiter, seconds: float, peak: list[int]):
+    async with limiter.slot():
+        peak.append(limiter.in_flight)
+        await asyncio.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_transcript_scope_caps_fan_out_to_its_share_of_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, transcript_share=0.25)
+    peak: list[int] = []
+
+    with limiter.transcript_scope():
+        await asyncio.gather(*[call(limiter, 0.001, peak) for _ in range(10)])
+
+    assert max(peak) == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_while_latency_holds_and_backs_off_on_overload():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=64)
+    peak: list[int] = []
+
+    for _ in range(5):
+        await asyncio.gather(*[call(limiter, 0.001, peak) for _ in range(32)])
+    assert limiter.limit > 4
+
+    grown_limit = limiter.limit
+    with pytest.raises(RateLimitError):
+        async with limiter.slot():
+            raise RateLimitError()
+
+    assert limiter.limit == pytest.approx(grown_limit * 0.9)
+    assert limiter.metrics()["overloads"] == 1
+
+
+def test_limit_shrinks_when_latency_climbs():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=32)
+    limiter.in_flight = 32
+    for _ in range(20):
+        limiter._on_success(0.1)
+    for _ in range(20):
+        limiter._on_success(1.0)
+
+    assert limiter.limit < 32
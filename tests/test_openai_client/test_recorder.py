@@ -0,0 +1,47 @@
+import pytest
+from src.openai_client import recorder
+from src.openai_client.client import OpenAIClient
+from src.openai_client.recorder import ReplayMissError
+
+MESSAGES = [{"role": "user", "content": "transcript"}]
+
+
+@pytest.fixture
+def record_replay_env(monkeypatch, tmp_path):
+    def set_mode(mode: str):
+        monkeypatch.setenv("OPENAI_RECORD_MODE", mode)
+        monkeypatch.setenv("OPENAI_RECORD_PATH", str(tmp_path / "responses.jsonl.gz"))
+        monkeypatch.setenv("OPENAI_REPLAY_LATENCY_SCALE", "0")
+        monkeypatch.setattr(recorder, "_record_replay", None)
+
+    return set_mode
+
+
+@pytest.mark.asyncio
+async def test_recorded_responses_are_replayed_without_the_network(
+    mocker, monkeypatch, record_replay_env
+):
+    record_replay_env("record")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    recording_client = OpenAIClient()
+    mocker.patch.object(
+        recording_client, "_create_response", side_effect=["first", "second", "other"]
+    )
+
+    assert await recording_client.generate_response("system", MESSAGES) == "first"
+    assert await recording_client.generate_response("system", MESSAGES) == "second"
+    assert await recording_client.generate_response("other system", MESSAGES) == "other"
+    recorder.get_record_replay().recorder.close()
+
+    record_replay_env("replay")
+    monkeypatch.delenv("OPENAI_API_KEY")
+    replaying_client = OpenAIClient()
+    assert replaying_client.client is None
+
+    assert await replaying_client.generate_response("other system", MESSAGES) == "other"
+    assert await replaying_client.generate_response("system", MESSAGES) == "first"
+    assert await replaying_client.generate_response("system", MESSAGES) == "second"
+    assert await replaying_client.generate_response("system", MESSAGES) == "second"
+
+    with pytest.raises(ReplayMissError):
+        await replaying_client.generate_response("system", MESSAGES, temperature=1)
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+import pytest
+from src.profiling import span, trace, traced
+
+
+def test_spans_are_no_ops_outside_of_a_trace():
+    with span("mongo.find_one") as current:
+        assert current is None
+
+
+@pytest.mark.asyncio
+async def test_trace_collects_spans_across_tasks_and_logs_slow_traces(caplog):
+    async def child(name: str):
+        with span(name):
+            await asyncio.sleep(0.01)
+
+    with caplog.at_level(logging.WARNING, logger="src.profiling.spans"):
+        with trace("POST /transcript/audits", slow_ms=5) as root:
+            with span("parse_transcript", messages=3):
+                pass
+            await asyncio.gather(child("openai.first"), child("openai.second"))
+
+    span_tree = root.to_dict()
+    assert [child["name"] for child in span_tree["children"]] == [
+        "parse_transcript",
+        "openai.first",
+        "openai.second",
+    ]
+    assert span_tree["children"][0]["attributes"] == {"messages": 3}
+    assert caplog.records[0].trace == span_tree
+
+
+@pytest.mark.asyncio
+async def test_fast_traces_are_not_logged(caplog):
+    with caplog.at_level(logging.WARNING, logger="src.profiling.spans"):
+        with trace("GET /", slow_ms=10_000):
+            pass
+
+    assert not caplog.records
+
+
+@pytest.mark.asyncio
+async def test_traced_coroutines_run_in_a_span():
+    @traced("section_breakdown.run")
+    async def run(value: int) -> int:
+        with span("prompt.section_breakdown"):
+            return value * 2
+
+    with trace("audit section_breakdown", slow_ms=10_000) as root:
+        assert await run(2) == 4
+
+    [run_span] = root.to_dict()["children"]
+    assert run_span["name"] == "section_breakdown.run"
+    assert [child["name"] for child in run_span["children"]] == ["prompt.section_breakdown"]
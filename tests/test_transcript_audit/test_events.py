@@ -0,0 +1,158 @@
+import io
+import json
+import pytest
+from starlette.datastructures import UploadFile
+from src.transcript_audit import router
+from src.transcript_audit.events import AuditEventBroker
+from src.transcript_audit.schemas import AuditStatus, AuditType
+
+TRANSCRIPT_AUDIT_ID = "65f0c0ffee0000000000abcd"
+
+
+def build_transcript() -> bytes:
+    return json.dumps(
+        {
+            "data": {
+                "context": {
+                    "variables": {
+                        "agent_first_name": "Ann",
+                        "agent_last_name": "Lee",
+                        "review_conversation_history": [
+                            {"_id": "msg-0", "role": "assistant", "content": "hi"},
+                        ],
+                    },
+                    "user_data": {"org_id": "org", "session_id": "session"},
+                }
+            }
+        }
+    ).encode()
+
+
+def parse_sse(chunk: bytes) -> dict:
+    return json.loads(chunk.decode().split("data: ", 1)[1])
+
+
+@pytest.fixture
+def broker(mocker) -> AuditEventBroker:
+    broker = AuditEventBroker(max_queue_size=1)
+    mocker.patch.object(router, "get_audit_event_broker", return_value=broker)
+    return broker
+
+
+@pytest.fixture
+def mongo_client(mocker):
+    mongo_client = mocker.MagicMock()
+    mongo_client.insert_one = mocker.AsyncMock(return_value=TRANSCRIPT_AUDIT_ID)
+    mongo_client.find_one = mocker.AsyncMock()
+    mocker.patch.object(router, "get_mongo_client", return_value=mongo_client)
+    return mongo_client
+
+
+def test_broker_delivers_to_subscribers_and_drops_for_slow_ones():
+    broker = AuditEventBroker(max_queue_size=1)
+    queue = broker.subscribe("a")
+
+    broker.publish("a", AuditType.SECTION_BREAKDOWN, AuditStatus.COMPLETED, result={"ok": 1})
+    broker.publish("a", AuditType.RECORDED_LINE_PHRASES, AuditStatus.FAILED, error="boom")
+    broker.publish("b", AuditType.SECTION_BREAKDOWN, AuditStatus.COMPLETED)
+
+    assert queue.qsize() == 1
+    assert queue.get_nowait()["audit_type"] == "section_breakdown"
+
+    broker.unsubscribe("a", queue)
+    broker.publish("a", AuditType.SECTION_BREAKDOWN, AuditStatus.COMPLETED)
+    assert queue.empty()
+    assert broker._subscribers == {}
+
+
+@pytest.mark.asyncio
+async def test_ndjson_stream_ends_with_done_event(mocker, mongo_client):
+    recorded_line_service = mocker.MagicMock()
+    recorded_line_service.audit = mocker.AsyncMock(return_value={"total_human_transfers": 0})
+    section_service = mocker.MagicMock()
+    section_service.audit = mocker.AsyncMock(side_effect=ValueError("bad sections"))
+
+    response = await router.audit_transcript_stream(
+        UploadFile(io.BytesIO(build_transcript()), filename="transcript.json"),
+        [AuditType.RECORDED_LINE_PHRASES, AuditType.SECTION_BREAKDOWN],
+        recorded_line_service,
+        section_service,
+    )
+    lines = [json.loads(line) async for line in response.body_iterator]
+
+    assert lines[0]["event"] == "created"
+    assert lines[0]["transcript_audit_result"]["_id"] == TRANSCRIPT_AUDIT_ID
+    assert {(line["audit_type"], line["status"]) for line in lines[1:3]} == {
+        ("recorded_line_phrases", "completed"),
+        ("section_breakdown", "failed"),
+    }
+    assert lines[-1] == {"event": "done", "transcript_audit_result_id": TRANSCRIPT_AUDIT_ID}
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_closes_once_every_status_is_terminal(broker, mongo_client):
+    mongo_client.find_one.return_value = {
+        "_id": TRANSCRIPT_AUDIT_ID,
+        "status": {"recorded_line_phrases": "completed", "section_breakdown": "pending"},
+        "audit_results": {"recorded_line_phrases": {"total_human_transfers": 1}},
+    }
+
+    response = await router.stream_transcript_audit_events(TRANSCRIPT_AUDIT_ID)
+    assert mongo_client.find_one.await_args.kwargs["projection"] == router.EVENTS_PROJECTION
+
+    events = []
+    async for chunk in response.body_iterator:
+        events.append(parse_sse(chunk))
+        if len(events) == 2:
+            broker.publish(
+                TRANSCRIPT_AUDIT_ID,
+                AuditType.SECTION_BREAKDOWN,
+                AuditStatus.COMPLETED,
+                result={"total_sections": 2},
+            )
+
+    assert [(event["audit_type"], event["status"]) for event in events] == [
+        ("recorded_line_phrases", "completed"),
+        ("section_breakdown", "pending"),
+        ("section_breakdown", "completed"),
+    ]
+    assert events[-1]["result"] == {"total_sections": 2}
+    assert broker._subscribers == {}
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_unsubscribes_when_the_client_disconnects(broker, mongo_client):
+    mongo_client.find_one.return_value = {
+        "_id": TRANSCRIPT_AUDIT_ID,
+        "status": {"section_breakdown": "pending"},
+    }
+
+    response = await router.stream_transcript_audit_events(TRANSCRIPT_AUDIT_ID)
+    assert TRANSCRIPT_AUDIT_ID in broker._subscribers
+
+    await response.body_iterator.__anext__()
+    await response.body_iterator.aclose()
+
+    assert broker._subscribers == {}
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_polls_statuses_written_by_other_workers(mocker, broker, mongo_client):
+    mocker.patch.object(router, "EVENTS_POLL_INTERVAL_SECONDS", 0.01)
+    mongo_client.find_one.side_effect = [
+        {"_id": TRANSCRIPT_AUDIT_ID, "status": {"section_breakdown": "pending"}},
+        {
+            "_id": TRANSCRIPT_AUDIT_ID,
+            "status": {"section_breakdown": "failed"},
+            "audit_results": {},
+        },
+    ]
+
+    response = await router.stream_transcript_audit_events(TRANSCRIPT_AUDIT_ID)
+    events = [parse_sse(chunk) async for chunk in response.body_iterator]
+
+    assert [event["status"] for event in events] == ["pending", "failed"]
+    assert all(
+        call.kwargs["projection"] == router.EVENTS_PROJECTION
+        for call in mongo_client.find_one.await_args_list
+    )
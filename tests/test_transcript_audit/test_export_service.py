@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+import pytest
+from pymongo.read_preferences import SecondaryPreferred
+from src.transcript_audit.parquet import PartitionedParquetWriter
+from src.transcript_audit.services import export_service
+from src.transcript_audit.services.export_service import AuditExportService
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+class StubMongoClient:
+    def __init__(self, documents):
+        self.documents = documents
+        self.pipelines = []
+        self.analytics_read_preference = SecondaryPreferred()
+
+    async def create_index(self, collection_name, keys, **kwargs):
+        return kwargs["name"]
+
+    async def stream_aggregate(self, collection_name, pipeline, **kwargs):
+        self.pipelines.append(pipeline)
+        for document in self.documents:
+            yield dict(document)
+
+
+def build_document(id: str, created_at: datetime, status: str = "completed") -> dict:
+    return {
+        "_id": id,
+        "org_id": "org",
+        "agent_name": "Jane Doe",
+        "created_at": created_at,
+        "audit_types": ["recorded_line_phrases", "section_breakdown"],
+        "status": {"recorded_line_phrases": status, "section_breakdown": status},
+        "total_messages": 12,
+        "audit_results": {
+            "recorded_line_phrases": {
+                "total_human_transfers": 2,
+                "total_recorded_line_phrases": 1,
+                "failed_chunks": 0,
+                "auditted_chunks": [
+                    {"status": "completed", "has_recorded_line_phrase": True},
+                    {"status": "completed", "has_recorded_line_phrase": False},
+                ],
+            },
+            "section_breakdown": {
+                "section_breakdown": [{"section_type": "IVR", "start_index": 0, "end_index": 3}],
+                "total_sections": 1,
+            },
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_export_stops_at_in_progress_audit_and_saves_watermark(mocker, tmp_path):
+    now = datetime.now(timezone.utc)
+    mongo_client = StubMongoClient(
+        [
+            build_document("65f0c0ffee0000000000000a", datetime(2025, 3, 4, 12)),
+            build_document("65f0c0ffee0000000000000b", datetime(2025, 3, 5, 12)),
+            build_document("65f0c0ffee0000000000000c", now, status="processing"),
+        ]
+    )
+    mocker.patch.object(export_service, "get_mongo_client", return_value=mongo_client)
+
+    summary = await AuditExportService().export(str(tmp_path))
+
+    assert summary == {"audits": 2, "recorded_line_chunks": 4, "sections": 2}
+    assert AuditExportService.read_watermark(str(tmp_path)) == (
+        datetime(2025, 3, 5, 12),
+        "65f0c0ffee0000000000000b",
+    )
+
+    chunks = pq.read_table(tmp_path / "recorded_line_chunks").to_pylist()
+    assert sorted(chunk["date"] for chunk in chunks) == ["2025-03-04"] * 2 + ["2025-03-05"] * 2
+    assert all(chunk["org_id"] == "org" for chunk in chunks)
+
+    audits = pq.read_table(tmp_path / "audits").to_pylist()
+    assert [audit["total_messages"] for audit in audits] == [12, 12]
+    assert audits[0]["audit_results"] is None
+
+    mongo_client.documents = []
+    await AuditExportService().export(str(tmp_path))
+    assert "$match" in mongo_client.pipelines[-1][0]
+
+
+def test_partitioned_writer_closes_earlier_dates_and_caps_open_writers(tmp_path):
+    schema = pa.schema([("org_id", pa.string()), ("date", pa.string()), ("value", pa.int64())])
+    writer = PartitionedParquetWriter(str(tmp_path), "part.parquet", schema, max_open_writers=2)
+
+    for org_id in ["a", "b", "c"]:
+        writer.write({"org_id": org_id, "date": "2025-03-04", "value": 1})
+    assert writer.open_writers == 2
+
+    writer.write({"org_id": "a", "date": "2025-03-05", "value": 2})
+    assert writer.open_writers == 1
+
+    # Note: Reopened after it was closed, continues in a second file instead of overwriting the first
+    writer.write({"org_id": "a", "date": "2025-03-04", "value": 3})
+    writer.close()
+
+    assert sorted(path.name for path in (tmp_path / "org_id=a" / "date=2025-03-04").iterdir()) == [
+        "part-1.parquet",
+        "part.parquet",
+    ]
+    values = sorted(row["value"] for row in pq.read_table(tmp_path).to_pylist())
+    assert values == [1, 1, 1, 2, 3]
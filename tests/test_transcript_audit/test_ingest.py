@@ -0,0 +1,84 @@
+import json
+import pytest
+from src.transcript_audit.ingest import parse_transcript
+from src.transcript_audit.parquet import audit_result_to_row
+from src.transcript_audit.schemas import AuditStatus, AuditType
+
+
+def build_transcript(messages=None) -> bytes:
+    return json.dumps(
+        {
+            "data": {
+                "context": {
+                    "variables": {
+                        "agent_first_name": "Ann",
+                        "agent_last_name": "Lee",
+                        "review_conversation_history": messages
+                        or [
+                            {"_id": "msg-0", "role": "assistant", "content": "hi"},
+                            {"_id": "msg-1", "role": "user", "content": "hello"},
+                        ],
+                    },
+                    "user_data": {"org_id": "org", "session_id": "session"},
+                }
+            }
+        }
+    ).encode()
+
+
+def test_parse_transcript_builds_pending_result():
+    result = parse_transcript(
+        build_transcript(), "transcript.json", [AuditType.RECORDED_LINE_PHRASES]
+    )
+
+    assert result.id is None
+    assert result.org_id == "org"
+    assert result.agent_name == "Ann Lee"
+    assert [message.id for message in result.conversation_history] == ["msg-0", "msg-1"]
+    assert result.status == {AuditType.RECORDED_LINE_PHRASES: AuditStatus.PENDING}
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        {"_id": "msg-0", "role": "user", "content": None},
+        {"_id": {"$oid": "x"}, "role": "user", "content": "hi"},
+        {"_id": True, "role": "user", "content": "hi"},
+        {"role": "user", "content": "hi"},
+        "hi",
+    ],
+)
+def test_parse_transcript_rejects_invalid_messages(message):
+    with pytest.raises(ValueError):
+        parse_transcript(build_transcript([message]), "transcript.json", [AuditType.RECORDED_LINE_PHRASES])
+
+
+def test_parse_transcript_accepts_integer_message_ids():
+    result = parse_transcript(
+        build_transcript([{"_id": 7, "role": "user", "content": "hi"}]),
+        "transcript.json",
+        [AuditType.RECORDED_LINE_PHRASES],
+    )
+
+    assert [message.id for message in result.conversation_history] == ["7"]
+
+
+def test_audit_result_to_row_flattens_results():
+    result = parse_transcript(
+        build_transcript(), "transcript.json", [AuditType.RECORDED_LINE_PHRASES]
+    )
+    result.status[AuditType.RECORDED_LINE_PHRASES] = AuditStatus.COMPLETED
+    result.audit_results[AuditType.RECORDED_LINE_PHRASES] = {
+        "total_human_transfers": 2,
+        "total_recorded_line_phrases": 1,
+        "failed_chunks": 0,
+        "auditted_chunks": [],
+    }
+
+    row = audit_result_to_row(result.to_mongo())
+
+    assert row["status"] == [("recorded_line_phrases", "completed")]
+    assert row["total_messages"] == 2
+    assert row["total_human_transfers"] == 2
+    assert row["total_sections"] is None
+    assert json.loads(row["audit_results"])["recorded_line_phrases"]["total_recorded_line_phrases"] == 1
@@ -0,0 +1,130 @@
+import json
+from datetime import datetime
+import bson
+from src.transcript_audit.models import TranscriptAuditResult
+from src.transcript_audit.schemas import (
+    AuditStatus,
+    AuditType,
+    Conversation,
+    TranscriptMessage,
+)
+
+
+def build_document(num_messages: int = 3) -> dict:
+    return {
+        "_id": "65f0c0ffee0000000000abcd",
+        "org_id": "org",
+        "session_id": "session",
+        "transcript_file_name": "transcript.json",
+        "audit_types": ["recorded_line_phrases"],
+        "conversation_history": [
+            {"id": f"msg-{i}", "role": "user", "content": f"message {i}"}
+            for i in range(num_messages)
+        ],
+        "status": {"recorded_line_phrases": "pending"},
+        "audit_results": {},
+        "created_at": datetime(2025, 1, 1, 12, 0, 0),
+    }
+
+
+def test_conversation_indexing_and_slicing():
+    conversation = Conversation.from_messages(
+        [
+            {"id": "a", "role": "user", "content": "hi"},
+            TranscriptMessage(id="b", role="assistant", content="hello"),
+        ]
+    )
+
+    assert len(conversation) == 2
+    assert conversation[1].id == "b"
+    assert conversation[-1].content == "hello"
+    assert isinstance(conversation[0:1], Conversation)
+    assert [message.role for message in conversation] == ["user", "assistant"]
+
+
+def test_from_mongo_round_trips_to_mongo():
+    document = build_document()
+
+    result = TranscriptAuditResult.from_mongo(document)
+
+    assert result.id == document["_id"]
+    assert result.status == {AuditType.RECORDED_LINE_PHRASES: AuditStatus.PENDING}
+    assert result.conversation_history[2].id == "msg-2"
+    assert result.to_mongo()["conversation_history"] == document["conversation_history"]
+
+
+def test_validated_and_trusted_paths_agree():
+    document = build_document()
+
+    validated = TranscriptAuditResult(**document)
+    trusted = TranscriptAuditResult.from_mongo(document)
+
+    assert validated.conversation_history == trusted.conversation_history
+    assert validated.model_dump(mode="json") == trusted.model_dump(mode="json")
+
+
+def test_mongo_to_json_serialises_raw_documents():
+    document = build_document(num_messages=1)
+
+    payload = json.loads(TranscriptAuditResult.mongo_to_json([document]))
+
+    assert payload[0]["_id"] == document["_id"]
+    assert payload[0]["conversation_history"][0]["content"] == "message 0"
+
+
+def test_conversation_timings_round_trip():
+    document = build_document(num_messages=3)
+    document["message_start_times"] = [0.0, 4.5, 30.0]
+    document["message_end_times"] = [4.0, 9.0, None]
+
+    result = TranscriptAuditResult.from_mongo(document)
+    conversation = result.conversation_history
+
+    assert conversation.has_timings
+    assert conversation.message_time_range(1) == (4.5, 9.0)
+    assert result.to_mongo()["message_end_times"] == [4.0, 9.0, None]
+
+
+def test_conversation_without_timings_stores_no_timing_columns():
+    result = TranscriptAuditResult.from_mongo(build_document())
+
+    assert not result.conversation_history.has_timings
+    assert "message_start_times" not in result.to_mongo()
+
+
+def test_compressed_conversation_round_trips(monkeypatch):
+    monkeypatch.setenv("TRANSCRIPT_COMPRESSION", "zlib")
+    document = build_document(num_messages=3)
+    document["conversation_history"][1]["role"] = "assistant"
+    document["message_start_times"] = [0.0, 4.5, None]
+    document["message_end_times"] = [4.0, 9.0, None]
+
+    stored = TranscriptAuditResult.from_mongo(dict(document)).to_mongo()
+
+    assert "conversation_history" not in stored
+    assert "message_start_times" not in stored
+    assert stored["total_messages"] == 3
+
+    result = TranscriptAuditResult.from_mongo(stored)
+    assert [message.role for message in result.conversation_history] == [
+        "user",
+        "assistant",
+        "user",
+    ]
+    assert result.conversation_history.message_time_range(1) == (4.5, 9.0)
+
+    decoded = TranscriptAuditResult.decode_mongo(dict(stored))
+    assert decoded["conversation_history"] == document["conversation_history"]
+    assert decoded["message_end_times"] == [4.0, 9.0, None]
+    assert "total_messages" not in decoded
+
+
+def test_compressed_conversation_is_smaller(monkeypatch):
+    monkeypatch.delenv("TRANSCRIPT_COMPRESSION", raising=False)
+    result = TranscriptAuditResult.from_mongo(build_document(num_messages=2000))
+    plain_size = len(bson.encode(result.to_mongo()))
+
+    monkeypatch.setenv("TRANSCRIPT_COMPRESSION", "zlib")
+    compressed_size = len(bson.encode(result.to_mongo()))
+
+    assert compressed_size * 4 < plain_size
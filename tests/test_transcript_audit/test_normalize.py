@@ -0,0 +1,56 @@
+from src.transcript_audit.normalize import clean_content, normalize_conversation
+from src.transcript_audit.schemas import Conversation
+
+HOLD = "Please hold, your call is important to us."
+
+
+def build_conversation(messages: list[tuple[str, str]]) -> Conversation:
+    return Conversation.from_messages(
+        [{"id": f"msg-{i}", "role": role, "content": content} for i, (role, content) in enumerate(messages)]
+    )
+
+
+def test_clean_content_drops_silence_and_merges_dtmf():
+    assert clean_content("<sp>  Press <sp/> one <dtmf>1</dtmf> <dtmf>2</dtmf>") == "Press one <dtmf>12</dtmf>"
+    assert clean_content("<sp></sp> ") == ""
+
+
+def test_repeated_announcements_and_empty_messages_map_back_to_original_indices():
+    conversation = build_conversation(
+        [
+            ("user", "<sp>"),
+            ("assistant", "Thanks for calling."),
+            ("assistant", HOLD),
+            ("user", ""),
+            ("assistant", HOLD),
+            ("assistant", HOLD),
+            ("assistant", "Hi, this is Sam on a recorded line."),
+            ("user", "Hello"),
+            ("user", "Hello"),
+        ]
+    )
+
+    normalized = normalize_conversation(conversation, min_repeat_run=3)
+
+    assert normalized.conversation.contents == [
+        "Thanks for calling.",
+        f"{HOLD} [repeated 3 times]",
+        "Hi, this is Sam on a recorded line.",
+        "Hello",
+        "Hello",
+    ]
+    assert normalized.conversation.ids[1] == "msg-2"
+    assert [normalized.original_index(i) for i in range(len(normalized))] == [1, 2, 6, 7, 8]
+    assert normalized.original_start(0) == 0
+    assert (normalized.original_start(1), normalized.original_end(1)) == (2, 5)
+    assert normalized.original_end(4) == 8
+
+
+def test_normalization_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("TRANSCRIPT_NORMALIZATION", "false")
+    conversation = build_conversation([("assistant", HOLD)] * 4)
+
+    normalized = normalize_conversation(conversation)
+
+    assert normalized.conversation is conversation
+    assert normalized.original_end(3) == 3
@@ -0,0 +1,230 @@
+import json
+import re
+import pytest
+from src.openai_client.client import OpenAIClient
+from src.transcript_audit.schemas import AuditStatus, Conversation
+from src.transcript_audit.services.recorded_line_audit_service import (
+    RecordedLineAuditService,
+)
+
+
+def requested_transfer_indices(user_prompt: str) -> list[int]:
+    matches = re.findall(
+        r"(?:<transfer_indices>|these <index> values: )(\[.*?\])", user_prompt
+    )
+    return [index for match in matches for index in json.loads(match)]
+
+
+@pytest.fixture
+def conversation() -> Conversation:
+    return Conversation(
+        [f"msg-{i}" for i in range(60)], ["user"] * 60, [f"message {i}" for i in range(60)]
+    )
+
+
+@pytest.fixture(autouse=True)
+def openai_api_key(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+
+@pytest.mark.asyncio
+async def test_clustered_transfers_share_one_request(mocker, conversation):
+    async def generate_response(self, system_prompt, messages, **kwargs):
+        indices = requested_transfer_indices(messages[0]["content"])
+        return json.dumps(
+            {
+                "verdicts": [
+                    {"transfer_index": index, "has_recorded_line_phrase": True, "index": index + 1}
+                    for index in indices
+                ]
+            }
+        )
+
+    generate = mocker.patch.object(
+        OpenAIClient, "generate_response", autospec=True, side_effect=generate_response
+    )
+
+    results = await RecordedLineAuditService()._get_recorded_line_phrases(
+        conversation, [1, 4, 30], "Jane"
+    )
+
+    assert generate.call_count == 2
+    assert results[1] == {
+        "status": AuditStatus.COMPLETED,
+        "has_recorded_line_phrase": True,
+        "recorded_line_phrase_index": 2,
+    }
+    assert set(results) == {1, 4, 30}
+
+
+@pytest.mark.asyncio
+async def test_batch_mode_falls_back_only_for_invalid_verdicts(mocker, monkeypatch, conversation):
+    monkeypatch.setenv("RECORDED_LINE_BATCH_MODE", "true")
+    prompts: list[str] = []
+
+    async def generate_response(self, system_prompt, messages, **kwargs):
+        prompts.append(messages[0]["content"])
+        indices = requested_transfer_indices(messages[0]["content"])
+        verdicts = [
+            {"transfer_index": index, "has_recorded_line_phrase": True, "index": index + 1}
+            for index in indices
+        ]
+        if len(prompts) == 1:
+            # Note: Out of the window bounds, must be retried on its own
+            verdicts[-1]["index"] = 999
+        return json.dumps({"verdicts": verdicts})
+
+    mocker.patch.object(
+        OpenAIClient, "generate_response", autospec=True, side_effect=generate_response
+    )
+
+    results = await RecordedLineAuditService()._get_recorded_line_phrases(
+        conversation, [1, 20, 40], "Jane"
+    )
+
+    assert len(prompts) == 2
+    assert requested_transfer_indices(prompts[0]) == [1, 20, 40]
+    assert requested_transfer_indices(prompts[1]) == [40]
+    assert results[40] == {
+        "status": AuditStatus.COMPLETED,
+        "has_recorded_line_phrase": True,
+        "recorded_line_phrase_index": 41,
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_mode_falls_back_per_window_when_the_batched_request_fails(
+    mocker, monkeypatch, conversation
+):
+    monkeypatch.setenv("RECORDED_LINE_BATCH_MODE", "true")
+    prompts: list[str] = []
+
+    async def generate_response(self, system_prompt, messages, **kwargs):
+        prompts.append(messages[0]["content"])
+        if len(prompts) == 1:
+            raise RuntimeError("Request timed out")
+        indices = requested_transfer_indices(messages[0]["content"])
+        return json.dumps(
+            {
+                "verdicts": [
+                    {"transfer_index": index, "has_recorded_line_phrase": True, "index": index + 1}
+                    for index in indices
+                ]
+            }
+        )
+
+    mocker.patch.object(
+        OpenAIClient, "generate_response", autospec=True, side_effect=generate_response
+    )
+
+    results = await RecordedLineAuditService()._get_recorded_line_phrases(
+        conversation, [1, 20, 40], "Jane"
+    )
+
+    assert len(prompts) == 4
+    assert sorted(requested_transfer_indices(prompt) for prompt in prompts[1:]) == [[1], [20], [40]]
+    assert all(result["status"] == AuditStatus.COMPLETED for result in results.values())
+    assert set(results) == {1, 20, 40}
+
+
+@pytest.mark.asyncio
+async def test_failed_window_is_retried_then_kept_as_failed_chunk(mocker, conversation):
+    prompts: list[str] = []
+
+    async def generate_response(self, system_prompt, messages, **kwargs):
+        prompts.append(messages[0]["content"])
+        indices = requested_transfer_indices(messages[0]["content"])
+        if indices == [30]:
+            return "not json"
+        return json.dumps(
+            {
+                "verdicts": [
+                    {"transfer_index": index, "has_recorded_line_phrase": False, "index": index}
+                    for index in indices
+                ]
+            }
+        )
+
+    mocker.patch.object(
+        OpenAIClient, "generate_response", autospec=True, side_effect=generate_response
+    )
+
+    results = await RecordedLineAuditService()._get_recorded_line_phrases(
+        conversation, [1, 30], "Jane"
+    )
+
+    # Note: Only the failing window is retried, AUDIT_UNIT_MAX_ATTEMPTS defaults to 2
+    assert [requested_transfer_indices(prompt) for prompt in prompts].count([30]) == 2
+    assert [requested_transfer_indices(prompt) for prompt in prompts].count([1]) == 1
+    assert results[1]["status"] == AuditStatus.COMPLETED
+    assert results[30]["status"] == AuditStatus.FAILED
+
+
+@pytest.mark.asyncio
+async def test_rerun_reuses_transfer_indices_while_their_fingerprint_matches(mocker, conversation):
+    prompts: list[str] = []
+
+    async def generate_response(self, system_prompt, messages, **kwargs):
+        prompts.append(messages[0]["content"])
+        indices = requested_transfer_indices(messages[0]["content"])
+        return json.dumps(
+            {
+                "verdicts": [
+                    {"transfer_index": index, "has_recorded_line_phrase": False, "index": index}
+                    for index in indices
+                ]
+            }
+        )
+
+    mocker.patch.object(
+        OpenAIClient, "generate_response", autospec=True, side_effect=generate_response
+    )
+    service = RecordedLineAuditService()
+    previous_audit = {
+        "human_transfer_indices": [10],
+        "fingerprints": service.get_step_fingerprints(),
+    }
+
+    human_transfer_indices = service.get_reusable_transfer_indices(previous_audit)
+    result = await service.run(conversation, "Jane", human_transfer_indices)
+
+    assert [requested_transfer_indices(prompt) for prompt in prompts] == [[10]]
+    assert result["human_transfer_indices"] == [10]
+    assert result["fingerprints"] == service.get_step_fingerprints()
+
+    previous_audit["fingerprints"] = {**previous_audit["fingerprints"], "human_transfers": "old"}
+    assert service.get_reusable_transfer_indices(previous_audit) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("reaudit", [False, True])
+async def test_failed_reaudit_keeps_the_previous_status(mocker, conversation, reaudit):
+    mongo_client = mocker.MagicMock()
+    mongo_client.find_one = mocker.AsyncMock(
+        return_value={
+            "_id": "65f0c0ffee0000000000abcd",
+            "org_id": "org",
+            "session_id": "session",
+            "transcript_file_name": "transcript.json",
+            "conversation_history": conversation.to_mongo(),
+            "status": {"recorded_line_phrases": "completed"},
+        }
+    )
+    mongo_client.buffered_set = mocker.AsyncMock()
+    mocker.patch(
+        "src.transcript_audit.services.recorded_line_audit_service.get_mongo_client",
+        return_value=mongo_client,
+    )
+    service = RecordedLineAuditService()
+    mocker.patch.object(service, "run", side_effect=TimeoutError("upstream timeout"))
+
+    with pytest.raises(TimeoutError):
+        await service.audit("65f0c0ffee0000000000abcd", "Jane", record_stats=False, reaudit=reaudit)
+
+    written_statuses = [
+        call.args[2]["status.recorded_line_phrases"] for call in mongo_client.buffered_set.await_args_list
+    ]
+    if reaudit:
+        assert written_statuses == []
+    else:
+        assert written_statuses == [AuditStatus.FAILED]
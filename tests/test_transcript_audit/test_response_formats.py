@@ -0,0 +1,38 @@
+import json
+import pytest
+from pydantic import ValidationError
+from src.transcript_audit.prompts.response_formats import (
+    HUMAN_TRANSFER_INDICES,
+    RECORDED_LINE_VERDICT,
+    SECTION_BREAKDOWN,
+)
+
+
+def test_parse_returns_plain_dicts():
+    sections = SECTION_BREAKDOWN.parse(
+        json.dumps({"sections": [{"section_type": "IVR", "start_index": 0, "end_index": 3}]})
+    )["sections"]
+
+    assert sections == [{"section_type": "IVR", "start_index": 0, "end_index": 3}]
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        "not json",
+        json.dumps({"indices": ["1"]}),
+        json.dumps({"sections": [{"section_type": "OTHER", "start_index": 0, "end_index": 1}]}),
+    ],
+)
+def test_parse_rejects_invalid_responses(response):
+    structured_output = SECTION_BREAKDOWN if "sections" in response else HUMAN_TRANSFER_INDICES
+
+    with pytest.raises(ValidationError):
+        structured_output.parse(response)
+
+
+def test_verdict_validator_is_strict():
+    with pytest.raises(ValidationError):
+        RECORDED_LINE_VERDICT.validate_python(
+            {"transfer_index": 1, "has_recorded_line_phrase": "true", "index": 2}
+        )
@@ -0,0 +1,43 @@
+from src.transcript_audit.result_cache import AuditResultCache, etag_matches
+
+
+def build_document(id: str, status: str, version: int = 0, content: str = "hi") -> dict:
+    return {
+        "_id": id,
+        "status": {"recorded_line_phrases": status},
+        "conversation_history": [{"id": "m", "role": "user", "content": content}],
+        "version": version,
+    }
+
+
+def test_writes_invalidate_and_reads_before_them_are_not_cached():
+    cache = AuditResultCache()
+
+    entry = cache.put("a", build_document("a", "completed", version=3), cache.generation)
+    assert entry.etag == 'W/"3"'
+    assert cache.get("a") is entry
+    assert etag_matches('"3"', entry.etag)
+    assert not etag_matches('W/"2"', entry.etag)
+
+    generation = cache.generation
+    cache.on_write("TranscriptAuditResults", "a")
+    assert cache.get("a") is None
+
+    cache.put("a", build_document("a", "processing", version=4), generation)
+    assert cache.get("a") is None
+
+
+def test_running_audits_expire_and_size_evicts_least_recently_used():
+    cache = AuditResultCache(max_bytes=500, running_ttl_seconds=0)
+
+    cache.put("running", build_document("running", "processing"), cache.generation)
+    assert cache.get("running") is None
+
+    cache.put("a", build_document("a", "completed", content="a" * 100), cache.generation)
+    cache.put("b", build_document("b", "completed", content="b" * 100), cache.generation)
+    cache.get("a")
+    cache.put("c", build_document("c", "failed", content="c" * 100), cache.generation)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.size <= 500
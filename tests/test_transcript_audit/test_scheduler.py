@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from src.transcript_audit.scheduler import AuditAdmissionError, AuditScheduler
+
+
+async def record_start(order: list[str], org_id: str, release: asyncio.Event):
+    order.append(org_id)
+    await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_small_org_is_not_starved_by_bulk_org():
+    scheduler = AuditScheduler(max_concurrency=1, org_max_concurrency=1, org_max_queued=0)
+    release = asyncio.Event()
+    order: list[str] = []
+
+    tasks = [
+        asyncio.create_task(scheduler.run("bulk", 1000, record_start(order, "bulk", release)))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    tasks.append(
+        asyncio.create_task(scheduler.run("small", 1000, record_start(order, "small", release)))
+    )
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert order.index("small") <= 2
+
+
+@pytest.mark.asyncio
+async def test_org_concurrency_cap():
+    scheduler = AuditScheduler(max_concurrency=10, org_max_concurrency=2, org_max_queued=0)
+    release = asyncio.Event()
+    order: list[str] = []
+
+    tasks = [
+        asyncio.create_task(scheduler.run("org", 1, record_start(order, "org", release)))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0.01)
+
+    assert len(order) == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert len(order) == 5
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_audit_frees_its_place():
+    scheduler = AuditScheduler(max_concurrency=1, org_max_concurrency=1, org_max_queued=0)
+    release = asyncio.Event()
+    order: list[str] = []
+
+    running = asyncio.create_task(scheduler.run("org", 1, record_start(order, "first", release)))
+    queued = asyncio.create_task(scheduler.run("org", 1, record_start(order, "second", release)))
+    await asyncio.sleep(0)
+    queued.cancel()
+    release.set()
+    await running
+
+    last = await asyncio.wait_for(
+        scheduler.run("org", 1, record_start(order, "third", release)), timeout=1
+    )
+
+    assert last is None
+    assert order == ["first", "third"]
+
+
+def test_admission_rejects_over_token_budget():
+    scheduler = AuditScheduler(
+        max_concurrency=1, org_max_concurrency=1, org_max_queued=0, org_tokens_per_minute=6000
+    )
+
+    scheduler.admit("org", 5000)
+    with pytest.raises(AuditAdmissionError) as error:
+        scheduler.admit("org", 5000)
+
+    assert 30 <= error.value.retry_after_seconds <= 41
+    scheduler.admit("other-org", 5000)
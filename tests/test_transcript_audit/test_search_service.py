@@ -0,0 +1,58 @@
+from datetime import datetime
+import pytest
+from src.transcript_audit.services.search_service import (
+    RECORDED_LINE_VERDICT_FIELD,
+    TranscriptSearchService,
+)
+
+
+def test_build_query_without_filters_matches_everything():
+    assert TranscriptSearchService.build_query() == {}
+
+
+def test_build_query_combines_text_org_and_agent():
+    query = TranscriptSearchService.build_query(
+        text="refund request", org_id="org", agent_name="Jane"
+    )
+
+    assert query == {
+        "$text": {"$search": "refund request"},
+        "org_id": "org",
+        "agent_name": "Jane",
+    }
+
+
+def test_build_query_recorded_line_missing():
+    assert TranscriptSearchService.build_query(recorded_line_missing=True) == {
+        RECORDED_LINE_VERDICT_FIELD: False
+    }
+    # Note: Only audits that have recorded line results can have every verdict present
+    assert TranscriptSearchService.build_query(org_id="org", recorded_line_missing=False) == {
+        "org_id": "org",
+        "audit_results.recorded_line_phrases": {"$exists": True},
+        RECORDED_LINE_VERDICT_FIELD: {"$ne": False},
+    }
+
+
+def test_build_query_date_range_bounds():
+    created_from, created_to = datetime(2025, 1, 1), datetime(2025, 2, 1)
+
+    assert TranscriptSearchService.build_query(created_from=created_from) == {
+        "created_at": {"$gte": created_from}
+    }
+    assert TranscriptSearchService.build_query(
+        text="refund", created_from=created_from, created_to=created_to
+    ) == {
+        "$text": {"$search": "refund"},
+        "created_at": {"$gte": created_from, "$lt": created_to},
+    }
+
+
+def test_build_query_section_duration_filter_only_accepts_known_section_types():
+    assert TranscriptSearchService.build_query(section_type="IVR", min_section_seconds=300) == {
+        "audit_results.section_breakdown.section_durations.IVR": {"$gte": 300}
+    }
+
+    for section_type in ["IVR.x", "$where", "unknown"]:
+        with pytest.raises(ValueError):
+            TranscriptSearchService.build_query(section_type=section_type, min_section_seconds=1)
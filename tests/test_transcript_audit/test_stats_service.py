@@ -0,0 +1,95 @@
+from datetime import datetime
+import pytest
+from pymongo.read_preferences import SecondaryPreferred
+from src.transcript_audit.models import TranscriptAuditResult
+from src.transcript_audit.services import stats_service
+from src.transcript_audit.services.stats_service import (
+    AuditStatsService,
+    get_section_duration_bucket,
+    get_section_length_bucket,
+)
+
+
+class StubMongoClient:
+    def __init__(self, rollups=None):
+        self.rollups = rollups or []
+        self.updates = []
+        self.analytics_read_preference = SecondaryPreferred()
+
+    async def update_one(self, collection_name, query, update, upsert=False):
+        self.updates.append((query, update, upsert))
+        return 1
+
+    async def find_many(self, collection_name, query, **kwargs):
+        return self.rollups
+
+
+@pytest.fixture
+def transcript_audit_result() -> TranscriptAuditResult:
+    return TranscriptAuditResult(
+        org_id="org",
+        session_id="session",
+        transcript_file_name="transcript.json",
+        agent_name="Jane Doe",
+        created_at=datetime(2025, 3, 4, 23, 30),
+    )
+
+
+def test_section_length_buckets():
+    assert get_section_length_bucket(1) == "le_5"
+    assert get_section_length_bucket(6) == "le_10"
+    assert get_section_length_bucket(500) == "gt_100"
+
+
+def test_section_duration_buckets():
+    assert get_section_duration_bucket(12.5) == "le_30"
+    assert get_section_duration_bucket(301) == "le_600"
+    assert get_section_duration_bucket(3600) == "gt_600"
+
+
+@pytest.mark.asyncio
+async def test_record_section_audit_increments_daily_rollup(mocker, transcript_audit_result):
+    mongo_client = StubMongoClient()
+    mocker.patch.object(stats_service, "get_mongo_client", return_value=mongo_client)
+
+    await AuditStatsService().record_section_audit(
+        transcript_audit_result,
+        {
+            "section_breakdown": [
+                {"section_type": "IVR", "start_index": 0, "end_index": 3, "duration_seconds": 320.0},
+                {"section_type": "INTRODUCTION", "start_index": 4, "end_index": 11},
+                {"section_type": "IVR", "start_index": 12, "end_index": 12},
+            ]
+        },
+    )
+
+    query, update, upsert = mongo_client.updates[0]
+    assert query == {"org_id": "org", "agent_name": "Jane Doe", "date": "2025-03-04"}
+    assert upsert
+    assert update["$inc"] == {
+        "section_breakdown_audits": 1,
+        "section_counts.IVR": 2,
+        "section_length_histogram.IVR.le_5": 2,
+        "section_duration_histogram.IVR.le_600": 1,
+        "section_counts.INTRODUCTION": 1,
+        "section_length_histogram.INTRODUCTION.le_10": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_stats_sums_agents_per_day(mocker):
+    mongo_client = StubMongoClient(
+        [
+            {"date": "2025-03-04", "agent_name": "A", "total_human_transfers": 4, "total_recorded_line_phrases": 3},
+            {"date": "2025-03-04", "agent_name": "B", "total_human_transfers": 4, "total_recorded_line_phrases": 1},
+            {"date": "2025-03-05", "agent_name": "A", "total_human_transfers": 0, "total_recorded_line_phrases": 0},
+        ]
+    )
+    mocker.patch.object(stats_service, "get_mongo_client", return_value=mongo_client)
+
+    stats = await AuditStatsService().get_stats("org")
+
+    assert [day["date"] for day in stats["days"]] == ["2025-03-04", "2025-03-05"]
+    assert stats["days"][0]["recorded_line_rate"] == 0.5
+    assert stats["days"][1]["recorded_line_rate"] is None
+    assert stats["totals"]["total_human_transfers"] == 8
@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from src.transcript_audit import tasks
+from src.transcript_audit.tasks import AuditTaskRegistry, resume_requeued_audits
+from src.transcript_audit.schemas import AuditStatus, AuditType
+
+FIRST_ID = "65f0c0ffee0000000000abcd"
+SECOND_ID = "65f0c0ffee0000000000abce"
+
+
+class FakeMongoClient:
+    """Keeps documents in memory, claims yield to the event loop like a real round trip."""
+
+    def __init__(self, documents: list[dict]):
+        self.documents = {document["_id"]: document for document in documents}
+        self.updates: list[tuple[dict, dict]] = []
+        self.calls: list[str] = []
+        self.write_buffer = self
+
+    async def flush(self):
+        self.calls.append("flush")
+
+    async def update_one(self, collection_name, query, update):
+        self.calls.append("update_one")
+        self.updates.append((query, update))
+        return 1
+
+    async def find_one(self, collection_name, query, projection=None):
+        await asyncio.sleep(0)
+        for document in self.documents.values():
+            if document.get("requeued"):
+                return {"_id": document["_id"], "org_id": document["org_id"]}
+        return None
+
+    async def find_one_and_update(self, collection_name, query, update):
+        await asyncio.sleep(0)
+        document = self.documents.get(query["_id"])
+        if not document or not document.get("requeued"):
+            return None
+        before = dict(document)
+        document.update(update["$set"])
+        for field in update["$unset"]:
+            document.pop(field, None)
+        return before
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_audits_within_the_timeout_and_requeues_the_rest(mocker):
+    mongo_client = FakeMongoClient([])
+    mocker.patch.object(tasks, "get_mongo_client", return_value=mongo_client)
+    registry = AuditTaskRegistry()
+    finished = []
+
+    async def audit(seconds: float, name: str):
+        await asyncio.sleep(seconds)
+        finished.append(name)
+
+    registry.spawn(FIRST_ID, AuditType.SECTION_BREAKDOWN, audit(0.01, "fast"), org_id="org")
+    registry.spawn(SECOND_ID, AuditType.RECORDED_LINE_PHRASES, audit(10, "slow"), org_id="org")
+
+    requeued = await registry.drain(timeout=0.2)
+
+    assert finished == ["fast"]
+    assert requeued == [(SECOND_ID, AuditType.RECORDED_LINE_PHRASES)]
+    assert len(registry) == 0
+    # Note: Results buffered by the cancelled audit land first, the requeue skips finished audits
+    assert mongo_client.calls == ["flush", "update_one"]
+    [(query, update)] = mongo_client.updates
+    assert str(query["_id"]) == SECOND_ID
+    assert query["status.recorded_line_phrases"] == {"$nin": ["completed", "failed"]}
+    assert update["$set"] == {"status.recorded_line_phrases": AuditStatus.PENDING, "requeued": True}
+    assert update["$addToSet"] == {"requeued_audit_types": AuditType.RECORDED_LINE_PHRASES}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_resumers_claim_each_document_once(mocker):
+    mongo_client = FakeMongoClient(
+        [
+            {
+                "_id": FIRST_ID,
+                "org_id": "org",
+                "agent_name": "Jane",
+                "conversation_history": [{"id": "m", "role": "user", "content": "hi"}],
+                "requeued_audit_types": ["recorded_line_phrases", "section_breakdown"],
+                "requeued": True,
+            },
+            {
+                "_id": SECOND_ID,
+                "org_id": "org",
+                "conversation_history": [],
+                "requeued_audit_types": ["section_breakdown"],
+                "requeued": True,
+            },
+        ]
+    )
+    recorded_line_service = mocker.MagicMock()
+    recorded_line_service.audit = mocker.AsyncMock()
+    section_service = mocker.MagicMock()
+    section_service.audit = mocker.AsyncMock()
+    registry = AuditTaskRegistry()
+
+    mocker.patch.object(tasks, "get_mongo_client", return_value=mongo_client)
+    mocker.patch.object(tasks, "get_audit_task_registry", return_value=registry)
+    mocker.patch.object(tasks, "get_recorded_line_audit_service", return_value=recorded_line_service)
+    mocker.patch.object(tasks, "get_section_audit_service", return_value=section_service)
+
+    resumed = await asyncio.gather(resume_requeued_audits(), resume_requeued_audits())
+    await registry.drain(timeout=1)
+
+    assert sum(resumed) == 3
+    assert recorded_line_service.audit.await_count == 1
+    assert sorted(call.args[0] for call in section_service.audit.await_args_list) == [
+        FIRST_ID,
+        SECOND_ID,
+    ]
+    assert all(
+        not document["requeued_audit_types"] and "requeued" not in document
+        for document in mongo_client.documents.values()
+    )
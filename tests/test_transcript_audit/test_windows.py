@@ -0,0 +1,31 @@
+from src.transcript_audit.windows import TransferWindow, plan_transfer_windows
+
+
+def test_windows_are_clamped_to_conversation_bounds():
+    windows = plan_transfer_windows([1, 18], conversation_length=20)
+
+    assert windows == [
+        TransferWindow(start=0, end=5, transfer_indices=[1]),
+        TransferWindow(start=15, end=20, transfer_indices=[18]),
+    ]
+
+
+def test_overlapping_windows_are_merged():
+    windows = plan_transfer_windows([10, 14, 30], conversation_length=50)
+
+    assert windows == [
+        TransferWindow(start=7, end=18, transfer_indices=[10, 14]),
+        TransferWindow(start=27, end=34, transfer_indices=[30]),
+    ]
+
+
+def test_adjacent_windows_are_not_merged():
+    windows = plan_transfer_windows([10, 17], conversation_length=50)
+
+    assert [window.transfer_indices for window in windows] == [[10], [17]]
+
+
+def test_out_of_range_and_duplicate_indices_are_ignored():
+    windows = plan_transfer_windows([5, 5, -1, 99], conversation_length=10, start_offset=1, end_offset=2)
+
+    assert windows == [TransferWindow(start=4, end=7, transfer_indices=[5])]